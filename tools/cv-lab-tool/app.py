@@ -24,13 +24,34 @@ import streamlit as st
 import spacy
 import re
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from io import BytesIO
+import hashlib
+import html
 import logging
+import os
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache, partial
+from pathlib import Path
+from string import Template
+from typing import Dict, Iterable, List, Tuple, Optional
 import json
+import threading
+import time
+import gc
+import zipfile
+from collections import OrderedDict
+
+from boilerplate import BoilerplateIndex, find_boilerplate, mask_spans, strip_boilerplate
+from classifier import HEADS, JobClassifier, load_classifier
+from dedup import NearDuplicateIndex
+from demand import DemandStore, recent_weeks
+from docfreq import DocumentFrequencies
+from gazetteer import GAZETTEER_PATH, Gazetteer, extract_posting_fields
+from history import HistoryStore
+from vectorstore import VectorStore
+from watcher import ResultsStore
 
 # Configure logging for debugging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -40,9 +61,35 @@ logger = logging.getLogger(__name__)
 # CONFIGURATION & CONSTANTS
 # =============================================================================
 
+# Local data (indexes, caches, history); override with CV_LAB_DATA_DIR
+DATA_DIR = Path(os.environ.get('CV_LAB_DATA_DIR', Path(__file__).parent / '.cv_lab'))
+
 # ATS-friendly section names (standard format)
 STANDARD_SECTIONS = ['contact', 'summary', 'experience', 'skills', 'education']
 
+# Section name mappings (normalize different naming conventions), in resume order
+RESUME_SECTION_ORDER = [
+    ('header', ['header']),
+    ('summary', ['summary', 'profile', 'about']),
+    ('capabilities', ['core capabilities', 'capabilities', 'key skills', 'competencies']),
+    ('experience', ['professional experience', 'experience', 'work history', 'employment']),
+    ('earlier_career', ['earlier career', 'previous experience', 'career history']),
+    ('tools', ['tools & methods', 'tools and methods', 'tools', 'technologies', 'tech stack']),
+    ('skills', ['skills', 'technical skills', 'expertise']),
+    ('education', ['education', 'education & development', 'qualifications', 'certifications']),
+    ('personal', ['personal', 'interests', 'hobbies', 'about me']),
+]
+
+# Rough page geometry for budgeting when reportlab is not installed
+# (10pt Helvetica body on A4, 0.75in margins)
+RESUME_PAGE_GEOMETRY = {
+    'chars_per_line': 95,
+    'lines_per_page': 52,
+}
+
+# Sections whose lines the resume optimiser may drop
+OPTIONAL_LINE_CATEGORIES = {'experience', 'earlier_career', 'capabilities', 'tools', 'skills'}
+
 # Weight distribution for scoring
 SCORING_WEIGHTS = {
     'keywords': 0.40,      # Hard skill keyword matches
@@ -51,6 +98,13 @@ SCORING_WEIGHTS = {
     'relevance': 0.20      # Overall semantic relevance
 }
 
+# Total score at or above which a match shows as high / medium
+# (calibrate.py fits these and SCORING_WEIGHTS to labelled outcomes)
+SCORE_THRESHOLDS = {
+    'high': 80,
+    'medium': 60,
+}
+
 # Common soft skill indicators and their mappings
 SOFT_SKILL_MAPPINGS = {
     # Teamwork & Collaboration
@@ -106,6 +160,315 @@ SOFT_SKILL_MAPPINGS = {
     'craft': ['craftsmanship', 'attention to detail', 'pride'],
 }
 
+# Soft skill triggers for other supported languages, mapped onto the same
+# (English) soft skill names so CVs and jobs in different languages compare
+SOFT_SKILL_MAPPINGS_BY_LANGUAGE = {
+    'de': {
+        'team': ['teamwork', 'collaboration', 'communication'],
+        'zusammenarb': ['collaboration', 'teamwork', 'communication'],
+        'agil': ['collaboration', 'adaptability', 'teamwork', 'flexibility'],
+        'bereichsübergreifend': ['collaboration', 'communication', 'adaptability'],
+        'funktionsübergreifend': ['collaboration', 'communication', 'adaptability'],
+        'führ': ['leadership', 'management', 'mentorship', 'influence'],
+        'leit': ['leadership', 'management', 'strategy'],
+        'verantwort': ['accountability', 'leadership', 'reliability'],
+        'mentor': ['leadership', 'coaching', 'development', 'teaching'],
+        'kommunik': ['communication', 'presentation', 'interpersonal'],
+        'stakeholder': ['communication', 'relationship building', 'influence'],
+        'präsent': ['presentation', 'communication', 'storytelling'],
+        'workshop': ['facilitation', 'communication', 'collaboration'],
+        'moderat': ['facilitation', 'communication', 'leadership'],
+        'problem': ['problem-solving', 'analytical', 'critical thinking'],
+        'lösung': ['problem-solving', 'analytical', 'creativity'],
+        'innovat': ['creativity', 'initiative', 'problem-solving'],
+        'strateg': ['planning', 'vision', 'analytical', 'strategic thinking'],
+        'roadmap': ['planning', 'vision', 'organization'],
+        'vision': ['strategic thinking', 'leadership', 'creativity'],
+        'umsetz': ['execution', 'accountability', 'results-oriented'],
+        'priorisier': ['prioritization', 'decision making', 'time management'],
+        'lern': ['growth mindset', 'curiosity', 'adaptability'],
+        'entwickl': ['development', 'growth mindset', 'learning'],
+        'nutzer': ['empathy', 'user-centered', 'customer focus'],
+        'kund': ['customer focus', 'empathy', 'service orientation'],
+        'empath': ['empathy', 'emotional intelligence', 'user-centered'],
+        'forsch': ['analytical', 'curiosity', 'attention to detail'],
+        'qualität': ['attention to detail', 'standards', 'craftsmanship'],
+        'sorgfält': ['attention to detail', 'thoroughness', 'precision'],
+    },
+    'fr': {
+        'équipe': ['teamwork', 'collaboration', 'communication'],
+        'collabor': ['collaboration', 'teamwork', 'communication'],
+        'agil': ['collaboration', 'adaptability', 'teamwork', 'flexibility'],
+        'transverse': ['collaboration', 'communication', 'adaptability'],
+        'dirig': ['leadership', 'management', 'strategy'],
+        'direct': ['leadership', 'strategy', 'vision', 'decision making'],
+        'manag': ['leadership', 'organization', 'planning', 'accountability'],
+        'encadr': ['leadership', 'mentorship', 'coaching'],
+        'mentor': ['leadership', 'coaching', 'development', 'teaching'],
+        'communic': ['communication', 'presentation', 'interpersonal'],
+        'parties prenantes': ['communication', 'relationship building', 'influence'],
+        'stakeholder': ['communication', 'relationship building', 'influence'],
+        'présent': ['presentation', 'communication', 'storytelling'],
+        'atelier': ['facilitation', 'communication', 'collaboration'],
+        'anim': ['facilitation', 'communication', 'leadership'],
+        'problème': ['problem-solving', 'analytical', 'critical thinking'],
+        'résol': ['problem-solving', 'analytical', 'critical thinking'],
+        'solution': ['problem-solving', 'analytical', 'creativity'],
+        'innov': ['creativity', 'initiative', 'problem-solving'],
+        'stratég': ['planning', 'vision', 'analytical', 'strategic thinking'],
+        'feuille de route': ['planning', 'vision', 'organization'],
+        'roadmap': ['planning', 'vision', 'organization'],
+        'vision': ['strategic thinking', 'leadership', 'creativity'],
+        'livr': ['execution', 'accountability', 'results-oriented'],
+        'délai': ['time management', 'prioritization', 'reliability'],
+        'prioris': ['prioritization', 'decision making', 'time management'],
+        'appren': ['growth mindset', 'curiosity', 'adaptability'],
+        'développ': ['development', 'growth mindset', 'learning'],
+        'utilisateur': ['empathy', 'user-centered', 'customer focus'],
+        'client': ['customer focus', 'empathy', 'service orientation'],
+        'empath': ['empathy', 'emotional intelligence', 'user-centered'],
+        'recherche': ['analytical', 'curiosity', 'attention to detail'],
+        'qualité': ['attention to detail', 'standards', 'craftsmanship'],
+        'rigueur': ['attention to detail', 'thoroughness', 'precision'],
+    },
+}
+
+# COMPREHENSIVE hard skills patterns for Design/UX/Product roles
+HARD_SKILL_PATTERNS = [
+    # Design Tools
+    r'\b(figma|sketch|adobe|xd|photoshop|illustrator|indesign|after effects|principle|invision|axure|balsamiq|framer|figjam|miro|lucidchart|whimsical)\b',
+    # Prototyping & Design
+    r'\b(prototyping?|wireframe?s?|mockups?|high[- ]?fidelity|lo[- ]?fi|hi[- ]?fi|design systems?|component librar(?:y|ies)|style guides?|brand guidelines?)\b',
+    # UX/UI Terms
+    r'\b(ux|ui|user experience|user interface|interaction design|visual design|product design|service design|information architecture|ia)\b',
+    # Research Methods
+    r'\b(user research|usability|usability testing|a/?b testing|user testing|user interviews?|personas?|journey map(?:ping|s)?|experience map(?:ping|s)?|card sorting|tree testing|heuristic|cognitive walkthrough)\b',
+    # Research Tools
+    r'\b(maze|lookback|usertesting|hotjar|fullstory|dovetail|optimal workshop|userlytics|whatusersdo|validately|dscout)\b',
+    # Analytics
+    r'\b(analytics|google analytics|mixpanel|amplitude|heap|segment|pendo|data[- ]?driven|metrics|kpis?|conversion rate|cro)\b',
+    # Development & Technical
+    r'\b(html|css|javascript|react|vue|angular|node|python|sql|api|apis|git|github|gitlab|vercel|firebase|aws|responsive design|mobile[- ]?first|accessibility|wcag|aria)\b',
+    # Methodologies
+    r'\b(agile|scrum|kanban|lean|waterfall|design thinking|design sprints?|google ventures|gv sprint|double diamond|human[- ]?centered|jobs[- ]?to[- ]?be[- ]?done|jtbd)\b',
+    # Collaboration Tools
+    r'\b(jira|confluence|notion|asana|trello|monday|productboard|linear|slack|teams)\b',
+    # Leadership & Management
+    r'\b(leadership|management|mentoring?|coaching|team building|hiring|recruiting|performance reviews?|1[- ]?on[- ]?1s?|design ops?|designops|design operations)\b',
+    # Strategy
+    r'\b(strategy|strategic|roadmap(?:ping|s)?|okrs?|stakeholder|cross[- ]?functional|product[- ]?led|data[- ]?informed|evidence[- ]?based)\b',
+    # Industry/Domain
+    r'\b(saas|fintech|b2b|b2c|mobile|web|banking|finance|payments?|wealth management|private banking|enterprise|startup|scale[- ]?up)\b',
+    # AI/Modern Tools
+    r'\b(ai|artificial intelligence|machine learning|ml|chatgpt|gpt|midjourney|dall[- ]?e|copilot|ai[- ]?assisted|ai[- ]?augmented|ai[- ]?native|generative ai)\b',
+    # Specific Skills
+    r'\b(workshop(?:s|ping)?|facilitation|presentations?|storytelling|communication|collaboration|innovation|ideation|brainstorming)\b',
+    # Deliverables
+    r'\b(case stud(?:y|ies)|portfolio|specifications?|requirements?|documentation|handoff|dev handoff|design handoff)\b',
+]
+
+# Multi-word phrases that might be skills
+SKILL_PHRASES = [
+    'design system', 'user research', 'user experience', 'product design',
+    'user interface', 'design thinking', 'design sprint', 'journey mapping',
+    'a/b testing', 'usability testing', 'stakeholder management', 'team leadership',
+    'design ops', 'mobile app', 'web app', 'cross functional', 'data driven',
+    'product led', 'end to end', 'full stack', 'design lead', 'design director',
+    'head of design', 'head of ux', 'senior designer', 'principal designer',
+    'design manager', 'ux lead', 'visual design', 'interaction design',
+    'information architecture', 'service design', 'brand design', 'motion design',
+    'responsive design', 'mobile first', 'accessibility', 'inclusive design',
+    'design critique', 'design review', 'design handoff', 'developer handoff',
+    'figma', 'sketch', 'adobe xd', 'prototyping', 'wireframing'
+]
+
+# Skill phrases in other supported languages -> canonical (English) skill
+# Tool names (Figma, Python, Jira) are the same in every language
+SKILL_PHRASES_BY_LANGUAGE = {
+    'de': {
+        'nutzerforschung': 'user research',
+        'benutzerforschung': 'user research',
+        'nutzererfahrung': 'ux',
+        'benutzeroberfläche': 'ui',
+        'designsystem': 'design system',
+        'produktdesign': 'product design',
+        'interaktionsdesign': 'interaction design',
+        'informationsarchitektur': 'information architecture',
+        'barrierefreiheit': 'accessibility',
+        'usability-test': 'usability testing',
+        'prototyp': 'prototyping',
+        'nutzerzentriert': 'human-centered',
+    },
+    'fr': {
+        'recherche utilisateur': 'user research',
+        'expérience utilisateur': 'ux',
+        'interface utilisateur': 'ui',
+        'système de design': 'design system',
+        'design produit': 'product design',
+        "design d'interaction": 'interaction design',
+        "architecture de l'information": 'information architecture',
+        'accessibilité': 'accessibility',
+        "tests d'utilisabilité": 'usability testing',
+        'prototypage': 'prototyping',
+        'maquettes': 'wireframe',
+        'centré utilisateur': 'human-centered',
+    },
+}
+
+HARD_SKILL_REGEXES = [re.compile(pattern) for pattern in HARD_SKILL_PATTERNS]
+
+# Surface forms that mean the same skill -> canonical form
+# Plurals, hyphen/space/slash and UK/US spelling variants are handled by
+# skill_key(), so only true synonyms and abbreviations belong here
+SKILL_ALIASES = {
+    'user interface': 'ui',
+    'user experience': 'ux',
+    'split testing': 'a/b testing',
+    'designops': 'design ops',
+    'design operations': 'design ops',
+    'artificial intelligence': 'ai',
+    'ml': 'machine learning',
+    'jobs to be done': 'jtbd',
+    'gv sprint': 'design sprint',
+    'hi fi': 'high fidelity',
+    'wireframing': 'wireframe',
+    'prototype': 'prototyping',
+    'mentor': 'mentoring',
+    'mentorship': 'mentoring',
+    'roadmapping': 'roadmap',
+    'journey map': 'journey mapping',
+    'experience map': 'experience mapping',
+    'ia': 'information architecture',
+    'conversion rate optimization': 'cro',
+    'dev handoff': 'developer handoff',
+    'a11y': 'accessibility',
+    'key performance indicator': 'kpi',
+    'objectives and key results': 'okr',
+}
+
+# Fuzzy matching of unseen surface forms (typos, odd variants)
+FUZZY_SKILL_MATCH = {
+    'ngram': 3,            # Character n-gram size
+    'min_length': 6,       # Shorter forms ('ui', 'ux', 'ai') must match exactly
+    'min_similarity': 0.75, # Dice coefficient over n-gram sets
+}
+
+# Inference weight of a mapped soft skill by its position in the list above
+# (the first skill listed is the strongest signal of the trigger)
+SOFT_SKILL_RANK_WEIGHTS = [1.0, 0.8, 0.6, 0.5]
+
+# Chunked processing for very large inputs (multi-page CVs, full careers pages)
+# Non-obvious: spaCy needs roughly 1MB of RAM per 1,000 characters parsed,
+# so the memory budget caps both chunk size and how many chunks are in flight
+CHUNKING_CONFIG = {
+    'chunk_chars': 20000,      # Target chunk size; splits fall on section boundaries
+    'memory_budget_mb': 256,   # Approximate ceiling for Docs held at once
+    'chars_per_mb': 1000,      # spaCy memory rule of thumb
+}
+
+# Per-stage extraction budgets: (seconds, max input chars). Scale every
+# time limit with CV_LAB_BUDGET_SCALE (e.g. 3 on a slow shared host)
+# Non-obvious: a stage that runs out of time stops between units of work
+# (regexes, chunks, lines) and returns what it has, flagged 'partial';
+# the line-based stages apply max chars to each line
+EXTRACTION_BUDGETS = {
+    'keywords': (5.0, 100_000),
+    'similarity': (3.0, 100_000),
+    'company_info': (1.0, 50_000),
+    'cv_highlights': (1.0, 100_000),
+    'resume_optimiser': (5.0, 5_000),
+    'gap_recommender': (5.0, 5_000),
+}
+BUDGET_TIME_SCALE = float(os.environ.get('CV_LAB_BUDGET_SCALE', 1.0))
+
+# spaCy's tokenizer is quadratic in the length of a whitespace-free run of
+# punctuation ('*' x 8,000 takes ~9s), so longer runs are broken up first
+INPUT_GUARDS = {
+    'max_input_chars': 200_000,  # Sidebar inputs are truncated to this on entry
+    'max_token_chars': 64,       # Longest whitespace-free run passed to spaCy
+    'max_repeat_chars': 3,       # Longest run of one repeated punctuation mark
+}
+
+# spaCy pipeline per supported language, loaded on first use
+SPACY_MODELS = {
+    'en': 'en_core_web_sm',
+    'de': 'de_core_news_sm',
+    'fr': 'fr_core_news_sm',
+}
+
+# Model cache limits; override the cap with CV_LAB_MODEL_MEMORY_MB
+# Non-obvious: pinned languages are never evicted and their memory is
+# reserved up front, so a rare language can only evict other rare ones
+MODEL_CACHE_CONFIG = {
+    'memory_cap_mb': int(os.environ.get('CV_LAB_MODEL_MEMORY_MB', 400)),
+    'pinned': ('en',),
+    'model_mb': {'sm': 60, 'md': 150, 'lg': 650, 'trf': 550},  # Estimate by package size suffix
+}
+
+# Language detection by stop word hits in a sample of the text
+LANGUAGE_DETECTION = {
+    'sample_chars': 5000,
+    'min_hits': 5,      # Fewer hits than this (short/ambiguous text) -> default language
+    'default': 'en',
+}
+
+LANGUAGE_STOPWORDS = {
+    'en': {'the', 'and', 'of', 'to', 'in', 'for', 'with', 'on', 'is', 'are', 'you', 'we',
+           'our', 'your', 'will', 'as', 'at', 'by', 'an', 'be', 'this', 'from', 'have', 'or'},
+    'de': {'der', 'die', 'das', 'und', 'mit', 'für', 'von', 'zu', 'ist', 'sind', 'wir', 'sie',
+           'ein', 'eine', 'einen', 'im', 'auf', 'den', 'dem', 'des', 'bei', 'oder', 'unser', 'nicht'},
+    'fr': {'le', 'la', 'les', 'et', 'des', 'du', 'un', 'une', 'pour', 'avec', 'dans', 'est',
+           'sont', 'nous', 'vous', 'vos', 'nos', 'au', 'aux', 'sur', 'par', 'ou', 'votre', 'notre'},
+}
+
+# Job vector store (see vectorstore.py). int8 rows take ~4x less memory than
+# float32 arrays and float16 ~2x, at slightly better recall; pick with
+# CV_LAB_VECTOR_DTYPE. Non-obvious: each dtype gets its own store directory,
+# and changing dim or the LSH shape needs a fresh one
+VECTOR_STORE_CONFIG = {
+    'dim': 256,                 # Hashed word unigram/bigram features per embedding
+    'dtype': os.environ.get('CV_LAB_VECTOR_DTYPE', 'int8'),
+    'tables': 16,               # LSH hash tables (more: better recall, more candidates)
+    'bits': 12,                 # Hyperplanes per table (more: smaller buckets)
+    'brute_force_below': 2000,  # Smaller stores are scanned exactly
+    'top_k': 5,
+}
+
+# Skill demand dashboard (see demand.py)
+DEMAND_CONFIG = {
+    'sketch_capacity': 500,  # Long-tail terms tracked per week
+    'window_weeks': 12,      # Weeks counted for top skills and CV coverage
+    'recent_weeks': 4,       # "Rising" compares these weeks...
+    'baseline_weeks': 8,     # ...with this many weeks before them
+    'top_n': 20,
+}
+
+# Job folder watcher (see watcher.py); its scored postings are offered in the sidebar
+WATCH_CONFIG = {
+    'results_path': DATA_DIR / 'watch_results.sqlite3',
+    'sidebar_jobs': 50,  # Most recent ingested postings listed
+}
+
+# Saved resume and cover letter versions (see history.py)
+HISTORY_CONFIG = {
+    'path': DATA_DIR / 'history.sqlite3',
+    'listed_versions': 30,  # Most recent versions offered for restore
+}
+
+# Seniority / role-family classifier (see classifier.py). Predictions below
+# min_confidence are dropped. A head only drives cover letter tone, role
+# names and role_families routing once validated on enough held-out real
+# postings (train_classifier.py --holdout); title words always come first
+JOB_CLASSIFIER_CONFIG = {
+    'min_confidence': 0.3,
+    'leadership_levels': ('senior', 'lead', 'executive'),  # Cover letter takes the leadership tone
+    'min_validated_examples': 200,
+    'min_validated_accuracy': 0.85,
+}
+
+# Evidence spans kept per keyword (enough to jump to, bounded for huge inputs)
+MAX_EVIDENCE_SPANS = 20
+
 # Sample data for demo/testing
 SAMPLE_CV = """
 # DAVID PHILLIP
@@ -187,29 +550,395 @@ What We Offer:
 
 
 # =============================================================================
-# NLP UTILITIES
+# SKILL NORMALISATION
+# =============================================================================
+
+# Word endings that stay as-is when singularising ('analytics', 'saas', 'css')
+_KEEP_PLURAL_ENDINGS = ('ss', 'us', 'ics', 'ops', 'aas', 'ws')
+
+# UK -> US spelling rewrites applied per word when building keys
+_SPELLING_REWRITES = [
+    (re.compile(r'isation$'), 'ization'),
+    (re.compile(r'is(e|ed|ing)$'), r'iz\1'),
+    (re.compile(r'centred$'), 'centered'),
+    (re.compile(r'centre$'), 'center'),
+    (re.compile(r'our$'), 'or'),
+]
+
+
+def skill_key(surface: str) -> str:
+    """
+    Normalise a skill surface form to its matching key.
+    
+    'Design-Systems' -> 'design system', 'A/B testing' -> 'ab testing',
+    'human-centred' -> 'human centered'. Keys are for lookup only.
+    """
+    words = re.sub(r'[\s\-_]+', ' ', surface.lower().replace('/', '')).split()
+    if not words:
+        return ''
+    
+    last = words[-1]
+    if len(last) > 4 and last.endswith('ies'):
+        last = last[:-3] + 'y'
+    elif len(last) > 3 and last.endswith('s') and not last.endswith(_KEEP_PLURAL_ENDINGS):
+        last = last[:-1]
+    words[-1] = last
+    
+    normalised = []
+    for word in words:
+        if len(word) > 5:
+            for regex, replacement in _SPELLING_REWRITES:
+                word = regex.sub(replacement, word)
+        normalised.append(word)
+    return ' '.join(normalised)
+
+
+def _pattern_terms(pattern: str) -> List[str]:
+    """
+    Literal skill terms of a HARD_SKILL_PATTERNS regex, one per alternative.
+    
+    Takes the fullest spelling of each alternative: optional characters
+    are kept, '(?:a|b)' becomes 'a' and '[- ]?' becomes a hyphen.
+    """
+    inner = pattern[len(r'\b('):-len(r')\b')]
+    terms = []
+    depth = 0
+    current = ''
+    for char in inner:
+        if char == '|' and depth == 0:
+            terms.append(current)
+            current = ''
+            continue
+        depth += char == '('
+        depth -= char == ')'
+        current += char
+    terms.append(current)
+    
+    cleaned = []
+    for term in terms:
+        term = re.sub(r'\(\?:([^|)]*)(?:\|[^)]*)?\)\??', r'\1', term)
+        term = re.sub(r'\[[^\]]*\]\?', '-', term)
+        cleaned.append(term.replace('?', ''))
+    return cleaned
+
+
+class SkillIndex:
+    """
+    Canonicalisation index: every skill surface form -> canonical skill.
+    
+    Built once from SKILL_ALIASES plus the hard skill taxonomy; the first
+    surface form registered for a key becomes the canonical name. Each
+    canonical skill has a stable integer ID (its position in the sorted
+    `names` list).
+    
+    Lookup order: exact key, then alias, then a character n-gram index
+    that proposes candidates scored by Dice similarity. Only candidates
+    sharing an n-gram are ever scored, so fuzzy lookups stay cheap on
+    large taxonomies, and results are memoised per surface form.
+    """
+    
+    def __init__(self, terms: Iterable[str], aliases: Dict[str, str], fuzzy: Dict):
+        self.fuzzy = fuzzy
+        self._by_key = {}
+        
+        # Alias targets are canonical; register them first so they win
+        for target in aliases.values():
+            self._by_key.setdefault(skill_key(target), target)
+        for surface, target in aliases.items():
+            self._by_key[skill_key(surface)] = self._by_key[skill_key(target)]
+        for term in terms:
+            self._by_key.setdefault(skill_key(term), term.strip().lower())
+        
+        self.names = sorted(set(self._by_key.values()))
+        self._ids = {name: idx for idx, name in enumerate(self.names)}
+        
+        self._ngram_index = {}
+        for key in self._by_key:
+            if len(key) >= fuzzy['min_length']:
+                for gram in self._ngrams(key):
+                    self._ngram_index.setdefault(gram, set()).add(key)
+        self._cache = {}
+    
+    def _ngrams(self, key: str) -> set:
+        padded = f' {key} '
+        size = self.fuzzy['ngram']
+        return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+    
+    def _fuzzy_lookup(self, key: str) -> Optional[str]:
+        if len(key) < self.fuzzy['min_length']:
+            return None
+        grams = self._ngrams(key)
+        shared = {}
+        for gram in grams:
+            for candidate in self._ngram_index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        
+        best, best_score = None, self.fuzzy['min_similarity']
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + len(self._ngrams(candidate)))
+            if score >= best_score:
+                best, best_score = candidate, score
+        return self._by_key[best] if best else None
+    
+    def canonicalize(self, surface: str) -> str:
+        """Canonical skill for a surface form (its own key if unknown)."""
+        if surface in self._cache:
+            return self._cache[surface]
+        key = skill_key(surface)
+        canonical = self._by_key.get(key) or self._fuzzy_lookup(key) or key
+        self._cache[surface] = canonical
+        return canonical
+    
+    def skill_id(self, surface: str) -> Optional[int]:
+        """Stable integer ID of a surface form's canonical skill, if in the taxonomy."""
+        return self._ids.get(self.canonicalize(surface))
+
+
+SKILL_INDEX = SkillIndex(
+    SKILL_PHRASES + [term for pattern in HARD_SKILL_PATTERNS for term in _pattern_terms(pattern)],
+    SKILL_ALIASES,
+    FUZZY_SKILL_MATCH,
+)
+
+# Every soft skill the mappings (in any language) can infer
+SOFT_SKILL_NAMES = sorted({
+    skill
+    for mappings in [SOFT_SKILL_MAPPINGS, *SOFT_SKILL_MAPPINGS_BY_LANGUAGE.values()]
+    for skills in mappings.values()
+    for skill in skills
+})
+
+# Corpus statistics term IDs: hard skills by SKILL_INDEX ID, then soft skills
+TERM_NAMES = [f'hard:{name}' for name in SKILL_INDEX.names] + [f'soft:{name}' for name in SOFT_SKILL_NAMES]
+SOFT_SKILL_TERM_IDS = {name: len(SKILL_INDEX.names) + idx for idx, name in enumerate(SOFT_SKILL_NAMES)}
+
+
+# =============================================================================
+# LANGUAGE PIPELINES
 # =============================================================================
 
+def detect_language(text: str) -> str:
+    """
+    Detect a supported language from stop word hits in a text sample.
+    
+    Cheap enough to run on every input; short or ambiguous text gets
+    the default language.
+    """
+    sample = text[:LANGUAGE_DETECTION['sample_chars']].lower()
+    words = re.findall(r"[^\W\d_]+", sample)
+    hits = {language: sum(word in stopwords for word in words)
+            for language, stopwords in LANGUAGE_STOPWORDS.items()}
+    language, count = max(hits.items(), key=lambda item: item[1])
+    if count < LANGUAGE_DETECTION['min_hits']:
+        return LANGUAGE_DETECTION['default']
+    return language
+
+
+def estimate_model_mb(package: str) -> int:
+    """Rough resident size of a spaCy package, from its size suffix."""
+    sizes = MODEL_CACHE_CONFIG['model_mb']
+    return sizes.get(package.rsplit('_', 1)[-1], max(sizes.values()))
+
+
+class ModelCache:
+    """
+    Lazily loaded spaCy pipelines, one per language, under a memory cap.
+    
+    Pinned languages stay loaded for the life of the process and their
+    estimated size is reserved out of the cap; the remainder holds other
+    languages in LRU order. Cache hits only take a short dict lock, and
+    each language loads under its own lock, so loading a rare model
+    never blocks requests for a loaded one. Languages whose model is not
+    installed are remembered and return None without retrying.
+    """
+    
+    def __init__(self, models: Dict[str, str], memory_cap_mb: int,
+                 pinned: Iterable[str] = (), loader=spacy.load):
+        self.models = models
+        self.memory_cap_mb = memory_cap_mb
+        self.pinned = set(pinned)
+        self._loader = loader
+        self._loaded = OrderedDict()  # language -> (nlp, size_mb), LRU first
+        self._missing = set()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+    
+    @property
+    def rotating_budget_mb(self) -> int:
+        """Memory left for unpinned languages."""
+        reserved = sum(estimate_model_mb(self.models[language])
+                       for language in self.pinned if language in self.models)
+        return self.memory_cap_mb - reserved
+    
+    def loaded(self) -> List[str]:
+        """Loaded languages, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+    
+    def get(self, language: str):
+        """Pipeline for a language, loading it if needed (None if unavailable)."""
+        with self._lock:
+            if language in self._loaded:
+                self._loaded.move_to_end(language)
+                return self._loaded[language][0]
+            if language in self._missing or language not in self.models:
+                return None
+            load_lock = self._load_locks.setdefault(language, threading.Lock())
+        
+        with load_lock:
+            # Another request may have finished loading while we waited
+            with self._lock:
+                if language in self._loaded:
+                    return self._loaded[language][0]
+            
+            package = self.models[language]
+            try:
+                nlp = self._loader(package)
+            except OSError:
+                logger.warning(f"spaCy model {package} not installed; "
+                               f"run: python -m spacy download {package}")
+                with self._lock:
+                    self._missing.add(language)
+                return None
+            logger.info(f"Loaded spaCy model {package}")
+            
+            size_mb = estimate_model_mb(package)
+            with self._lock:
+                if language in self.pinned:
+                    self._loaded[language] = (nlp, size_mb)
+                elif size_mb > self.rotating_budget_mb:
+                    logger.warning(f"{package} (~{size_mb}MB) exceeds the model memory cap; not cached")
+                else:
+                    self._loaded[language] = (nlp, size_mb)
+                    self._evict()
+            return nlp
+    
+    def _evict(self):
+        """Drop least recently used unpinned pipelines until within budget."""
+        rotating = [language for language in self._loaded if language not in self.pinned]
+        used = sum(self._loaded[language][1] for language in rotating)
+        evicted = False
+        # The newest entry is last and always fits (checked by the caller)
+        for language in rotating:
+            if used <= self.rotating_budget_mb:
+                break
+            used -= self._loaded.pop(language)[1]
+            logger.info(f"Evicted spaCy model {self.models[language]}")
+            evicted = True
+        if evicted:
+            gc.collect()
+
+
 @st.cache_resource
+def load_model_cache() -> ModelCache:
+    """Process-wide model cache shared by every session."""
+    return ModelCache(SPACY_MODELS, MODEL_CACHE_CONFIG['memory_cap_mb'], MODEL_CACHE_CONFIG['pinned'])
+
+
+def pipeline_for(text: str, default_nlp) -> Tuple[object, str]:
+    """
+    (pipeline, language) for a text's detected language.
+    
+    default_nlp serves its own language, so a model picked with --model
+    (watcher, batch) is not replaced by the cached one. Falls back to
+    default_nlp when the language's model is unavailable; the language
+    is still returned so extract_keywords uses its taxonomy.
+    """
+    language = detect_language(text)
+    if language == default_nlp.lang:
+        return default_nlp, language
+    return load_model_cache().get(language) or default_nlp, language
+
+
+# =============================================================================
+# EXTRACTION BUDGETS
+# =============================================================================
+
+_REPEATED_PUNCT = re.compile(r'([^\w\s])\1{%d,}' % INPUT_GUARDS['max_repeat_chars'])
+_LONG_RUN = re.compile(r'\S{%d}' % INPUT_GUARDS['max_token_chars'])
+
+
+def guard_text(text: str) -> str:
+    """
+    Break up runs that spaCy tokenizes in quadratic time.
+    
+    Repeated punctuation ('*****', '-----') is cut to max_repeat_chars
+    and any whitespace-free run longer than max_token_chars gets a
+    space. Characters are replaced, never removed, so offsets (keyword
+    evidence) still point into the original text. Ordinary prose is
+    returned unchanged.
+    """
+    keep = INPUT_GUARDS['max_repeat_chars']
+    text = _REPEATED_PUNCT.sub(lambda m: m.group(0)[:keep] + ' ' * (len(m.group(0)) - keep), text)
+    return _LONG_RUN.sub(lambda m: m.group(0)[:-1] + ' ', text)
+
+
+class StageBudget:
+    """
+    Time and size budget for one extraction stage (see EXTRACTION_BUDGETS).
+    
+    The clock starts on construction. A stage clips its input with
+    clip() and polls expired() between units of work, returning what it
+    has so far instead of raising; `partial` then tells the caller the
+    result is incomplete.
+    
+    Usage:
+        budget = StageBudget('keywords')
+        text = budget.clip(text)
+        for regex in regexes:
+            if budget.expired():
+                break
+    """
+    
+    def __init__(self, stage: str, seconds: Optional[float] = None, max_chars: Optional[int] = None):
+        default_seconds, default_chars = EXTRACTION_BUDGETS[stage]
+        self.stage = stage
+        self.seconds = default_seconds * BUDGET_TIME_SCALE if seconds is None else seconds
+        self.max_chars = max_chars or default_chars
+        self.deadline = time.perf_counter() + self.seconds
+        self.truncated = False
+        self.timed_out = False
+    
+    @property
+    def partial(self) -> bool:
+        return self.truncated or self.timed_out
+    
+    def clip(self, text: str) -> str:
+        """text cut to max_chars and passed through guard_text()."""
+        if len(text) > self.max_chars:
+            logger.warning(f"{self.stage}: input clipped from {len(text)} to {self.max_chars} chars")
+            self.truncated = True
+            text = text[:self.max_chars]
+        return guard_text(text)
+    
+    def expired(self) -> bool:
+        """True once the stage's time is up (logged once)."""
+        if not self.timed_out and time.perf_counter() > self.deadline:
+            logger.warning(f"{self.stage}: {self.seconds:.1f}s budget exceeded, returning partial results")
+            self.timed_out = True
+        return self.timed_out
+
+
+# =============================================================================
+# NLP UTILITIES
+# =============================================================================
+
 def load_spacy_model():
     """
-    Load spaCy model with caching for performance.
+    Load the default (English) spaCy model through the shared model cache.
     Uses en_core_web_sm for free local processing.
     
-    Future: Could integrate en_core_web_lg for better accuracy,
-    or add multilingual support with xx_ent_wiki_sm
+    Other languages are loaded on demand by pipeline_for().
     """
-    try:
-        nlp = spacy.load("en_core_web_sm")
-        logger.info("spaCy model loaded successfully")
-        return nlp
-    except OSError:
-        st.error("⚠️ spaCy model not found. Please run: python -m spacy download en_core_web_sm")
-        logger.error("Failed to load spaCy model")
-        return None
+    nlp = load_model_cache().get(LANGUAGE_DETECTION['default'])
+    if nlp is None:
+        st.error(f"⚠️ spaCy model not found. Please run: python -m spacy download "
+                 f"{SPACY_MODELS[LANGUAGE_DETECTION['default']]}")
+    return nlp
 
 
-def extract_keywords(text: str, nlp) -> Dict[str, List[str]]:
+def extract_keywords(text: str, nlp, doc=None, language: Optional[str] = None,
+                     budget: Optional[StageBudget] = None) -> Dict[str, List[str]]:
     """
     Extract keywords from text using NLP.
     
@@ -218,10 +947,22 @@ def extract_keywords(text: str, nlp) -> Dict[str, List[str]]:
     - soft_skills: Implied interpersonal/management skills
     - entities: Named entities (companies, dates, etc.)
     - verbs: Action verbs for experience matching
-    
-    Non-obvious: Also detects implied soft skills from context phrases
+    - soft_skill_weights: soft skill -> summed inference weight
+    - evidence: keyword -> [(start, end), ...] character spans in `text`
+    - partial: True when the 'keywords' budget clipped the input or ran out
+    
+    Non-obvious: Also detects implied soft skills from context phrases.
+    Pass a pre-parsed `doc` (of text.lower()) when batching with nlp.pipe.
+    `language` picks the skill taxonomy (defaults to the pipeline's
+    language); keywords are always reported in their English form.
     """
-    doc = nlp(text.lower())
+    language = language or nlp.lang
+    budget = budget or StageBudget('keywords')
+    if doc is None:
+        text = budget.clip(text)
+        if len(text) > chunk_size_for(nlp):
+            return extract_keywords_chunked(text, nlp, language=language, budget=budget)
+        doc = nlp(text.lower())
     
     keywords = {
         'hard_skills': [],
@@ -245,168 +986,396 @@ def extract_keywords(text: str, nlp) -> Dict[str, List[str]]:
             elif token.pos_ == 'VERB':
                 keywords['verbs'].append(token.lemma_)
     
-    # COMPREHENSIVE hard skills patterns for Design/UX/Product roles
-    hard_skill_patterns = [
-        # Design Tools
-        r'\b(figma|sketch|adobe|xd|photoshop|illustrator|indesign|after effects|principle|invision|axure|balsamiq|framer|figjam|miro|lucidchart|whimsical)\b',
-        # Prototyping & Design
-        r'\b(prototyping?|wireframe?s?|mockups?|high[- ]?fidelity|lo[- ]?fi|hi[- ]?fi|design systems?|component librar(?:y|ies)|style guides?|brand guidelines?)\b',
-        # UX/UI Terms
-        r'\b(ux|ui|user experience|user interface|interaction design|visual design|product design|service design|information architecture|ia)\b',
-        # Research Methods
-        r'\b(user research|usability|usability testing|a/?b testing|user testing|user interviews?|personas?|journey map(?:ping|s)?|experience map(?:ping|s)?|card sorting|tree testing|heuristic|cognitive walkthrough)\b',
-        # Research Tools
-        r'\b(maze|lookback|usertesting|hotjar|fullstory|dovetail|optimal workshop|userlytics|whatusersdo|validately|dscout)\b',
-        # Analytics
-        r'\b(analytics|google analytics|mixpanel|amplitude|heap|segment|pendo|data[- ]?driven|metrics|kpis?|conversion rate|cro)\b',
-        # Development & Technical
-        r'\b(html|css|javascript|react|vue|angular|node|python|sql|api|apis|git|github|gitlab|vercel|firebase|aws|responsive design|mobile[- ]?first|accessibility|wcag|aria)\b',
-        # Methodologies
-        r'\b(agile|scrum|kanban|lean|waterfall|design thinking|design sprints?|google ventures|gv sprint|double diamond|human[- ]?centered|jobs[- ]?to[- ]?be[- ]?done|jtbd)\b',
-        # Collaboration Tools
-        r'\b(jira|confluence|notion|asana|trello|monday|productboard|linear|slack|teams)\b',
-        # Leadership & Management
-        r'\b(leadership|management|mentoring?|coaching|team building|hiring|recruiting|performance reviews?|1[- ]?on[- ]?1s?|design ops?|designops|design operations)\b',
-        # Strategy
-        r'\b(strategy|strategic|roadmap(?:ping|s)?|okrs?|stakeholder|cross[- ]?functional|product[- ]?led|data[- ]?informed|evidence[- ]?based)\b',
-        # Industry/Domain
-        r'\b(saas|fintech|b2b|b2c|mobile|web|banking|finance|payments?|wealth management|private banking|enterprise|startup|scale[- ]?up)\b',
-        # AI/Modern Tools
-        r'\b(ai|artificial intelligence|machine learning|ml|chatgpt|gpt|midjourney|dall[- ]?e|copilot|ai[- ]?assisted|ai[- ]?augmented|ai[- ]?native|generative ai)\b',
-        # Specific Skills
-        r'\b(workshop(?:s|ping)?|facilitation|presentations?|storytelling|communication|collaboration|innovation|ideation|brainstorming)\b',
-        # Deliverables
-        r'\b(case stud(?:y|ies)|portfolio|specifications?|requirements?|documentation|handoff|dev handoff|design handoff)\b',
-    ]
-    
-    text_lower = text.lower()
-    for pattern in hard_skill_patterns:
-        matches = re.findall(pattern, text_lower)
-        keywords['hard_skills'].extend(matches)
-    
-    # Also extract multi-word phrases that might be skills
-    skill_phrases = [
-        'design system', 'user research', 'user experience', 'product design',
-        'user interface', 'design thinking', 'design sprint', 'journey mapping',
-        'a/b testing', 'usability testing', 'stakeholder management', 'team leadership',
-        'design ops', 'mobile app', 'web app', 'cross functional', 'data driven',
-        'product led', 'end to end', 'full stack', 'design lead', 'design director',
-        'head of design', 'head of ux', 'senior designer', 'principal designer',
-        'design manager', 'ux lead', 'visual design', 'interaction design',
-        'information architecture', 'service design', 'brand design', 'motion design',
-        'responsive design', 'mobile first', 'accessibility', 'inclusive design',
-        'design critique', 'design review', 'design handoff', 'developer handoff',
-        'figma', 'sketch', 'adobe xd', 'prototyping', 'wireframing'
-    ]
-    
-    for phrase in skill_phrases:
-        if phrase in text_lower:
-            keywords['hard_skills'].append(phrase)
+    # Hard skills are canonicalised once here, so overlap is exact matching
+    text_lower = doc.text  # Already lowercased; avoids a second copy
+    evidence = {}
+    for regex in HARD_SKILL_REGEXES:
+        if budget.expired():
+            break
+        for match in regex.finditer(text_lower):
+            skill = SKILL_INDEX.canonicalize(match.group(1))
+            keywords['hard_skills'].append(skill)
+            _add_evidence(evidence, skill, *match.span(1))
+    
+    phrases = [(phrase, phrase) for phrase in SKILL_PHRASES]
+    phrases += SKILL_PHRASES_BY_LANGUAGE.get(language, {}).items()
+    for phrase, canonical in phrases:
+        if budget.expired():
+            break
+        skill = SKILL_INDEX.canonicalize(canonical)
+        for start in _find_all(text_lower, phrase):
+            keywords['hard_skills'].append(skill)
+            _add_evidence(evidence, skill, start, start + len(phrase))
     
-    # Extract implied soft skills (non-obvious)
-    for key, soft_skills in SOFT_SKILL_MAPPINGS.items():
-        if key in text_lower:
-            keywords['soft_skills'].extend(soft_skills)
+    # Extract implied soft skills (non-obvious) from the existing Doc
+    soft_skill_weights = infer_soft_skills(doc, evidence, SOFT_SKILL_GRAPHS.get(language))
+    keywords['soft_skills'].extend(soft_skill_weights)
     
     # Deduplicate and clean
     for key in keywords:
         # Remove empty strings and deduplicate
         keywords[key] = list(set([k for k in keywords[key] if k and len(str(k)) > 1]))
     
+    keywords['soft_skill_weights'] = soft_skill_weights
+    keywords['evidence'] = evidence
+    keywords['partial'] = budget.partial
+    
     logger.info(f"Extracted {len(keywords['hard_skills'])} hard skills, {len(keywords['soft_skills'])} soft skills")
     return keywords
 
 
-def extract_job_title(job_desc: str) -> str:
+def compile_soft_skill_graph(mappings: Dict[str, List[str]]) -> Dict:
     """
-    Extract the job title from a job description.
+    Compile soft skill mappings into a trigger -> weighted skills graph.
+    
+    Single-word triggers match a token whose lemma (or text) starts with
+    the trigger, so 'lead' fires on 'led', 'leading' and 'leadership' but
+    never inside 'misleading'. Multi-word triggers ('head of',
+    'cross-functional') match consecutive tokens exactly, ignoring
+    punctuation. Lookups are keyed by the distinct trigger lengths, so
+    each token costs a handful of dict hits regardless of mapping size.
+    """
+    single = {}
+    phrases = {}
+    
+    for trigger, skills in mappings.items():
+        weighted = [
+            (skill, SOFT_SKILL_RANK_WEIGHTS[min(rank, len(SOFT_SKILL_RANK_WEIGHTS) - 1)])
+            for rank, skill in enumerate(skills)
+        ]
+        words = tuple(re.split(r'[\s-]+', trigger.strip()))
+        if len(words) == 1:
+            single[trigger] = weighted
+        else:
+            phrases.setdefault(words[0], []).append((words, weighted))
     
-    Looks for common patterns at the start of job postings
-    or specific title markers.
+    return {
+        'single': single,
+        'lengths': sorted({len(trigger) for trigger in single}),
+        'phrases': phrases,
+    }
+
+
+SOFT_SKILL_GRAPH = compile_soft_skill_graph(SOFT_SKILL_MAPPINGS)
+SOFT_SKILL_GRAPHS = {
+    'en': SOFT_SKILL_GRAPH,
+    **{language: compile_soft_skill_graph(mappings)
+       for language, mappings in SOFT_SKILL_MAPPINGS_BY_LANGUAGE.items()},
+}
+
+
+def infer_soft_skills(doc, evidence: Optional[Dict] = None, graph: Optional[Dict] = None) -> Dict[str, float]:
     """
-    # Common patterns for job titles
-    title_patterns = [
-        r'^([A-Z][^\n]{5,60})(?:\s*[-–—]|\n)',  # Title at start of text
-        r'(?:position|role|job title|title)[:\s]+([A-Za-z][^\n]{5,60})',
-        r'(?:hiring|looking for|seeking)[\s:]+(?:a\s+)?([A-Z][^\n]{5,50})',
-        r'^#*\s*([A-Z][^\n]{5,60})$',  # Markdown header
-    ]
+    Infer weighted soft skills from a parsed Doc in a single token pass.
     
-    lines = job_desc.strip().split('\n')
+    Every trigger occurrence adds its skills' weights, so the result is a
+    soft skill -> summed weight vector. Trigger spans are recorded in
+    `evidence` when given.
+    """
+    graph = graph or SOFT_SKILL_GRAPH
+    words = [token for token in doc if not (token.is_punct or token.is_space)]
+    weights = {}
+    
+    for i, token in enumerate(words):
+        # trigger -> (weighted skills, start, end); a dict so one token
+        # matching the same trigger via text and lemma counts once
+        fired = {}
+        
+        for form in {token.lower_, token.lemma_.lower()} - {''}:
+            for length in graph['lengths']:
+                if length > len(form):
+                    break
+                trigger = form[:length]
+                if trigger in graph['single']:
+                    fired[trigger] = (graph['single'][trigger], token.idx, token.idx + len(token.text))
+        
+        for trigger_words, skills in graph['phrases'].get(token.lower_, []):
+            window = words[i:i + len(trigger_words)]
+            if tuple(word.lower_ for word in window) == trigger_words:
+                fired[trigger_words] = (skills, token.idx, window[-1].idx + len(window[-1].text))
+        
+        for skills, start, end in fired.values():
+            for skill, weight in skills:
+                weights[skill] = weights.get(skill, 0.0) + weight
+                if evidence is not None:
+                    _add_evidence(evidence, skill, start, end)
     
-    # First, check the first non-empty line (often the title)
-    for line in lines[:5]:
-        line = line.strip()
-        if line and not line.lower().startswith(('about', 'we ', 'our ')):
-            # Clean up common suffixes
-            title = re.sub(r'\s*[-–—].*$', '', line)
-            title = re.sub(r'^#*\s*', '', title)
-            if 10 < len(title) < 80:
-                logger.info(f"Extracted job title: {title}")
-                return title
-    
-    # Try regex patterns
-    for pattern in title_patterns:
-        match = re.search(pattern, job_desc, re.MULTILINE | re.IGNORECASE)
-        if match:
-            title = match.group(1).strip()
-            if len(title) > 10:
-                logger.info(f"Extracted job title via pattern: {title}")
-                return title
+    return weights
+
+
+def _find_all(text: str, phrase: str) -> Iterable[int]:
+    """Yield the start offset of every occurrence of phrase in text."""
+    start = text.find(phrase)
+    while start != -1:
+        yield start
+        start = text.find(phrase, start + 1)
+
+
+def _add_evidence(evidence: Dict[str, List[Tuple[int, int]]], keyword: str, start: int, end: int):
+    """Record a keyword's character span, capped at MAX_EVIDENCE_SPANS."""
+    spans = evidence.setdefault(keyword, [])
+    if len(spans) < MAX_EVIDENCE_SPANS and (start, end) not in spans:
+        spans.append((start, end))
+
+
+def chunk_size_for(nlp, memory_budget_mb: Optional[int] = None) -> int:
+    """
+    Largest chunk (in characters) that fits the model and memory budget.
     
-    return "the advertised position"
+    Never exceeds spaCy's nlp.max_length, which raises on longer input.
+    """
+    budget_mb = memory_budget_mb or CHUNKING_CONFIG['memory_budget_mb']
+    budget_chars = budget_mb * CHUNKING_CONFIG['chars_per_mb']
+    return max(1, min(CHUNKING_CONFIG['chunk_chars'], nlp.max_length, budget_chars))
 
 
-def extract_company_info(job_desc: str) -> Dict[str, str]:
+def split_into_chunks(text: str, max_chars: int) -> Iterable[Tuple[int, str]]:
     """
-    Extract company name and contact info from job description.
-    Uses regex patterns for common formats.
+    Lazily split text into (offset, chunk) pairs of at most max_chars.
     
-    Non-obvious: Handles various formats like "About [Company]", 
-    "Join [Company]", company email domains, etc.
+    Prefers to cut before a markdown header, then at a blank line,
+    then at a line break, then at a space, so sections and skill
+    phrases stay intact. Offsets point back into the original text.
     """
-    info = {
-        'company_name': '',
-        'contact_email': '',
-        'location': '',
-        'job_title': extract_job_title(job_desc)
-    }
+    start = 0
+    length = len(text)
     
-    # Extract company name patterns
-    company_patterns = [
-        r'about\s+(?:us\s+at\s+)?([A-Z][a-zA-Z0-9\s&]+?)(?:\.|,|\n)',
-        r'join\s+(?:us\s+at\s+)?([A-Z][a-zA-Z0-9\s&]+?)(?:\.|,|\n)',
-        r'([A-Z][a-zA-Z0-9]+)\s+is\s+(?:a\s+)?(?:looking|hiring|seeking)',
-        r'at\s+([A-Z][a-zA-Z0-9\s&]+?)\s+we'
-    ]
+    while start < length:
+        end = min(start + max_chars, length)
+        
+        if end < length:
+            window = text[start:end]
+            for boundary in ('\n#', '\n\n', '\n', ' '):
+                cut = window.rfind(boundary)
+                # Ignore cuts so early they would produce a sliver chunk
+                if cut > max_chars // 4:
+                    end = start + cut + 1
+                    break
+        
+        yield start, text[start:end]
+        start = end
+
+
+def extract_keywords_chunked(text: str, nlp, memory_budget_mb: Optional[int] = None,
+                             language: Optional[str] = None,
+                             budget: Optional[StageBudget] = None) -> Dict[str, List[str]]:
+    """
+    Memory-bounded extract_keywords for very large inputs.
     
-    for pattern in company_patterns:
-        match = re.search(pattern, job_desc, re.IGNORECASE)
-        if match:
-            info['company_name'] = match.group(1).strip()
+    Splits at section boundaries, parses chunks with nlp.pipe in
+    batches that fit the memory budget, and merges the per-chunk
+    keyword sets. Only one batch of Docs is alive at a time. Chunks
+    share one time budget; once it expires the remaining chunks are
+    skipped and the result is marked partial.
+    """
+    budget = budget or StageBudget('keywords')
+    max_chars = chunk_size_for(nlp, memory_budget_mb)
+    budget_chars = (memory_budget_mb or CHUNKING_CONFIG['memory_budget_mb']) * CHUNKING_CONFIG['chars_per_mb']
+    batch_size = max(1, budget_chars // max_chars)
+    
+    chunks = list(split_into_chunks(text, max_chars))
+    docs = nlp.pipe((chunk.lower() for _, chunk in chunks), batch_size=batch_size)
+    
+    # Pre-seeded so an expired budget still yields every keyword list
+    merged = {key: set() for key in ('hard_skills', 'soft_skills', 'entities', 'verbs', 'nouns')}
+    soft_skill_weights = {}
+    evidence = {}
+    for (offset, chunk), doc in zip(chunks, docs):
+        if budget.expired():
             break
+        chunk_keywords = extract_keywords(chunk, nlp, doc=doc, language=language, budget=budget)
+        chunk_keywords.pop('partial')
+        # Shift chunk-local spans back onto the full text
+        for keyword, spans in chunk_keywords.pop('evidence').items():
+            for start, end in spans:
+                _add_evidence(evidence, keyword, offset + start, offset + end)
+        for skill, weight in chunk_keywords.pop('soft_skill_weights').items():
+            soft_skill_weights[skill] = soft_skill_weights.get(skill, 0.0) + weight
+        for key, values in chunk_keywords.items():
+            merged.setdefault(key, set()).update(values)
+    
+    keywords = {key: list(values) for key, values in merged.items()}
+    keywords['soft_skill_weights'] = soft_skill_weights
+    keywords['evidence'] = evidence
+    keywords['partial'] = budget.partial
+    
+    logger.info(f"Chunked extraction over {len(chunks)} chunks of <= {max_chars} chars")
+    return keywords
+
+
+def document_vector(text: str, nlp, memory_budget_mb: Optional[int] = None,
+                    budget: Optional[StageBudget] = None) -> np.ndarray:
+    """
+    Document vector for arbitrarily long text.
     
-    # Extract email
-    email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', job_desc)
-    if email_match:
-        info['contact_email'] = email_match.group()
+    Short text is parsed whole; long text is parsed chunk by chunk and
+    the chunk vectors are averaged weighted by token count, which is
+    what Doc.vector would give for the whole text. When `budget`
+    expires, the chunks parsed so far are averaged.
+    """
+    max_chars = chunk_size_for(nlp, memory_budget_mb)
+    if len(text) <= max_chars:
+        return nlp(text.lower()).vector
+    
+    total = None
+    token_count = 0
+    chunks = (chunk.lower() for _, chunk in split_into_chunks(text, max_chars))
+    for doc in nlp.pipe(chunks, batch_size=1):
+        if budget is not None and budget.expired():
+            break
+        if not len(doc):
+            continue
+        weighted = doc.vector * len(doc)
+        total = weighted if total is None else total + weighted
+        token_count += len(doc)
     
-    # Extract location (common patterns)
-    location_patterns = [
-        r'(?:location|based in|office in)[:|\s]+([A-Za-z\s,]+)',
-        r'(London|New York|San Francisco|Berlin|Remote|Hybrid)',
-    ]
+    if total is None:
+        return np.zeros((nlp.vocab.vectors_length,), dtype='float32')
+    return total / token_count
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer() -> Gazetteer:
+    """Compile the packaged place/company/title gazetteer once per process."""
+    gazetteer = Gazetteer.from_file(GAZETTEER_PATH)
+    logger.info(f"Loaded gazetteer with {gazetteer.size} entries")
+    return gazetteer
+
+
+@lru_cache(maxsize=1)
+def load_job_classifier() -> Optional[JobClassifier]:
+    """Load the shipped seniority / role-family classifier once per process."""
+    classifier = load_classifier()
+    if classifier is None:
+        logger.warning("No job classifier artifact; run train_classifier.py to build one")
+    return classifier
+
+
+def classify_job(job_text: str) -> Dict[str, Dict]:
+    """
+    Predict a posting's seniority and role family.
     
-    for pattern in location_patterns:
-        match = re.search(pattern, job_desc, re.IGNORECASE)
-        if match:
-            info['location'] = match.group(1).strip()
-            break
+    Returns {head: {'label', 'confidence'}} for each head in HEADS;
+    'label' is None when the classifier is missing or unsure.
+    
+    Non-obvious: pass boilerplate-masked text - company blurbs and
+    benefits ("leadership coaching") otherwise skew seniority.
+    """
+    classifier = load_job_classifier()
+    if classifier is None:
+        return {name: {'label': None, 'confidence': 0.0} for name in HEADS}
+    
+    predictions = classifier.predict(job_text)
+    for prediction in predictions.values():
+        prediction['confidence'] = round(prediction['confidence'], 2)
+        if prediction['confidence'] < JOB_CLASSIFIER_CONFIG['min_confidence']:
+            prediction['label'] = None
+    return predictions
+
+
+def classifier_validated(head: str) -> bool:
+    """
+    Whether a classifier head may drive decisions, not just display.
+    
+    Requires accuracy on held-out real postings saved with the artifact;
+    accuracy on the templated seed set does not count.
+    """
+    classifier = load_job_classifier()
+    validation = classifier.validation.get(head) if classifier is not None else None
+    return (validation is not None
+            and validation['examples'] >= JOB_CLASSIFIER_CONFIG['min_validated_examples']
+            and validation['accuracy'] >= JOB_CLASSIFIER_CONFIG['min_validated_accuracy'])
+
+
+def _role_phrase(seniority: Optional[str], role_family: Optional[str]) -> str:
+    """'the senior design role'-style stand-in for a missing job title."""
+    if not role_family:
+        return "the advertised position"
+    if seniority == 'executive':
+        return f"the {role_family} leadership role"
+    level = f"{seniority} " if seniority in ('junior', 'senior', 'lead') else ''
+    return f"the {level}{role_family} role"
+
+
+def extract_job_title(job_desc: str) -> str:
+    """
+    Extract the job title from a job description.
+    
+    Prefers a short title-like line at the start of the posting, then
+    a title after cues like 'hiring a' or 'looking for a'.
+    """
+    job_desc = StageBudget('company_info').clip(job_desc)
+    title = extract_posting_fields(job_desc, load_gazetteer())['job_title']
+    if title['value']:
+        logger.info(f"Extracted job title: {title['value']} ({title['confidence']:.0%})")
+        return title['value']
+    return "the advertised position"
+
+
+def extract_company_info(job_desc: str) -> Dict[str, str]:
+    """
+    Extract company name and contact info from job description.
+    
+    One gazetteer scan (see gazetteer.py) yields every field with a
+    confidence, returned under 'confidence'. 'location' falls back to
+    the work mode ('Remote') when no place is named. 'seniority' and
+    'role_family' come from the job classifier (None when unsure), and
+    name the role when no title is found.
+    
+    Non-obvious: Handles various formats like "About [Company]",
+    "Join [Company]", "[Company] Ltd", company email domains, etc.
+    Postings longer than the 'company_info' budget are clipped first.
+    """
+    job_desc = StageBudget('company_info').clip(job_desc)
+    fields = extract_posting_fields(job_desc, load_gazetteer())
+    
+    info = {name: field['value'] for name, field in fields.items()}
+    info['confidence'] = {name: field['confidence'] for name, field in fields.items()}
+    for name, prediction in classify_job(strip_boilerplate(job_desc)).items():
+        info[name] = prediction['label']
+        info['confidence'][name] = prediction['confidence']
+    if not info['job_title']:
+        info['job_title'] = _role_phrase(*(info[name] if classifier_validated(name) else None
+                                           for name in ('seniority', 'role_family')))
+    if not info['location'] and info['work_mode']:
+        info['location'] = info['work_mode'].capitalize()
+        info['confidence']['location'] = info['confidence']['work_mode']
     
     logger.info(f"Extracted company info: {info}")
     return info
 
 
+# Document vectors kept for reuse (a few KB each, however long the text)
+VECTOR_CACHE_SIZE = 2048
+_vector_cache = OrderedDict()  # (text digest, nlp) -> vector, LRU first
+_vector_cache_lock = threading.Lock()
+
+
+def _cached_vector(text: str, nlp) -> np.ndarray:
+    """
+    Document vector of text via a bounded LRU cache of vectors.
+    
+    Non-obvious: reorder_skills compares every skill line against the
+    same job text, and bulk generation compares the same skill lines
+    against many jobs, so most parses are repeats. Only the vector is
+    kept, keyed by the text's digest, so the cache never holds Docs or
+    whole CVs and postings. Returned vectors are shared - read-only.
+    """
+    key = (hashlib.sha1(text.encode('utf-8')).digest(), nlp)
+    with _vector_cache_lock:
+        vector = _vector_cache.get(key)
+        if vector is not None:
+            _vector_cache.move_to_end(key)
+            return vector
+    vector = nlp(text).vector.copy()
+    vector.flags.writeable = False
+    with _vector_cache_lock:
+        _vector_cache[key] = vector
+        while len(_vector_cache) > VECTOR_CACHE_SIZE:
+            _vector_cache.popitem(last=False)
+    return vector
+
+
 def calculate_similarity(text1: str, text2: str, nlp) -> float:
     """
     Calculate semantic similarity between two texts using spaCy.
@@ -414,14 +1383,27 @@ def calculate_similarity(text1: str, text2: str, nlp) -> float:
     Uses document vectors for comparison.
     Returns similarity score 0-1.
     """
-    doc1 = nlp(text1.lower())
-    doc2 = nlp(text2.lower())
+    budget = StageBudget('similarity')
+    text1, text2 = budget.clip(text1), budget.clip(text2)
+    max_chars = chunk_size_for(nlp)
+    if len(text1) > max_chars or len(text2) > max_chars:
+        # Large inputs: compare chunk-merged vectors, and keep them out of the cache
+        vec1 = document_vector(text1, nlp, budget=budget)
+        vec2 = document_vector(text2, nlp, budget=budget)
+        norm = np.linalg.norm(vec1) * np.linalg.norm(vec2)
+        if not norm:
+            return 0.0
+        return max(0.0, min(1.0, float(np.dot(vec1, vec2) / norm)))
+    
+    vec1 = _cached_vector(text1.lower(), nlp)
+    vec2 = _cached_vector(text2.lower(), nlp)
     
     # Handle empty documents
-    if not doc1.vector.any() or not doc2.vector.any():
+    norm = np.linalg.norm(vec1) * np.linalg.norm(vec2)
+    if not norm:
         return 0.0
     
-    similarity = doc1.similarity(doc2)
+    similarity = float(np.dot(vec1, vec2) / norm)  # What Doc.similarity computes
     return max(0.0, min(1.0, similarity))  # Clamp to 0-1
 
 
@@ -460,6 +1442,23 @@ def calculate_keyword_overlap(cv_keywords: Dict, job_keywords: Dict) -> Tuple[fl
 # RESUME GENERATION
 # =============================================================================
 
+def iter_lines(text: str) -> Iterable[str]:
+    """
+    Yield lines of text one at a time.
+    
+    Non-obvious: unlike str.split this never materialises a list of
+    every line, which matters for very large CVs and job dumps.
+    """
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
 def parse_cv_sections(cv_text: str) -> Dict[str, str]:
     """
     Parse CV text into structured sections.
@@ -471,9 +1470,7 @@ def parse_cv_sections(cv_text: str) -> Dict[str, str]:
     current_section = 'header'
     current_content = []
     
-    lines = cv_text.strip().split('\n')
-    
-    for line in lines:
+    for line in iter_lines(cv_text.strip()):
         # Check for section headers (## or #)
         if line.startswith('## '):
             # Save previous section
@@ -567,6 +1564,20 @@ def rephrase_with_keywords(text: str, keywords: List[str], nlp) -> str:
     return ''.join(result_tokens)
 
 
+def _section_matches(section_name: str, names: List[str]) -> bool:
+    """True if a CV section name matches one of a category's naming conventions."""
+    section_name = section_name.lower().strip()
+    return section_name in [n.lower() for n in names] or any(n.lower() in section_name for n in names)
+
+
+def section_category(section_name: str) -> Optional[str]:
+    """Category of a CV section (first match in RESUME_SECTION_ORDER), if any."""
+    for category, names in RESUME_SECTION_ORDER:
+        if _section_matches(section_name, names):
+            return category
+    return None
+
+
 def generate_tailored_resume(cv_sections: Dict, job_keywords: Dict, company_info: Dict, nlp) -> str:
     """
     Generate a tailored, ATS-friendly resume.
@@ -581,29 +1592,14 @@ def generate_tailored_resume(cv_sections: Dict, job_keywords: Dict, company_info
     """
     resume_parts = []
     
-    # Section name mappings (normalize different naming conventions)
-    section_order = [
-        ('header', ['header']),
-        ('summary', ['summary', 'profile', 'about']),
-        ('capabilities', ['core capabilities', 'capabilities', 'key skills', 'competencies']),
-        ('experience', ['professional experience', 'experience', 'work history', 'employment']),
-        ('earlier_career', ['earlier career', 'previous experience', 'career history']),
-        ('tools', ['tools & methods', 'tools and methods', 'tools', 'technologies', 'tech stack']),
-        ('skills', ['skills', 'technical skills', 'expertise']),
-        ('education', ['education', 'education & development', 'qualifications', 'certifications']),
-        ('personal', ['personal', 'interests', 'hobbies', 'about me']),
-    ]
-    
     # Track which sections we've processed
     processed_sections = set()
     
     # Process sections in our preferred order
-    for category, names in section_order:
+    for category, names in RESUME_SECTION_ORDER:
         for section_key, section_content in cv_sections.items():
-            section_key_lower = section_key.lower().strip()
-            
             # Check if this section matches any of our expected names
-            if section_key_lower in [n.lower() for n in names] or any(n.lower() in section_key_lower for n in names):
+            if _section_matches(section_key, names):
                 if section_key not in processed_sections:
                     processed_sections.add(section_key)
                     
@@ -634,6 +1630,185 @@ def generate_tailored_resume(cv_sections: Dict, job_keywords: Dict, company_info
     return result
 
 
+# =============================================================================
+# RESUME OPTIMISER
+# =============================================================================
+
+def estimate_line_cost(line: str) -> float:
+    """
+    Rendered height of one markdown line, in body lines.
+    
+    Uses the PDF layout estimator (wrapped lines plus spacing) when
+    reportlab is installed, and a character count otherwise.
+    """
+    try:
+        layout = _pdf_styles()
+    except ImportError:
+        line = line.strip()
+        if not line:
+            return 0.5
+        if line.startswith('#'):
+            return 1.5
+        chars = len(line.replace('**', ''))
+        return float(-(-chars // RESUME_PAGE_GEOMETRY['chars_per_line']))
+    
+    body_leading = layout['body'].leading
+    style_name, markup = markdown_line_to_markup(line)
+    if style_name == 'spacer':
+        return layout['spacer_height'] / body_leading
+    style = layout[style_name]
+    n_lines = count_wrapped_lines(markup, style, layout['frame_width'])
+    return (style.spaceBefore + n_lines * style.leading + style.spaceAfter) / body_leading
+
+
+def page_capacity() -> float:
+    """Body lines per page, matching estimate_line_cost's units."""
+    try:
+        layout = _pdf_styles()
+    except ImportError:
+        return float(RESUME_PAGE_GEOMETRY['lines_per_page'])
+    return layout['frame_height'] / layout['body'].leading
+
+
+class ResumeOptimiser:
+    """
+    Choose which bullets and skill lines to keep under a page budget.
+    
+    Each optional line (bullets in experience sections, lines in skill
+    sections) gets a keyword profile once, via nlp.pipe and
+    extract_keywords. select() maps the job's hard and soft skills to
+    bits, turns every profile into an int bitset, and runs greedy
+    weighted set cover: repeatedly keep the line with the best new
+    coverage per rendered line, weighted like SCORING_WEIGHTS. Coverage
+    is submodular, so greedy is within (1 - 1/e) of the best selection,
+    and each call is pure bit arithmetic - fast enough for a live slider.
+    Lines left unprofiled when the 'resume_optimiser' budget runs out
+    cover nothing, and `partial` is set.
+    """
+    
+    def __init__(self, resume_text: str, nlp, budget_seconds: Optional[float] = None):
+        self.lines = resume_text.split('\n')
+        self.costs = [estimate_line_cost(line) for line in self.lines]
+        
+        # Mark optional lines by the section they sit in
+        self.optional = []
+        category = None
+        for idx, line in enumerate(self.lines):
+            stripped = line.strip()
+            if stripped.startswith('## '):
+                category = section_category(stripped[3:])
+            elif category in OPTIONAL_LINE_CATEGORIES and stripped.startswith(('- ', '* ', '**')):
+                self.optional.append(idx)
+        
+        # Keyword profile per non-empty line (fixed lines cover keywords too)
+        content = [idx for idx, line in enumerate(self.lines) if line.strip()]
+        budget = StageBudget('resume_optimiser', seconds=budget_seconds)
+        texts = [budget.clip(self.lines[idx]) for idx in content]
+        docs = nlp.pipe(text.lower() for text in texts)
+        self.profiles = {}
+        for idx, text, doc in zip(content, texts, docs):
+            if budget.expired():
+                break
+            keywords = extract_keywords(text, nlp, doc=doc)
+            self.profiles[idx] = (set(keywords['hard_skills']), set(keywords['soft_skills']))
+        self.partial = budget.partial
+    
+    def select(self, job_keywords: Dict, max_pages: float, base_scores: Optional[Dict] = None) -> Dict:
+        """
+        Best resume for the job within max_pages.
+        
+        Returns {'resume', 'kept', 'dropped', 'pages', 'scores'}. Scores
+        are estimated from the line profiles (no NLP); structure and
+        relevance are carried over from `base_scores` when given.
+        """
+        # One bit per job keyword, weighted like the ATS score components
+        hard_weights = _job_hard_weights(job_keywords)
+        job_hard = sorted(hard_weights)
+        hard_total = sum(hard_weights.values()) or 1.0
+        soft_weights = _job_soft_weights(job_keywords)
+        job_soft = sorted(soft_weights)
+        soft_total = sum(soft_weights.values()) or 1.0
+        
+        bits = {('hard', kw): i for i, kw in enumerate(job_hard)}
+        bits.update({('soft', kw): len(job_hard) + i for i, kw in enumerate(job_soft)})
+        bit_weights = (
+            [SCORING_WEIGHTS['keywords'] * hard_weights[kw] / hard_total for kw in job_hard] +
+            [SCORING_WEIGHTS['soft_skills'] * soft_weights[kw] / soft_total for kw in job_soft]
+        )
+        
+        def mask_of(idx: int) -> int:
+            hard, soft = self.profiles.get(idx, (set(), set()))
+            mask = 0
+            for key in [('hard', kw) for kw in hard] + [('soft', kw) for kw in soft]:
+                if key in bits:
+                    mask |= 1 << bits[key]
+            return mask
+        
+        def weight_of(mask: int) -> float:
+            total = 0.0
+            while mask:
+                low = mask & -mask
+                total += bit_weights[low.bit_length() - 1]
+                mask ^= low
+            return total
+        
+        optional = set(self.optional)
+        masks = {idx: mask_of(idx) for idx in range(len(self.lines))}
+        capacity = page_capacity()
+        budget = max_pages * capacity
+        
+        # Fixed lines are always kept and cover what they cover
+        kept = {idx for idx in range(len(self.lines)) if idx not in optional}
+        used = sum(self.costs[idx] for idx in kept)
+        covered = 0
+        for idx in kept:
+            covered |= masks.get(idx, 0)
+        
+        # Greedy weighted set cover by marginal gain per rendered line
+        # (ties go to the earlier line, i.e. the more recent role)
+        candidates = set(optional)
+        while candidates:
+            best, best_ratio = None, 0.0
+            for idx in sorted(candidates):
+                if used + self.costs[idx] > budget:
+                    continue
+                ratio = weight_of(masks[idx] & ~covered) / self.costs[idx]
+                if ratio > best_ratio:
+                    best, best_ratio = idx, ratio
+            if best is None or best_ratio == 0.0:
+                break
+            kept.add(best)
+            candidates.discard(best)
+            used += self.costs[best]
+            covered |= masks[best]
+        
+        # Spend any remaining budget on lines in CV order (most recent first)
+        for idx in sorted(candidates):
+            if used + self.costs[idx] <= budget:
+                kept.add(idx)
+                used += self.costs[idx]
+        
+        cv_hard = {kw for kw in job_hard if covered >> bits[('hard', kw)] & 1}
+        cv_soft = {kw for kw in job_soft if covered >> bits[('soft', kw)] & 1}
+        scores = dict(base_scores or {'structure': 0.0, 'relevance': 0.0})
+        scores['keywords'], scores['soft_skills'] = score_keyword_components(cv_hard, cv_soft, job_keywords)
+        scores['total'] = round(sum(scores[key] * weight for key, weight in SCORING_WEIGHTS.items()), 1)
+        
+        return {
+            'resume': '\n'.join(line for idx, line in enumerate(self.lines) if idx in kept),
+            'kept': len(optional & kept),
+            'dropped': len(optional - kept),
+            'pages': used / capacity,
+            'scores': scores,
+        }
+
+
+@st.cache_resource(max_entries=4)
+def load_resume_optimiser(resume_text: str, _nlp) -> ResumeOptimiser:
+    """Profile (once per resume text) the lines the optimiser can choose from."""
+    return ResumeOptimiser(resume_text, _nlp)
+
+
 # =============================================================================
 # COVER LETTER GENERATION
 # =============================================================================
@@ -648,7 +1823,11 @@ def extract_cv_highlights(cv_text: str) -> Dict[str, str]:
     - key_achievements: List of notable achievements
     - years_experience: Approximate years
     - summary: Professional summary
+    
+    Achievement scanning stops early when the 'cv_highlights' budget runs out.
     """
+    budget = StageBudget('cv_highlights')
+    cv_text = budget.clip(cv_text)
     highlights = {
         'current_role': '',
         'current_company': '',
@@ -657,10 +1836,8 @@ def extract_cv_highlights(cv_text: str) -> Dict[str, str]:
         'summary': ''
     }
     
-    lines = cv_text.split('\n')
-    
     # Find first job entry (### pattern)
-    for i, line in enumerate(lines):
+    for line in iter_lines(cv_text):
         if line.startswith('### '):
             # Parse: ### Job Title | Company | Dates
             job_line = line.replace('### ', '').strip()
@@ -672,7 +1849,7 @@ def extract_cv_highlights(cv_text: str) -> Dict[str, str]:
     
     # Find summary (first paragraph after name)
     in_header = True
-    for line in lines:
+    for line in iter_lines(cv_text):
         if line.startswith('## '):
             in_header = False
             break
@@ -685,12 +1862,15 @@ def extract_cv_highlights(cv_text: str) -> Dict[str, str]:
     # Find key achievements (lines with $, %, numbers)
     achievement_patterns = [
         r'\$[\d]+[MBK]?',  # Dollar amounts
-        r'\d+%',  # Percentages
-        r'\d+→\d+',  # Growth notation
+        # (?<!\d) anchors digit runs, so a long number fails in linear time
+        r'(?<!\d)\d+%',  # Percentages
+        r'(?<!\d)\d+→\d+',  # Growth notation
         r'(?:won|winner|award)',  # Awards
     ]
     
-    for line in lines:
+    for line in iter_lines(cv_text):
+        if budget.expired():
+            break
         if line.strip().startswith('-') or line.strip().startswith('**Impact'):
             for pattern in achievement_patterns:
                 if re.search(pattern, line, re.IGNORECASE):
@@ -705,18 +1885,42 @@ def extract_cv_highlights(cv_text: str) -> Dict[str, str]:
     return highlights
 
 
-def generate_cover_letter(cv_sections: Dict, job_keywords: Dict, company_info: Dict, user_info: Dict, cv_text: str = '') -> str:
-    """
-    Generate a tailored cover letter using actual CV content and job details.
-    
-    Structure:
-    - Greeting (personalized with company name)
-    - Intro paragraph (why you're a fit)
-    - Body (2-3 paragraphs with specific examples from CV)
+# Cover letter template, compiled once and filled per job
+COVER_LETTER_TEMPLATE = Template("""$user_name
+$user_email
+$date
+
+Dear Hiring Manager$at_company,
+
+I am writing to express my strong interest in the **$job_title** position$at_company. $summary
+
+In my most recent role as **$current_role** at **$current_company**, I have developed deep expertise in $skills_text.$achievement_text
+
+My background spans both strategic leadership and hands-on delivery, which allows me to $approach. I am particularly drawn to this opportunity because of $motivation.
+
+Thank you for considering my application. I would welcome the opportunity to discuss how my experience and approach could benefit $organization.
+
+Best regards,
+$user_name
+""")
+
+LEADERSHIP_TITLE_WORDS = ['head', 'director', 'lead', 'senior', 'manager', 'principal']
+
+
+def generate_cover_letter(cv_sections: Dict, job_keywords: Dict, company_info: Dict, user_info: Dict,
+                          cv_text: str = '', cv_highlights: Optional[Dict] = None) -> str:
+    """
+    Generate a tailored cover letter using actual CV content and job details.
+    
+    Structure:
+    - Greeting (personalized with company name)
+    - Intro paragraph (why you're a fit)
+    - Body (2-3 paragraphs with specific examples from CV)
     - Closing
     
     Non-obvious: Ties transferable skills to requirements,
     only uses info from CV (ethical/truthful).
+    Pass precomputed `cv_highlights` to skip re-scanning the CV.
     """
     company_name = company_info.get('company_name', 'your company')
     job_title = company_info.get('job_title', 'the advertised position')
@@ -724,7 +1928,8 @@ def generate_cover_letter(cv_sections: Dict, job_keywords: Dict, company_info: D
     user_email = user_info.get('email', '')
     
     # Extract highlights from actual CV
-    cv_highlights = extract_cv_highlights(cv_text)
+    if cv_highlights is None:
+        cv_highlights = extract_cv_highlights(cv_text)
     current_role = cv_highlights.get('current_role', 'my current role')
     current_company = cv_highlights.get('current_company', 'my current company')
     summary = cv_highlights.get('summary', '')
@@ -739,35 +1944,482 @@ def generate_cover_letter(cv_sections: Dict, job_keywords: Dict, company_info: D
     if achievements:
         achievement_text = ' Key highlights include: ' + '; '.join(achievements[:2]) + '.'
     
-    # Personalize based on job type detection
-    is_leadership = any(word in job_title.lower() for word in ['head', 'director', 'lead', 'senior', 'manager', 'principal'])
-    is_design = any(word in job_title.lower() for word in ['design', 'ux', 'ui', 'product'])
+    # Personalize based on job type detection (the classifier only when the title gives no signal)
+    is_leadership = any(word in job_title.lower() for word in LEADERSHIP_TITLE_WORDS)
+    seniority = company_info.get('seniority')
+    if not is_leadership and seniority and classifier_validated('seniority'):
+        is_leadership = seniority in JOB_CLASSIFIER_CONFIG['leadership_levels']
+    has_company = company_name != 'your company'
+    
+    letter = COVER_LETTER_TEMPLATE.substitute(
+        user_name=user_name,
+        user_email=user_email,
+        date=datetime.now().strftime('%B %d, %Y'),
+        at_company=f' at {company_name}' if has_company else '',
+        job_title=job_title,
+        summary=summary if summary else 'With extensive experience in design leadership across financial services and technology, I am confident in my ability to contribute significantly to your team.',
+        current_role=current_role,
+        current_company=current_company,
+        skills_text=skills_text,
+        achievement_text=achievement_text,
+        approach='scale teams and establish design practices while maintaining craft quality' if is_leadership else 'contribute immediately while also thinking strategically about design systems and user experience',
+        motivation='the chance to shape design direction at a senior level' if is_leadership else 'the focus on creating exceptional user experiences',
+        organization=company_name if has_company else 'your organization',
+    )
     
-    letter = f"""{user_name}
-{user_email}
-{datetime.now().strftime('%B %d, %Y')}
+    return letter.strip()
 
-Dear Hiring Manager{f' at {company_name}' if company_name != 'your company' else ''},
 
-I am writing to express my strong interest in the **{job_title}** position{f' at {company_name}' if company_name != 'your company' else ''}. {summary if summary else 'With extensive experience in design leadership across financial services and technology, I am confident in my ability to contribute significantly to your team.'}
+# =============================================================================
+# BULK GENERATION
+# =============================================================================
 
-In my most recent role as **{current_role}** at **{current_company}**, I have developed deep expertise in {skills_text}.{achievement_text}
+def _slugify(text: str, max_length: int = 40) -> str:
+    """Turn a job title or company name into a safe archive folder name."""
+    slug = re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+    return slug[:max_length].rstrip('-') or 'job'
 
-My background spans both strategic leadership and hands-on delivery, which allows me to {'scale teams and establish design practices while maintaining craft quality' if is_leadership else 'contribute immediately while also thinking strategically about design systems and user experience'}. I am particularly drawn to this opportunity because of {'the chance to shape design direction at a senior level' if is_leadership else 'the focus on creating exceptional user experiences'}.
 
-Thank you for considering my application. I would welcome the opportunity to discuss how my experience and approach could benefit {company_name if company_name != 'your company' else 'your organization'}.
+def generate_bulk_applications(cv_text: str, job_descriptions: Iterable[str], user_info: Dict,
+                               nlp, output_path: str, demand_store: Optional[DemandStore] = None,
+                               role_families: Optional[Iterable[str]] = None,
+                               doc_freqs: Optional[DocumentFrequencies] = None) -> List[Dict]:
+    """
+    Generate tailored resumes and cover letters for many jobs in one pass.
+    
+    CV-derived parts (sections, highlights) are computed once, job
+    boilerplate is masked against the app's boilerplate index, job
+    descriptions in nlp's language are parsed together via nlp.pipe
+    (others with their own language's pipeline, and postings longer
+    than one chunk via the chunked extractor), and each job's files
+    are written to the zip archive at `output_path` as soon as they are
+    rendered. Jobs are streamed from `job_descriptions`, so only one
+    pipe batch is held at a time and memory stays flat however many
+    jobs are passed. Each job's skills are counted in `demand_store`
+    and `doc_freqs` when given.
+    
+    With `role_families`, postings the job classifier confidently puts
+    in another family are skipped before any spaCy parsing (once its
+    role-family head is validated on real postings; until then every
+    posting is kept).
+    
+    Archive layout:
+    - NNN-<job-title>/resume.md
+    - NNN-<job-title>/cover_letter.txt
+    - manifest.json (job title, company and folder per job)
+    
+    Returns the manifest entries.
+    """
+    cv_sections = parse_cv_sections(cv_text)
+    cv_highlights = extract_cv_highlights(cv_text)
+    boilerplate_index = load_boilerplate_index()
+    
+    if role_families is not None and not classifier_validated('role_family'):
+        logger.warning("Job classifier not validated on real postings; role_families ignored")
+        role_families = None
+    # Unsure predictions (label None) are kept: skipping is only for clear mismatches
+    keep_labels = set(role_families) | {None} if role_families is not None else None
+    skipped = 0
+    
+    # Only postings that fit one chunk are piped; longer ones take the chunked,
+    # memory-bounded path, and each pipe batch fits the memory budget
+    chunk_chars = chunk_size_for(nlp)
+    budget_chars = CHUNKING_CONFIG['memory_budget_mb'] * CHUNKING_CONFIG['chars_per_mb']
+    
+    def prepared_jobs():
+        """(text to pipe, job context) per job; '' is piped for jobs parsed elsewhere."""
+        nonlocal skipped
+        for job_desc in job_descriptions:
+            if not job_desc.strip():
+                continue
+            job_core, _ = strip_job_boilerplate(job_desc, boilerplate_index)
+            job_core = StageBudget('keywords').clip(job_core)
+            if keep_labels is not None and classify_job(job_core)['role_family']['label'] not in keep_labels:
+                skipped += 1
+                continue
+            language = detect_language(job_desc)
+            pipe = language == nlp.lang and len(job_core) <= chunk_chars
+            yield (job_core.lower() if pipe else ''), (job_desc, job_core, language, pipe)
+    
+    job_docs = nlp.pipe(prepared_jobs(), as_tuples=True, batch_size=max(1, budget_chars // chunk_chars))
+    
+    manifest = []
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for idx, (job_doc, (job_desc, job_core, language, pipe)) in enumerate(job_docs, start=1):
+            if pipe:
+                job_keywords = extract_keywords(job_core, nlp, doc=job_doc)
+            else:
+                job_nlp = nlp if language == nlp.lang else load_model_cache().get(language) or nlp
+                job_keywords = extract_keywords(job_core, job_nlp, language=language)
+            company_info = extract_company_info(job_desc)
+            if demand_store is not None:
+                record_job_demand(demand_store, job_desc, job_keywords, company_info)
+            if doc_freqs is not None:
+                record_document_frequencies(doc_freqs, job_keywords)
+            
+            resume = generate_tailored_resume(cv_sections, job_keywords, company_info, nlp)
+            letter = generate_cover_letter(cv_sections, job_keywords, company_info, user_info,
+                                           cv_highlights=cv_highlights)
+            
+            folder = f"{idx:03d}-{_slugify(company_info['job_title'])}"
+            archive.writestr(f'{folder}/resume.md', resume)
+            archive.writestr(f'{folder}/cover_letter.txt', letter)
+            
+            manifest.append({
+                'folder': folder,
+                'job_title': company_info['job_title'],
+                'company_name': company_info['company_name'],
+            })
+        
+        archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+    
+    if skipped:
+        logger.info(f"Skipped {skipped} jobs outside {sorted(role_families)}")
+    logger.info(f"Generated {len(manifest)} applications into {output_path}")
+    return manifest
 
-Best regards,
-{user_name}
-"""
+
+# =============================================================================
+# JOB BOILERPLATE
+# =============================================================================
+
+@st.cache_resource
+def load_boilerplate_index() -> BoilerplateIndex:
+    """Open the on-disk index of paragraphs repeated across postings."""
+    return BoilerplateIndex(DATA_DIR / 'job_boilerplate.sqlite3')
+
+
+def strip_job_boilerplate(job_text: str, index: Optional[BoilerplateIndex] = None) -> Tuple[str, List[Dict]]:
+    """
+    Mask a posting's boilerplate so only role content reaches NLP.
     
-    return letter.strip()
+    Returns (core_text, spans). core_text has the same length and
+    offsets as job_text, so keyword evidence still highlights the
+    original posting. The posting is counted in `index` first, which is
+    how company boilerplate becomes recognisable after a few postings.
+    """
+    if index is not None:
+        index.observe(job_text)
+    spans = find_boilerplate(job_text, index)
+    if spans:
+        logger.info(f"Masked {len(spans)} boilerplate spans "
+                    f"({sum(span['end'] - span['start'] for span in spans)} chars)")
+    return mask_spans(job_text, spans), spans
+
+
+# =============================================================================
+# NEAR-DUPLICATE JOBS
+# =============================================================================
+
+@st.cache_resource
+def load_dedup_index() -> NearDuplicateIndex:
+    """Open the on-disk near-duplicate job index (shared across reruns)."""
+    return NearDuplicateIndex(DATA_DIR / 'job_dedup.sqlite3')
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def analyze_job(job_text: str, nlp, dedup_index: Optional[NearDuplicateIndex] = None,
+                language: Optional[str] = None, core_text: Optional[str] = None) -> Tuple[Dict, Dict, Optional[Dict]]:
+    """
+    Extract job keywords and company info, reusing a near-duplicate's analysis.
+    
+    Returns (job_keywords, company_info, duplicate). `duplicate` is None
+    for a new posting, else the index match with the earlier 'score'.
+    Keywords come from `core_text` (boilerplate masked) when given;
+    company info always uses the full posting.
+    
+    Non-obvious: evidence offsets are only reused for an identical text;
+    a reworded repost keeps the canonical keywords but no job evidence.
+    """
+    duplicate = dedup_index.find_duplicate(job_text) if dedup_index is not None else None
+    
+    if duplicate is None:
+        job_keywords = extract_keywords(core_text or job_text, nlp, language=language)
+        return job_keywords, extract_company_info(job_text), None
+    
+    analysis = duplicate['analysis']
+    job_keywords = dict(analysis['job_keywords'])
+    if analysis.get('text_hash') != _text_hash(job_text):
+        job_keywords['evidence'] = {}
+    
+    logger.info(f"Job is a near-duplicate of #{duplicate['id']} ({duplicate['similarity']:.0%})")
+    return job_keywords, analysis['company_info'], duplicate
+
+
+def remember_job_analysis(dedup_index: NearDuplicateIndex, job_text: str, job_keywords: Dict,
+                          company_info: Dict, score: float) -> Optional[int]:
+    """Store a newly analysed posting as canonical for future near-duplicates (None if not indexable)."""
+    return dedup_index.add(job_text, {
+        'text_hash': _text_hash(job_text),
+        'job_keywords': job_keywords,
+        'company_info': company_info,
+        'score': score,
+    })
+
+
+# =============================================================================
+# SIMILAR JOBS
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def _embedding_vectorizer() -> HashingVectorizer:
+    # Signed hashing is itself a sparse random projection: colliding
+    # features cancel out on average, so cosine similarity is preserved
+    return HashingVectorizer(n_features=VECTOR_STORE_CONFIG['dim'], ngram_range=(1, 2),
+                             alternate_sign=True, stop_words='english')
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Fixed-size float32 embeddings for the job vector store.
+    
+    Word unigrams and bigrams hashed straight into
+    VECTOR_STORE_CONFIG['dim'] signed buckets. Unlike spaCy vectors,
+    these need no model and are identical in every process, so rows
+    stored by one run stay comparable with queries from the next.
+    """
+    return _embedding_vectorizer().transform(texts).toarray().astype(np.float32)
+
+
+@st.cache_resource
+def load_vector_store() -> VectorStore:
+    """Map the on-disk job vector store (shared across sessions)."""
+    config = VECTOR_STORE_CONFIG
+    return VectorStore(DATA_DIR / f"job_vectors_{config['dtype']}", config['dim'], dtype=config['dtype'],
+                       tables=config['tables'], bits=config['bits'],
+                       brute_force_below=config['brute_force_below'])
+
+
+def similar_jobs(store: VectorStore, dedup_index: NearDuplicateIndex, text: str,
+                 exclude: Iterable[int] = (), k: Optional[int] = None) -> List[Dict]:
+    """
+    Stored postings most similar to text (a CV or a job's core text).
+    
+    Returns [{'id', 'similarity', 'job_title', 'company_name', 'score',
+    'created_at'}], best first; 'score' is the ATS score the posting got
+    when it was first analysed.
+    """
+    matches = store.search(embed_texts([text])[0], k=k or VECTOR_STORE_CONFIG['top_k'], exclude=exclude)
+    postings = dedup_index.get(posting_id for posting_id, _ in matches)
+    
+    results = []
+    for posting_id, similarity in matches:
+        posting = postings.get(posting_id)
+        if posting is None:
+            continue
+        analysis = posting['analysis']
+        results.append({
+            'id': posting_id,
+            'similarity': similarity,
+            'job_title': analysis['company_info'].get('job_title', ''),
+            'company_name': analysis['company_info'].get('company_name', ''),
+            'score': analysis['score'],
+            'created_at': posting['created_at'],
+        })
+    return results
+
+
+# =============================================================================
+# SKILL DEMAND
+# =============================================================================
+
+@st.cache_resource
+def load_demand_store() -> DemandStore:
+    """Open the on-disk skill demand counts (shared across sessions)."""
+    return DemandStore(DATA_DIR / 'skill_demand.sqlite3', sketch_capacity=DEMAND_CONFIG['sketch_capacity'])
+
+
+def record_job_demand(store: DemandStore, job_text: str, job_keywords: Dict, company_info: Dict) -> bool:
+    """
+    Count a posting's extracted skills towards demand analytics.
+    
+    Keyed by the posting's text hash, so re-analysing the same text is
+    a no-op; callers skip near-duplicates so reposts count once.
+    """
+    return store.record(_text_hash(job_text), job_keywords,
+                        company=company_info.get('company_name') or '',
+                        location=company_info.get('location') or '')
+
+
+# =============================================================================
+# WATCHED JOBS
+# =============================================================================
+
+@st.cache_resource
+def load_watch_results() -> Optional[ResultsStore]:
+    """The folder watcher's results store, or None if it has never run."""
+    if not WATCH_CONFIG['results_path'].exists():
+        return None
+    return ResultsStore(WATCH_CONFIG['results_path'])
+
+
+def ingested_jobs(store: Optional[ResultsStore]) -> List[Dict]:
+    """Recently ingested postings, best scored first."""
+    if store is None:
+        return []
+    jobs = store.recent(WATCH_CONFIG['sidebar_jobs'])
+    return sorted(jobs, key=lambda job: -(job['score'] or 0.0))
+
+
+# =============================================================================
+# VERSION HISTORY
+# =============================================================================
+
+# Session state holding each kind's text, and its editor widget key
+HISTORY_EDITORS = {
+    'resume': ('tailored_resume', 'resume_editor'),
+    'letter': ('cover_letter', 'letter_editor'),
+}
+
+
+@st.cache_resource
+def load_history_store() -> HistoryStore:
+    """Open the resume and letter history once per process."""
+    return HistoryStore(HISTORY_CONFIG['path'])
+
+
+def set_editor_text(kind: str, text: str):
+    """
+    Put a resume or letter's text in session state and in its editor.
+    
+    The editors are keyed widgets without value=, so their session
+    state is the content shown. Call before the editor renders in a run
+    (from a callback or above the results panels).
+    """
+    state_key, editor_key = HISTORY_EDITORS[kind]
+    st.session_state[state_key] = text
+    st.session_state[editor_key] = text
+
+
+def job_reference(job_text: str, company_info: Dict) -> Dict:
+    """The posting a version was made for, as stored with it."""
+    return {
+        'hash': hashlib.sha1(job_text.encode('utf-8')).hexdigest(),
+        'title': company_info.get('job_title'),
+        'company': company_info.get('company_name'),
+    }
+
+
+def save_version(kind: str, text: str, source: str = 'edited') -> Optional[int]:
+    """
+    Store the session's current resume or letter in the history.
+    
+    Skipped when the text is unchanged since this session last saved
+    that kind, so reruns never add duplicate versions. The stored score
+    is the one on screen for this application.
+    """
+    digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    if not text.strip() or st.session_state.history_saved.get(kind) == digest:
+        return None
+    st.session_state.history_saved[kind] = digest
+    scores = st.session_state.scores
+    return load_history_store().save(kind, text, base=st.session_state.history_base, source=source,
+                                     score=scores['total'] if scores else None,
+                                     job=st.session_state.history_job)
+
+
+# =============================================================================
+# KEYWORD WEIGHTING
+# =============================================================================
+
+@st.cache_resource
+def load_document_frequencies() -> DocumentFrequencies:
+    """Open the persistent skill document frequencies once per process."""
+    return DocumentFrequencies(DATA_DIR / 'skill_doc_freqs', TERM_NAMES)
+
+
+def _term_ids(kind: str, skills: Iterable[str]) -> List[Optional[int]]:
+    """Corpus statistics term ID per skill (None outside the taxonomy)."""
+    if kind == 'hard':
+        return [SKILL_INDEX.skill_id(skill) for skill in skills]
+    return [SOFT_SKILL_TERM_IDS.get(skill) for skill in skills]
+
+
+def record_document_frequencies(doc_freqs: DocumentFrequencies, job_keywords: Dict):
+    """Count a newly analysed posting's skills in the corpus statistics."""
+    ids = _term_ids('hard', job_keywords['hard_skills']) + _term_ids('soft', job_keywords['soft_skills'])
+    doc_freqs.add(term_id for term_id in ids if term_id is not None)
+
+
+def idf_weights(doc_freqs: DocumentFrequencies, job_keywords: Dict) -> Dict[str, Dict[str, float]]:
+    """
+    IDF weight of each of a job's skills: {'hard': {skill: idf}, 'soft': {...}}.
+    
+    Set the result as job_keywords['idf_weights'] to make scoring favour
+    rare, discriminating skills. Skills outside the taxonomy weigh as
+    if never seen.
+    
+    Non-obvious: one array lookup over the job's own skill IDs; cost
+    does not grow with the corpus.
+    """
+    unseen = float(np.log(1.0 + doc_freqs.documents) + 1.0)
+    weights = {}
+    for kind in ('hard', 'soft'):
+        skills = job_keywords[f'{kind}_skills']
+        ids = _term_ids(kind, skills)
+        idf = iter(doc_freqs.idf(term_id for term_id in ids if term_id is not None))
+        weights[kind] = {skill: float(next(idf)) if term_id is not None else unseen
+                         for skill, term_id in zip(skills, ids)}
+    return weights
+
+
+def weight_job_keywords(job_keywords: Dict, doc_freqs: Optional[DocumentFrequencies] = None) -> Dict:
+    """
+    Attach IDF weights to a job's keywords before scoring, and return them.
+    
+    Every scoring path (generate, recalculate, watcher, batch) goes
+    through here, so one CV/job pair gets the same score whichever path
+    produced it. Uses the process-wide document frequencies by default.
+    """
+    job_keywords['idf_weights'] = idf_weights(doc_freqs or load_document_frequencies(), job_keywords)
+    return job_keywords
 
 
 # =============================================================================
 # SCORING SYSTEM
 # =============================================================================
 
+def _job_hard_weights(job_keywords: Dict) -> Dict[str, float]:
+    """Job hard skill weights: IDF when attached (see idf_weights), else uniform."""
+    idf = job_keywords.get('idf_weights', {}).get('hard', {})
+    return {skill: idf.get(skill, 1.0) for skill in job_keywords['hard_skills']}
+
+
+def _job_soft_weights(job_keywords: Dict) -> Dict[str, float]:
+    """
+    Job soft skill weights: inference weight times IDF when attached,
+    treating keyword dicts without weights as uniform.
+    """
+    weights = job_keywords.get('soft_skill_weights') or dict.fromkeys(job_keywords['soft_skills'], 1.0)
+    idf = job_keywords.get('idf_weights', {}).get('soft', {})
+    return {skill: weight * idf.get(skill, 1.0) for skill, weight in weights.items()}
+
+
+def score_keyword_components(cv_hard: set, cv_soft: set, job_keywords: Dict) -> Tuple[float, float]:
+    """
+    Keyword and soft skill components (0-100) of the ATS score.
+    
+    Hard skills: weighted share of job hard skills present in the CV.
+    Soft skills: weighted by how strongly the job implies each skill.
+    Both are also IDF-weighted when job_keywords carries 'idf_weights',
+    so matching a rare skill counts for more than a common one.
+    """
+    job_hard_weights = _job_hard_weights(job_keywords)
+    matched_hard = cv_hard.intersection(job_hard_weights)
+    job_hard_total = sum(job_hard_weights.values()) or 1.0
+    keywords_score = min(sum(job_hard_weights[s] for s in matched_hard) / job_hard_total, 1.0) * 100
+    
+    job_soft_weights = _job_soft_weights(job_keywords)
+    matched_soft = cv_soft.intersection(job_soft_weights)
+    job_soft_total = sum(job_soft_weights.values()) or 1.0
+    soft_score = min(sum(job_soft_weights[s] for s in matched_soft) / job_soft_total, 1.0) * 100
+    
+    return keywords_score, soft_score
+
+
 def calculate_ats_score(cv_text: str, job_text: str, cv_keywords: Dict, job_keywords: Dict, nlp) -> Dict:
     """
     Calculate comprehensive ATS match score with breakdown.
@@ -782,15 +2434,10 @@ def calculate_ats_score(cv_text: str, job_text: str, cv_keywords: Dict, job_keyw
     """
     scores = {}
     
-    # 1. Keyword Match (hard skills)
-    hard_skill_overlap = len(set(cv_keywords['hard_skills']).intersection(set(job_keywords['hard_skills'])))
-    job_hard_count = max(len(job_keywords['hard_skills']), 1)
-    scores['keywords'] = min(hard_skill_overlap / job_hard_count, 1.0) * 100
-    
-    # 2. Soft Skills Match
-    soft_skill_overlap = len(set(cv_keywords['soft_skills']).intersection(set(job_keywords['soft_skills'])))
-    job_soft_count = max(len(job_keywords['soft_skills']), 1)
-    scores['soft_skills'] = min(soft_skill_overlap / job_soft_count, 1.0) * 100
+    # 1-2. Keyword Match (hard skills) and Soft Skills Match
+    scores['keywords'], scores['soft_skills'] = score_keyword_components(
+        set(cv_keywords['hard_skills']), set(cv_keywords['soft_skills']), job_keywords
+    )
     
     # 3. Structure Check
     cv_sections = parse_cv_sections(cv_text)
@@ -818,85 +2465,330 @@ def calculate_ats_score(cv_text: str, job_text: str, cv_keywords: Dict, job_keyw
     
     # Add matched/missing details
     scores['matched_keywords'] = list(set(cv_keywords['hard_skills']).intersection(set(job_keywords['hard_skills'])))
-    scores['missing_keywords'] = list(set(job_keywords['hard_skills']) - set(cv_keywords['hard_skills']))
+    # Highest-weighted (rarest, with IDF) missing skills first
+    hard_weights = _job_hard_weights(job_keywords)
+    scores['missing_keywords'] = sorted(set(job_keywords['hard_skills']) - set(cv_keywords['hard_skills']),
+                                        key=lambda kw: (-hard_weights[kw], kw))
+    scores['evidence'] = build_evidence_index(cv_keywords, job_keywords)
+    scores['partial'] = bool(cv_keywords.get('partial') or job_keywords.get('partial'))
     
     logger.info(f"ATS Score calculated: {scores['total']}%")
     return scores
 
 
 # =============================================================================
-# PDF EXPORT
+# SCORE EXPLAINABILITY
 # =============================================================================
 
-def export_to_pdf(content: str, filename: str) -> bytes:
+def build_evidence_index(cv_keywords: Dict, job_keywords: Dict) -> Dict[str, Dict]:
     """
-    Export content to PDF using reportlab.
+    Index where every scored keyword was found in the CV and job text.
     
-    Uses simple, ATS-friendly formatting:
-    - Standard fonts (Helvetica)
-    - No tables, images, or colors
-    - Clean structure with proper spacing
+    Built from the spans recorded during extract_keywords, so nothing is
+    re-scanned. Returns keyword -> {'category', 'matched', 'cv', 'job'}
+    where 'cv' and 'job' are lists of (start, end) character offsets.
     """
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-        from reportlab.lib.units import inch
+    cv_evidence = cv_keywords.get('evidence', {})
+    job_evidence = job_keywords.get('evidence', {})
+    index = {}
+    
+    for category in ['hard_skills', 'soft_skills']:
+        cv_set = set(cv_keywords.get(category, []))
+        job_set = set(job_keywords.get(category, []))
+        for keyword in job_set | cv_set:
+            index.setdefault(keyword, {
+                'category': category,
+                'matched': keyword in cv_set and keyword in job_set,
+                'cv': cv_evidence.get(keyword, []),
+                'job': job_evidence.get(keyword, []),
+            })
+    
+    return index
+
+
+def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort spans and merge any that overlap or touch."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def render_highlighted(text: str, spans: List[Tuple[int, int]]) -> str:
+    """
+    Render text as HTML with the given spans wrapped in <mark>.
+    
+    Pure slicing on stored offsets - no regex or NLP pass.
+    """
+    parts = []
+    cursor = 0
+    for start, end in _merge_spans(spans):
+        parts.append(html.escape(text[cursor:start]))
+        parts.append(f'<mark>{html.escape(text[start:end])}</mark>')
+        cursor = end
+    parts.append(html.escape(text[cursor:]))
+    return ''.join(parts).replace('\n', '<br>')
+
+
+def evidence_snippets(text: str, spans: List[Tuple[int, int]], context: int = 60) -> List[str]:
+    """
+    Short HTML snippets around each span, for jumping to a keyword's evidence.
+    """
+    snippets = []
+    for start, end in _merge_spans(spans):
+        left = max(0, start - context)
+        right = min(len(text), end + context)
+        snippet = (
+            ('…' if left > 0 else '') +
+            html.escape(text[left:start]) +
+            f'<mark>{html.escape(text[start:end])}</mark>' +
+            html.escape(text[end:right]) +
+            ('…' if right < len(text) else '')
+        )
+        snippets.append(snippet.replace('\n', ' '))
+    return snippets
+
+
+# =============================================================================
+# GAP RECOMMENDER
+# =============================================================================
+
+# Share of the similarity coming from spaCy vectors (rest is character TF-IDF)
+GAP_SEMANTIC_WEIGHT = 0.5
+
+
+def extract_cv_bullets(cv_sections: Dict[str, str]) -> List[Dict[str, str]]:
+    """
+    Candidate lines to reword: bullets, role lines and skill lines.
+    
+    Returns [{'section', 'line'}] in CV order, skipping the header.
+    """
+    bullets = []
+    for section, content in cv_sections.items():
+        if section == 'header':
+            continue
+        for line in iter_lines(content):
+            line = line.strip()
+            if line.startswith(('- ', '* ', '### ', '**')) and len(line) > 10:
+                bullets.append({'section': section, 'line': line.lstrip('-*# ').replace('**', '').strip()})
+    return bullets
+
+
+class GapRecommender:
+    """
+    Nearest-bullet search for missing job keywords.
+    
+    Every CV line is embedded once into a cached matrix (character
+    n-gram TF-IDF, blended with spaCy document vectors when the model
+    has them). recommend() embeds the missing keywords and ranks all
+    lines for all keywords with one matrix product, so a 100-line CV
+    and 40 keywords answer well within interactive latency. If the
+    'gap_recommender' budget runs out while embedding, the lexical part
+    is used alone.
+    """
+    
+    def __init__(self, cv_text: str, nlp):
+        self.nlp = nlp
+        self.budget = StageBudget('gap_recommender')
+        self.bullets = extract_cv_bullets(parse_cv_sections(cv_text))
+        lines = [self.budget.clip(bullet['line']).lower() for bullet in self.bullets]
         
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, 
-                               leftMargin=0.75*inch, rightMargin=0.75*inch,
-                               topMargin=0.75*inch, bottomMargin=0.75*inch)
+        self.vectorizer = None
+        self.matrix = None
+        if not lines:
+            return
+        
+        # Character n-grams match 'prototype' to 'prototyping' and survive typos
+        self.vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), sublinear_tf=True)
+        lexical = self.vectorizer.fit_transform(lines).toarray()
+        
+        semantic = self._doc_vectors(lines)
+        self.use_semantic = semantic is not None
+        self.matrix = self._blend(lexical, semantic).astype(np.float32)
+        self._keyword_cache = {}
+    
+    def _doc_vectors(self, texts: List[str]) -> Optional[np.ndarray]:
+        if not self.nlp.vocab.vectors_length:
+            return None
+        vectors = []
+        for doc in self.nlp.pipe(texts):
+            if self.budget.expired():
+                return None
+            vectors.append(doc.vector)
+        vectors = np.array(vectors)
+        if not vectors.any():
+            return None
+        return vectors
+    
+    @staticmethod
+    def _normalise(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def _blend(self, lexical: np.ndarray, semantic: Optional[np.ndarray]) -> np.ndarray:
+        """Concatenate normalised parts so a dot product is a weighted cosine."""
+        lexical = self._normalise(lexical)
+        if semantic is None:
+            return lexical
+        return np.hstack([
+            lexical * np.sqrt(1 - GAP_SEMANTIC_WEIGHT),
+            self._normalise(semantic) * np.sqrt(GAP_SEMANTIC_WEIGHT),
+        ])
+    
+    def _embed_keywords(self, keywords: List[str]) -> np.ndarray:
+        new = [kw for kw in keywords if kw not in self._keyword_cache]
+        if new:
+            lexical = self.vectorizer.transform([kw.lower() for kw in new]).toarray()
+            semantic = None
+            if self.use_semantic:
+                semantic = np.array([doc.vector for doc in self.nlp.pipe(kw.lower() for kw in new)])
+            for kw, row in zip(new, self._blend(lexical, semantic)):
+                self._keyword_cache[kw] = row.astype(np.float32)
+        return np.array([self._keyword_cache[kw] for kw in keywords])
+    
+    def recommend(self, missing_keywords: List[str], top_k: int = 3) -> Dict[str, List[Dict]]:
+        """
+        Top-k CV lines most related to each missing keyword.
         
-        styles = getSampleStyleSheet()
+        Returns keyword -> [{'section', 'line', 'score'}], best first.
+        """
+        if self.matrix is None or not missing_keywords:
+            return {kw: [] for kw in missing_keywords}
         
+        scores = self._embed_keywords(missing_keywords) @ self.matrix.T
+        k = min(top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        
+        recommendations = {}
+        for row, keyword in enumerate(missing_keywords):
+            ranked = sorted(top[row], key=lambda col: -scores[row, col])
+            recommendations[keyword] = [
+                {**self.bullets[col], 'score': float(scores[row, col])}
+                for col in ranked if scores[row, col] > 0
+            ]
+        return recommendations
+
+
+@st.cache_resource(max_entries=8)
+def load_gap_recommender(cv_text: str, _nlp) -> GapRecommender:
+    """Build (once per CV text) the cached bullet matrix."""
+    return GapRecommender(cv_text, _nlp)
+
+
+@st.cache_data(max_entries=32)
+def gap_recommendations(cv_text: str, missing_keywords: Tuple[str, ...], _nlp) -> Dict[str, List[Dict]]:
+    """Placement suggestions for the missing keywords, memoised per CV and keyword set."""
+    return load_gap_recommender(cv_text, _nlp).recommend(list(missing_keywords), top_k=2)
+
+
+# =============================================================================
+# PDF EXPORT
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def _pdf_styles() -> Dict:
+    """
+    Page geometry and paragraph styles shared by export_to_pdf and estimate_layout.
+    
+    Raises ImportError when reportlab is not installed.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    
+    styles = getSampleStyleSheet()
+    margin = 0.75 * inch
+    frame_padding = 6  # SimpleDocTemplate's frame pads each side by 6pt
+    
+    return {
+        'pagesize': A4,
+        'margin': margin,
+        'frame_width': A4[0] - 2 * margin - 2 * frame_padding,
+        'frame_height': A4[1] - 2 * margin - 2 * frame_padding,
+        'spacer_height': 6,
         # Custom styles for ATS-friendly format
-        title_style = ParagraphStyle(
+        'title': ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=16,
             spaceAfter=6
-        )
-        
-        heading_style = ParagraphStyle(
+        ),
+        'heading': ParagraphStyle(
             'CustomHeading',
             parent=styles['Heading2'],
             fontSize=12,
             spaceBefore=12,
             spaceAfter=6
-        )
-        
-        body_style = ParagraphStyle(
+        ),
+        'body': ParagraphStyle(
             'CustomBody',
             parent=styles['Normal'],
             fontSize=10,
             leading=14
-        )
+        ),
+    }
+
+
+def markdown_line_to_markup(line: str) -> Tuple[str, str]:
+    """
+    Map one markdown line to (style, reportlab markup).
+    
+    style is 'spacer', 'title', 'heading' or 'body'.
+    """
+    line = line.strip()
+    
+    if not line:
+        return 'spacer', ''
+    elif line.startswith('# '):
+        return 'title', line[2:]
+    elif line.startswith('## '):
+        return 'heading', line[3:]
+    elif line.startswith('### '):
+        return 'body', f"<b>{line[4:]}</b>"
+    elif line.startswith('**') and line.endswith('**'):
+        return 'body', f"<b>{line[2:-2]}</b>"
+    elif line.startswith('- '):
+        return 'body', f"• {line[2:]}"
+    elif line.startswith('*') and line.endswith('*'):
+        return 'body', f"<i>{line[1:-1]}</i>"
+    else:
+        # Clean markdown formatting
+        clean_line = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', line)
+        clean_line = re.sub(r'\*(.*?)\*', r'<i>\1</i>', clean_line)
+        return 'body', clean_line
+
+
+def export_to_pdf(content: str, filename: str) -> bytes:
+    """
+    Export content to PDF using reportlab.
+    
+    Uses simple, ATS-friendly formatting:
+    - Standard fonts (Helvetica)
+    - No tables, images, or colors
+    - Clean structure with proper spacing
+    """
+    try:
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        
+        layout = _pdf_styles()
+        
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=layout['pagesize'],
+                               leftMargin=layout['margin'], rightMargin=layout['margin'],
+                               topMargin=layout['margin'], bottomMargin=layout['margin'])
         
         story = []
         
-        for line in content.split('\n'):
-            line = line.strip()
-            
-            if not line:
-                story.append(Spacer(1, 6))
-            elif line.startswith('# '):
-                story.append(Paragraph(line[2:], title_style))
-            elif line.startswith('## '):
-                story.append(Paragraph(line[3:], heading_style))
-            elif line.startswith('### '):
-                story.append(Paragraph(f"<b>{line[4:]}</b>", body_style))
-            elif line.startswith('**') and line.endswith('**'):
-                story.append(Paragraph(f"<b>{line[2:-2]}</b>", body_style))
-            elif line.startswith('- '):
-                story.append(Paragraph(f"• {line[2:]}", body_style))
-            elif line.startswith('*') and line.endswith('*'):
-                story.append(Paragraph(f"<i>{line[1:-1]}</i>", body_style))
+        for line in iter_lines(content):
+            style, markup = markdown_line_to_markup(line)
+            if style == 'spacer':
+                story.append(Spacer(1, layout['spacer_height']))
             else:
-                # Clean markdown formatting
-                clean_line = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', line)
-                clean_line = re.sub(r'\*(.*?)\*', r'<i>\1</i>', clean_line)
-                story.append(Paragraph(clean_line, body_style))
+                story.append(Paragraph(markup, layout[style]))
         
         doc.build(story)
         buffer.seek(0)
@@ -910,10 +2802,472 @@ def export_to_pdf(content: str, filename: str) -> bytes:
         return None
 
 
+def pdf_export_available() -> bool:
+    """Whether reportlab is installed (checked without building a PDF)."""
+    try:
+        _pdf_styles()
+        return True
+    except ImportError:
+        return False
+
+
+@st.cache_data(max_entries=16)
+def cached_pdf(content: str, filename: str) -> bytes:
+    """export_to_pdf memoised by content, so unchanged documents are never rebuilt."""
+    return export_to_pdf(content, filename) or b''
+
+
+# =============================================================================
+# LAYOUT ESTIMATION
+# =============================================================================
+
+# Helvetica variants by (bold, italic), matching reportlab's <b>/<i> mapping
+_HELVETICA_FACES = {
+    (False, False): 'Helvetica',
+    (True, False): 'Helvetica-Bold',
+    (False, True): 'Helvetica-Oblique',
+    (True, True): 'Helvetica-BoldOblique',
+}
+
+
+@lru_cache(maxsize=65536)
+def _text_width(text: str, font_name: str) -> float:
+    """Width of text at 1pt in a standard font (scale by font size)."""
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    return stringWidth(text, font_name, 1.0)
+
+
+def _markup_words(markup: str, base_bold: bool) -> List[Tuple[float, float]]:
+    """
+    Split markup into words as (width at 1pt, width of the preceding space).
+    
+    A word may span <b>/<i> runs (e.g. '<b>Design:</b>'), as in reportlab.
+    """
+    words = []
+    bold, italic = base_bold, False
+    word_width = 0.0
+    space_width = 0.0
+    pending_space = 0.0
+    
+    for part in re.split(r'(</?[bi]>)', markup):
+        if part in ('<b>', '</b>'):
+            bold = base_bold or part == '<b>'
+            continue
+        if part in ('<i>', '</i>'):
+            italic = part == '<i>'
+            continue
+        font = _HELVETICA_FACES[(bold, italic)]
+        for piece in re.split(r'(\s+)', part):
+            if not piece:
+                continue
+            if piece.isspace():
+                if word_width:
+                    words.append((word_width, space_width))
+                    word_width = 0.0
+                pending_space = _text_width(' ', font)
+            else:
+                if not word_width:
+                    space_width = pending_space if words else 0.0
+                word_width += _text_width(piece, font)
+    
+    if word_width:
+        words.append((word_width, space_width))
+    return words
+
+
+def count_wrapped_lines(markup: str, style, width: float) -> int:
+    """
+    Predict how many lines reportlab will break a paragraph into.
+    
+    Greedy word fill with cached Helvetica metrics, like Paragraph.wrap,
+    including its tolerance: each word already on a line lets the line
+    overrun by spaceShrinkage x the width of a space.
+    """
+    base_bold = style.fontName.endswith('Bold')
+    size = style.fontSize
+    shrink = getattr(style, 'spaceShrinkage', 0) * _text_width(' ', style.fontName) * size
+    lines = 0
+    line_width = 0.0
+    line_words = 0
+    
+    for word_width, space_width in _markup_words(markup, base_bold):
+        word_width *= size
+        new_width = line_width + space_width * size + word_width
+        if line_words and new_width <= width + shrink * line_words:
+            line_width = new_width
+            line_words += 1
+            continue
+        lines += 1
+        if word_width > width:
+            # Long words are split across lines (splitLongWords)
+            lines += int(word_width // width)
+            word_width %= width
+        line_width = word_width
+        line_words = 1
+    
+    return max(lines, 1)
+
+
+def estimate_layout(content: str) -> Optional[Dict]:
+    """
+    Predict export_to_pdf's page count without building the PDF.
+    
+    Replays reportlab's frame rules with the same styles: spaceBefore is
+    dropped at the top of a page and overlaps the previous spaceAfter,
+    paragraphs split across pages by line, and a paragraph never leaves
+    a single orphan line at the bottom of a page.
+    
+    Returns {'pages', 'fill', 'lines', 'sections'} where 'fill' is the
+    fractional page count and each section is {'title', 'lines',
+    'start_page', 'end_page'}, or None without reportlab.
+    """
+    try:
+        layout = _pdf_styles()
+    except ImportError:
+        return None
+    
+    frame_height = layout['frame_height']
+    remaining = frame_height
+    page = 1
+    at_top = True
+    prev_space_after = 0.0
+    total_lines = 0
+    sections = [{'title': 'header', 'lines': 0, 'start_page': 1, 'end_page': 1}]
+    
+    def new_page():
+        nonlocal remaining, page, at_top, prev_space_after
+        page += 1
+        remaining = frame_height
+        at_top = True
+        prev_space_after = 0.0
+    
+    for line in iter_lines(content):
+        style_name, markup = markdown_line_to_markup(line)
+        
+        if style_name == 'spacer':
+            height = layout['spacer_height']
+            if height > remaining + 1e-6:
+                new_page()
+            remaining -= height
+            at_top = False
+            prev_space_after = 0.0
+            continue
+        
+        style = layout[style_name]
+        if style_name in ('title', 'heading'):
+            sections.append({'title': markup, 'lines': 0, 'start_page': page, 'end_page': page})
+        
+        n_lines = count_wrapped_lines(markup, style, layout['frame_width'])
+        space_before = 0.0 if at_top else max(style.spaceBefore - prev_space_after, 0.0)
+        
+        # Split across pages line by line (no single orphan line)
+        while space_before + n_lines * style.leading > remaining + 1e-6:
+            fit = int((remaining - space_before + 1e-6) // style.leading)
+            if fit >= 2 or (fit >= 1 and at_top):
+                n_lines -= fit
+                sections[-1]['lines'] += fit
+                total_lines += fit
+            new_page()
+            space_before = 0.0
+        
+        remaining -= space_before + n_lines * style.leading + style.spaceAfter
+        prev_space_after = style.spaceAfter
+        at_top = False
+        sections[-1]['lines'] += n_lines
+        sections[-1]['end_page'] = page
+        total_lines += n_lines
+    
+    return {
+        'pages': page,
+        'fill': page - 1 + (frame_height - remaining) / frame_height,
+        'lines': total_lines,
+        'sections': [section for section in sections if section['lines']],
+    }
+
+
 # =============================================================================
 # STREAMLIT UI
 # =============================================================================
 
+def _use_optimised_resume(resume: str):
+    """Button callback: swap the editor content for the optimised resume."""
+    set_editor_text('resume', resume)
+
+
+def _restore_version(version: Dict):
+    """Button callback: load a stored version into its editor."""
+    text = load_history_store().load(version['id'])
+    set_editor_text(version['kind'], text)
+    st.session_state.history_saved[version['kind']] = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    st.session_state.history_job = {'hash': version['job_hash'], 'title': version['job_title'],
+                                    'company': version['company_name']}
+
+
+def _version_label(version: Dict) -> str:
+    job = version['job_title'] or 'untitled job'
+    if version['company_name']:
+        job += f" at {version['company_name']}"
+    score = f" · {version['score']:.0f}%" if version['score'] is not None else ''
+    return f"{version['created_at'][:16].replace('T', ' ')} · {version['kind']} ({version['source']}) · {job}{score}"
+
+
+def render_version_history(kind: Optional[str] = None):
+    """Saved versions (of one kind, or all) with a restore button."""
+    store = load_history_store()
+    versions = store.versions(kind, limit=HISTORY_CONFIG['listed_versions'])
+    if not versions:
+        return
+    with st.expander("🕘 Version History"):
+        version = st.selectbox(
+            "Saved versions",
+            versions,
+            format_func=_version_label,
+            key=f"history_{kind or 'all'}"
+        )
+        st.button("↩️ Restore This Version", on_click=_restore_version, args=(version,),
+                  key=f"restore_{kind or 'all'}")
+        stats = store.stats()
+        st.caption(f"{stats['versions']} versions of {stats['raw_chars'] / 1024:.0f} KB stored in "
+                   f"{stats['stored_bytes'] / 1024:.0f} KB")
+
+
+def render_page_estimate(content: str):
+    """Live page count caption under an editor (no PDF build)."""
+    layout = estimate_layout(content)
+    if layout is None:
+        return
+    caption = f"📄 {layout['pages']} page{'s' if layout['pages'] != 1 else ''} ({layout['fill']:.2f} pages filled)"
+    spilled = [section['title'] for section in layout['sections']
+               if section['end_page'] > section['start_page']]
+    if spilled:
+        caption += f" · split across pages: {', '.join(spilled)}"
+    st.caption(caption)
+
+
+def render_demand_dashboard(store: DemandStore, cv_skills: Iterable[str]):
+    """'What's in demand' tab: rising skills and the CV's coverage of top skills."""
+    if not len(store):
+        st.info("No postings recorded yet - skill demand builds up as you analyse jobs.")
+        return
+    
+    window = recent_weeks(DEMAND_CONFIG['window_weeks'])
+    top_n = DEMAND_CONFIG['top_n']
+    coverage = store.coverage(cv_skills, n=top_n, buckets=window)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric(f"🗂️ Postings (last {len(window)} weeks)", store.total_postings('week', window))
+    col2.metric(f"✅ Top {top_n} skills on your CV", f"{coverage['share']:.0%}")
+    col3.metric("⚖️ Demand-weighted coverage", f"{coverage['weighted_share']:.0%}")
+    
+    col_rising, col_missing = st.columns(2)
+    with col_rising:
+        st.markdown("**📈 Rising skills**")
+        rising = store.rising_skills(DEMAND_CONFIG['recent_weeks'], DEMAND_CONFIG['baseline_weeks'])
+        for item in rising:
+            st.markdown(f"- **{item['skill']}** {item['baseline_share']:.0%} → {item['recent_share']:.0%} of postings")
+        if not rising:
+            st.caption("Not enough weeks of postings yet.")
+    with col_missing:
+        st.markdown("**❌ In-demand skills missing from your CV**")
+        for item in coverage['missing']:
+            st.markdown(f"- **{item['skill']}** ({item['share']:.0%} of postings)")
+        if not coverage['missing']:
+            st.caption("Your CV covers every top skill.")
+    
+    with st.expander("🔤 Frequent terms outside the skill taxonomy"):
+        terms = store.emerging_terms(recent_weeks(DEMAND_CONFIG['recent_weeks']), n=top_n)
+        st.write(", ".join(f"{term} ({count})" for term, count, _ in terms) or "None yet")
+
+
+@st.fragment
+def render_score_panel(nlp):
+    """Score metrics, keyword analysis, evidence and similar jobs for the last scoring."""
+    scores = st.session_state.scores
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        score_class = "score-high" if scores['total'] >= SCORE_THRESHOLDS['high'] else "score-medium" if scores['total'] >= SCORE_THRESHOLDS['medium'] else "score-low"
+        st.metric("🎯 ATS Score", f"{scores['total']}%")
+    
+    with col2:
+        st.metric("🔧 Keywords", f"{scores['keywords']:.0f}%")
+    
+    with col3:
+        st.metric("🤝 Soft Skills", f"{scores['soft_skills']:.0f}%")
+    
+    with col4:
+        st.metric("📋 Structure", f"{scores['structure']:.0f}%")
+    
+    if scores.get('partial'):
+        st.warning("⏱️ Input too large or unusual to analyse in full - scores cover the part "
+                   "processed within the time and size budget.")
+    
+    # Keyword details
+    with st.expander("📊 Keyword Analysis"):
+        col_match, col_miss = st.columns(2)
+        with col_match:
+            st.markdown("**✅ Matched Keywords:**")
+            st.write(", ".join(scores['matched_keywords']) or "None")
+        with col_miss:
+            st.markdown("**❌ Missing Keywords:**")
+            st.write(", ".join(scores['missing_keywords'][:10]) or "None")
+        
+        if scores['missing_keywords']:
+            st.markdown("**💡 Where to add missing keywords:**")
+            recommendations = gap_recommendations(st.session_state.scored_texts['cv'],
+                                                  tuple(scores['missing_keywords']), nlp)
+            for keyword, lines in recommendations.items():
+                if lines:
+                    suggestions = "; ".join(f"_{item['line']}_ ({item['section'].title()})" for item in lines)
+                    st.markdown(f"- **{keyword}** → {suggestions}")
+    
+    # Keyword evidence (rendered from stored offsets, no re-scan)
+    evidence = scores.get('evidence', {})
+    if evidence:
+        with st.expander("🔍 Keyword Evidence"):
+            keyword = st.selectbox(
+                "Jump to keyword",
+                sorted(evidence, key=lambda k: (not evidence[k]['matched'], k)),
+                format_func=lambda k: f"{'✅' if evidence[k]['matched'] else '❌'} {k}"
+            )
+            entry = evidence[keyword]
+            texts = st.session_state.scored_texts
+            
+            col_cv, col_job = st.columns(2)
+            with col_cv:
+                st.markdown(f"**Your CV** ({len(entry['cv'])} found)")
+                for snippet in evidence_snippets(texts['cv'], entry['cv']) or ["Not found"]:
+                    st.markdown(snippet, unsafe_allow_html=True)
+            with col_job:
+                st.markdown(f"**Job Description** ({len(entry['job'])} found)")
+                for snippet in evidence_snippets(texts['job'], entry['job']) or ["Not found"]:
+                    st.markdown(snippet, unsafe_allow_html=True)
+            
+            if st.checkbox("Show full highlighted job description"):
+                st.markdown(render_highlighted(texts['job'], entry['job']), unsafe_allow_html=True)
+    
+    # Similar earlier postings from the job vector store
+    similar = st.session_state.similar_jobs
+    if similar and (similar['posting'] or similar['cv']):
+        with st.expander("🧭 Similar Jobs"):
+            for heading, key in (("**Postings like this one:**", 'posting'),
+                                 ("**Jobs closest to your CV:**", 'cv')):
+                if similar[key]:
+                    st.markdown(heading)
+                    for job in similar[key]:
+                        st.markdown(f"- {job['job_title']} at {job['company_name'] or 'unknown company'} "
+                                    f"({job['similarity']:.0%} similar, scored {job['score']}% "
+                                    f"on {job['created_at'][:10]})")
+
+
+def render_pdf_download(content: str, filename: str, label: str = "📥 Download as PDF"):
+    """PDF download button that builds the PDF only when clicked (and once per content)."""
+    if not pdf_export_available():
+        st.info("PDF export requires reportlab. Run: pip install reportlab")
+        return
+    st.download_button(
+        label,
+        data=partial(cached_pdf, content, filename),
+        file_name=filename,
+        mime="application/pdf"
+    )
+
+
+@st.fragment
+def render_resume_panel(nlp, job_input: str):
+    """Resume editor, page budget optimiser, rescoring and exports."""
+    st.markdown("### Tailored Resume (Editable)")
+    edited_resume = st.text_area(
+        "Edit your resume below:",
+        height=500,
+        key="resume_editor"
+    )
+    render_page_estimate(edited_resume)
+    save_version('resume', edited_resume)
+    render_version_history('resume')
+    
+    # Page budget optimiser (selection is pure bit arithmetic, so it tracks the slider live)
+    if st.session_state.job_keywords:
+        with st.expander("📏 Fit to Page Budget"):
+            max_pages = st.slider("Page budget", 0.5, 3.0, 2.0, 0.25)
+            optimiser = load_resume_optimiser(edited_resume, nlp)
+            result = optimiser.select(st.session_state.job_keywords, max_pages, st.session_state.scores)
+            
+            col_opt1, col_opt2, col_opt3 = st.columns(3)
+            col_opt1.metric("🎯 Estimated ATS Score", f"{result['scores']['total']}%")
+            col_opt2.metric("📄 Estimated Pages", f"{result['pages']:.1f}")
+            col_opt3.metric("✂️ Lines Dropped", result['dropped'])
+            
+            if optimiser.partial:
+                st.caption("⏱️ Some lines were not profiled within the time budget and count as covering nothing.")
+            st.text_area("Optimised resume preview", value=result['resume'], height=300, disabled=True)
+            st.button("✅ Use Optimised Version", on_click=_use_optimised_resume, args=(result['resume'],))
+    
+    # Update score button (a full rerun, so the score panel shows the new scores)
+    if st.button("🔄 Recalculate Score"):
+        cv_nlp, cv_language = pipeline_for(edited_resume, nlp)
+        job_nlp, job_language = pipeline_for(job_input, nlp)
+        job_core, _ = strip_job_boilerplate(job_input, load_boilerplate_index())
+        cv_keywords = extract_keywords(edited_resume, cv_nlp, language=cv_language)
+        job_keywords = weight_job_keywords(extract_keywords(job_core, job_nlp, language=job_language))
+        st.session_state.scores = calculate_ats_score(
+            edited_resume, job_core, cv_keywords, job_keywords, cv_nlp
+        )
+        st.session_state.scored_texts = {'cv': edited_resume, 'job': job_input}
+        st.session_state.job_keywords = job_keywords
+        st.rerun()
+    
+    # Export buttons
+    col_exp1, col_exp2, col_exp3 = st.columns(3)
+    
+    with col_exp1:
+        st.download_button(
+            "📥 Download as Markdown",
+            data=edited_resume,
+            file_name="resume.md",
+            mime="text/markdown"
+        )
+    
+    with col_exp2:
+        st.download_button(
+            "📥 Download as TXT",
+            data=edited_resume.replace('**', '').replace('##', '').replace('#', ''),
+            file_name="resume.txt",
+            mime="text/plain"
+        )
+    
+    with col_exp3:
+        render_pdf_download(edited_resume, "resume.pdf")
+
+
+@st.fragment
+def render_letter_panel():
+    """Cover letter editor and exports."""
+    st.markdown("### Cover Letter (Editable)")
+    edited_letter = st.text_area(
+        "Edit your cover letter below:",
+        height=400,
+        key="letter_editor"
+    )
+    render_page_estimate(edited_letter)
+    save_version('letter', edited_letter)
+    render_version_history('letter')
+    
+    col_let1, col_let2 = st.columns(2)
+    
+    with col_let1:
+        st.download_button(
+            "📥 Download Cover Letter",
+            data=edited_letter,
+            file_name="cover_letter.txt",
+            mime="text/plain"
+        )
+    
+    with col_let2:
+        render_pdf_download(edited_letter, "cover_letter.pdf")
+
+
 def main():
     """
     Main Streamlit application.
@@ -942,6 +3296,22 @@ def main():
         st.session_state.cover_letter = ''
     if 'scores' not in st.session_state:
         st.session_state.scores = None
+    if 'scored_texts' not in st.session_state:
+        st.session_state.scored_texts = {'cv': '', 'job': ''}
+    if 'job_keywords' not in st.session_state:
+        st.session_state.job_keywords = None
+    if 'similar_jobs' not in st.session_state:
+        st.session_state.similar_jobs = None
+    if 'cv_skills' not in st.session_state:
+        st.session_state.cv_skills = []
+    if 'history_saved' not in st.session_state:
+        st.session_state.history_saved = {}
+    if 'history_job' not in st.session_state:
+        st.session_state.history_job = None
+    # Editors are seeded once; after that their session state is their content
+    for state_key, editor_key in HISTORY_EDITORS.values():
+        if editor_key not in st.session_state:
+            st.session_state[editor_key] = st.session_state[state_key]
     
     # Load NLP model
     nlp = load_spacy_model()
@@ -978,9 +3348,21 @@ def main():
         
         # Job Description Input
         st.markdown("### 💼 Job Description")
+        job_value = SAMPLE_JOB_DESCRIPTION
+        watch_results = load_watch_results()
+        ingested = ingested_jobs(watch_results)
+        if ingested:
+            picked = st.selectbox(
+                "📥 Or load a job from the watched folder",
+                [None] + ingested,
+                format_func=lambda job: "-" if job is None else
+                f"{job['score']:.0f}% · {job['job_title']} ({Path(job['path']).name})"
+            )
+            if picked is not None:
+                job_value = watch_results.text(picked['id'])
         job_input = st.text_area(
             "Paste the job description",
-            value=SAMPLE_JOB_DESCRIPTION,
+            value=job_value,
             height=200,
             help="Include requirements, responsibilities, etc."
         )
@@ -1006,153 +3388,113 @@ def main():
         st.warning("⚠️ Please provide a job description in the sidebar.")
         st.stop()
     
+    # Bound every later stage, including the ones without their own budget
+    max_input_chars = INPUT_GUARDS['max_input_chars']
+    if len(cv_input) > max_input_chars or len(job_input) > max_input_chars:
+        st.warning(f"✂️ Inputs are truncated to {max_input_chars:,} characters.")
+        cv_input, job_input = cv_input[:max_input_chars], job_input[:max_input_chars]
+    
+    # Saved versions are stored as deltas against the CV in the sidebar
+    st.session_state.history_base = cv_input
+    
     # Process on button click
     if generate_btn:
         with st.spinner("🔍 Analyzing job requirements..."):
-            # Extract keywords
-            cv_keywords = extract_keywords(cv_input, nlp)
-            job_keywords = extract_keywords(job_input, nlp)
-            company_info = extract_company_info(job_input)
+            # Extract keywords (near-duplicate postings reuse the earlier analysis)
+            dedup_index = load_dedup_index()
+            cv_nlp, cv_language = pipeline_for(cv_input, nlp)
+            job_nlp, job_language = pipeline_for(job_input, nlp)
+            job_core, boilerplate_spans = strip_job_boilerplate(job_input, load_boilerplate_index())
+            cv_keywords = extract_keywords(cv_input, cv_nlp, language=cv_language)
+            job_keywords, company_info, duplicate = analyze_job(job_input, job_nlp, dedup_index,
+                                                                language=job_language, core_text=job_core)
+            doc_freqs = load_document_frequencies()
+            weight_job_keywords(job_keywords, doc_freqs)
             
             # Parse CV
             cv_sections = parse_cv_sections(cv_input)
             
             # Generate tailored resume
-            st.session_state.tailored_resume = generate_tailored_resume(
+            set_editor_text('resume', generate_tailored_resume(
                 cv_sections, job_keywords, company_info, nlp
-            )
+            ))
             
             # Generate cover letter
             user_info = {'name': user_name, 'email': user_email}
-            st.session_state.cover_letter = generate_cover_letter(
+            set_editor_text('letter', generate_cover_letter(
                 cv_sections, job_keywords, company_info, user_info, cv_input
-            )
+            ))
             
             # Calculate scores
             st.session_state.scores = calculate_ats_score(
-                cv_input, job_input, cv_keywords, job_keywords, nlp
+                cv_input, job_core, cv_keywords, job_keywords, cv_nlp
             )
+            st.session_state.scored_texts = {'cv': cv_input, 'job': job_input}
+            st.session_state.job_keywords = job_keywords
+            st.session_state.cv_skills = cv_keywords['hard_skills']
             
-            st.success("✅ Resume and cover letter generated!")
-    
-    # Display results if available
-    if st.session_state.tailored_resume:
-        
-        # Score Display
-        if st.session_state.scores:
-            scores = st.session_state.scores
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                score_class = "score-high" if scores['total'] >= 80 else "score-medium" if scores['total'] >= 60 else "score-low"
-                st.metric("🎯 ATS Score", f"{scores['total']}%")
+            vector_store = load_vector_store()
+            if duplicate is None:
+                posting_id = remember_job_analysis(dedup_index, job_input, job_keywords, company_info,
+                                                   st.session_state.scores['total'])
+                if posting_id is not None:  # None: no words to index
+                    vector_store.add(posting_id, embed_texts([job_core])[0])
+                record_job_demand(load_demand_store(), job_input, job_keywords, company_info)
+                record_document_frequencies(doc_freqs, job_keywords)
+            else:
+                posting_id = duplicate['id']
+                st.info(f"👀 Seen before on {duplicate['created_at'][:10]} "
+                        f"({duplicate['similarity']:.0%} similar) - earlier score: "
+                        f"{duplicate['analysis']['score']}%")
             
-            with col2:
-                st.metric("🔧 Keywords", f"{scores['keywords']:.0f}%")
+            # Earlier postings near this one and near the CV (approximate search)
+            exclude = [posting_id] if posting_id is not None else []
+            st.session_state.similar_jobs = {
+                'posting': similar_jobs(vector_store, dedup_index, job_core, exclude=exclude),
+                'cv': similar_jobs(vector_store, dedup_index, cv_input, exclude=exclude),
+            }
             
-            with col3:
-                st.metric("🤝 Soft Skills", f"{scores['soft_skills']:.0f}%")
+            # Keep both drafts in the local history
+            st.session_state.history_job = job_reference(job_input, company_info)
+            save_version('resume', st.session_state.tailored_resume, source='generated')
+            save_version('letter', st.session_state.cover_letter, source='generated')
             
-            with col4:
-                st.metric("📋 Structure", f"{scores['structure']:.0f}%")
+            if boilerplate_spans:
+                headings = sorted({span['heading'] or 'repeated text' for span in boilerplate_spans})
+                st.caption(f"🧹 Ignored job boilerplate: {', '.join(headings)}")
+            job_class = [company_info.get(name) for name in HEADS if company_info.get(name)]
+            if job_class:
+                st.caption(f"🏷️ Looks like: {' / '.join(job_class)}")
+            if {cv_language, job_language} != {LANGUAGE_DETECTION['default']}:
+                st.caption(f"🌐 Detected languages - CV: {cv_language}, job: {job_language}")
             
-            # Keyword details
-            with st.expander("📊 Keyword Analysis"):
-                col_match, col_miss = st.columns(2)
-                with col_match:
-                    st.markdown("**✅ Matched Keywords:**")
-                    st.write(", ".join(scores['matched_keywords']) or "None")
-                with col_miss:
-                    st.markdown("**❌ Missing Keywords:**")
-                    st.write(", ".join(scores['missing_keywords'][:10]) or "None")
+            st.success("✅ Resume and cover letter generated!")
+    
+    # Display results if available; each panel is a fragment, so editing
+    # or interacting with one reruns only that panel
+    if st.session_state.tailored_resume or st.session_state.cover_letter:
+        
+        if st.session_state.scores:
+            render_score_panel(nlp)
         
         st.divider()
         
         # Resume Editor
-        tab1, tab2 = st.tabs(["📄 Tailored Resume", "✉️ Cover Letter"])
+        tab1, tab2, tab3 = st.tabs(["📄 Tailored Resume", "✉️ Cover Letter", "📈 Skill Demand"])
         
         with tab1:
-            st.markdown("### Tailored Resume (Editable)")
-            edited_resume = st.text_area(
-                "Edit your resume below:",
-                value=st.session_state.tailored_resume,
-                height=500,
-                key="resume_editor"
-            )
-            
-            # Update score button
-            if st.button("🔄 Recalculate Score"):
-                cv_keywords = extract_keywords(edited_resume, nlp)
-                job_keywords = extract_keywords(job_input, nlp)
-                st.session_state.scores = calculate_ats_score(
-                    edited_resume, job_input, cv_keywords, job_keywords, nlp
-                )
-                st.rerun()
-            
-            # Export buttons
-            col_exp1, col_exp2, col_exp3 = st.columns(3)
-            
-            with col_exp1:
-                st.download_button(
-                    "📥 Download as Markdown",
-                    data=edited_resume,
-                    file_name="resume.md",
-                    mime="text/markdown"
-                )
-            
-            with col_exp2:
-                st.download_button(
-                    "📥 Download as TXT",
-                    data=edited_resume.replace('**', '').replace('##', '').replace('#', ''),
-                    file_name="resume.txt",
-                    mime="text/plain"
-                )
-            
-            with col_exp3:
-                pdf_bytes = export_to_pdf(edited_resume, "resume.pdf")
-                if pdf_bytes:
-                    st.download_button(
-                        "📥 Download as PDF",
-                        data=pdf_bytes,
-                        file_name="resume.pdf",
-                        mime="application/pdf"
-                    )
-                else:
-                    st.info("PDF export requires reportlab. Run: pip install reportlab")
+            render_resume_panel(nlp, job_input)
         
         with tab2:
-            st.markdown("### Cover Letter (Editable)")
-            edited_letter = st.text_area(
-                "Edit your cover letter below:",
-                value=st.session_state.cover_letter,
-                height=400,
-                key="letter_editor"
-            )
-            
-            col_let1, col_let2 = st.columns(2)
-            
-            with col_let1:
-                st.download_button(
-                    "📥 Download Cover Letter",
-                    data=edited_letter,
-                    file_name="cover_letter.txt",
-                    mime="text/plain"
-                )
-            
-            with col_let2:
-                pdf_bytes = export_to_pdf(edited_letter, "cover_letter.pdf")
-                if pdf_bytes:
-                    st.download_button(
-                        "📥 Download as PDF",
-                        data=pdf_bytes,
-                        file_name="cover_letter.pdf",
-                        mime="application/pdf"
-                    )
+            render_letter_panel()
+        
+        with tab3:
+            render_demand_dashboard(load_demand_store(), st.session_state.cv_skills)
     
     else:
         # Initial state
         st.info("👈 Paste your CV and a job description in the sidebar, then click **Generate Tailored Resume**")
+        render_version_history()
         
         with st.expander("ℹ️ How it works"):
             st.markdown("""
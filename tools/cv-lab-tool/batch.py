@@ -0,0 +1,345 @@
+"""
+🔒 CAS (Content Administration System) - Resumable Batch Runs
+=============================================================
+Scores and tailors a resume for a long list of job postings, in a way
+that can be killed and restarted without redoing finished work.
+
+Every item goes through the app's own path: boilerplate stripping,
+extract_keywords, calculate_ats_score and generate_tailored_resume.
+Each outcome is appended to a JSONL journal as it happens:
+    {"event": "start",  "key": ..., "item": ..., "attempt": 1, "at": ...}
+    {"event": "done",   "key": ..., "item": ..., "seconds": 0.42, "result": {...}, "at": ...}
+    {"event": "failed", "key": ..., "item": ..., "seconds": 0.01, "error": "...", "at": ...}
+
+On restart the journal is replayed: finished items are skipped, and an
+item that has failed --max-attempts times is given up on instead of
+failing every run. Items are keyed by a hash of the CV, the model and
+the posting text, so editing the CV or a posting reruns just the
+affected items.
+
+Jobs come from directories (.txt, .md or .html files, as watcher.py
+reads them) or JSONL files with one {"id": ..., "job": "..."} per line.
+
+Run Instructions:
+    python batch.py jobs/ --cv cv.md --journal run.jsonl           # Run (or resume) a batch
+    python batch.py jobs.jsonl --cv cv.md --journal run.jsonl --max-attempts 5
+    python batch.py jobs/ --cv cv.md --journal run.jsonl --export results.jsonl
+
+Non-obvious: a "start" record without a matching outcome means the
+process died on that item (an OOM kill cannot be caught). Replay counts
+it as a failed attempt, so a posting that crashes the process is given
+up on after --max-attempts restarts instead of killing every rerun. A
+line torn by the crash is ignored.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from watcher import JOB_FILE_EXTENSIONS, read_job_file
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 10.0
+
+
+def item_key(salt: str, text: str) -> str:
+    """Journal key of one posting: SHA-1 of the run salt (CV and model) and the text."""
+    return hashlib.sha1(f'{salt}\0{text}'.encode('utf-8')).hexdigest()
+
+
+def _job_files(paths: Iterable[Path]) -> Iterator[Path]:
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(p for p in path.iterdir() if p.suffix.lower() in JOB_FILE_EXTENSIONS)
+        else:
+            yield path
+
+
+def iter_jobs(paths: Iterable[Path], max_chars: int) -> Iterator[Tuple[str, str]]:
+    """(item id, posting text) for every job, read lazily one at a time."""
+    for path in _job_files(paths):
+        if path.suffix.lower() != '.jsonl':
+            yield str(path), read_job_file(path, max_chars)
+            continue
+        with open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    text = row['job'][:max_chars]
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"{path}:{line_no}: unreadable job row, skipped ({e})")
+                    continue
+                yield str(row.get('id', f'{path.name}:{line_no}')), text
+
+
+def count_jobs(paths: Iterable[Path]) -> int:
+    """Number of jobs iter_jobs will yield, without reading the postings."""
+    total = 0
+    for path in _job_files(paths):
+        if path.suffix.lower() != '.jsonl':
+            total += 1
+            continue
+        with open(path, encoding='utf-8') as f:
+            total += sum(1 for line in f if line.strip())
+    return total
+
+
+def _lines_with_offsets(f) -> Iterator[Tuple[int, bytes]]:
+    offset = 0
+    for line in f:
+        yield offset, line
+        offset += len(line)
+
+
+def _summary(record: Dict, offset: int) -> Dict:
+    return {'item': record['item'], 'seconds': record['seconds'], 'score': record['result']['score'],
+            'offset': offset}
+
+
+class Journal:
+    """
+    Append-only record of a batch run's attempts and results.
+
+    Usage:
+        journal = Journal(path)          # Replays any earlier runs
+        if not journal.finished(key):
+            journal.start(key, item_id)
+            journal.done(key, item_id, result, seconds)
+        journal.close()
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # key -> {'item', 'seconds', 'score', 'offset'}; results stay on disk
+        self.results: Dict[str, Dict] = {}
+        self.failures: Counter = Counter()
+        self.errors: Dict[str, str] = {}
+        self.torn = 0
+        self._replay()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        if self.path.stat().st_size and not self._ends_with_newline():
+            self._file.write(b'\n')  # Never append onto a torn last line
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, 2)
+            return f.read(1) == b'\n'
+
+    def _replay(self):
+        if not self.path.exists():
+            return
+        running = set()
+        with open(self.path, 'rb') as f:
+            for offset, line in _lines_with_offsets(f):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    self.torn += 1
+                    continue
+                key = record['key']
+                if record['event'] == 'start':
+                    if key in running:
+                        self._crashed(key)
+                    running.add(key)
+                    continue
+                running.discard(key)
+                if record['event'] == 'done':
+                    self.results[key] = _summary(record, offset)
+                else:
+                    self.failures[key] += 1
+                    self.errors[key] = record['error']
+        for key in running:
+            self._crashed(key)
+
+    def _crashed(self, key: str):
+        self.failures[key] += 1
+        self.errors[key] = 'process died while running this item'
+
+    def _append(self, record: Dict) -> int:
+        record['at'] = datetime.now().isoformat(timespec='seconds')
+        offset = self._file.tell()
+        self._file.write(json.dumps(record).encode('utf-8') + b'\n')
+        self._file.flush()
+        return offset
+
+    def finished(self, key: str) -> bool:
+        return key in self.results
+
+    def start(self, key: str, item: str):
+        self._append({'event': 'start', 'key': key, 'item': item, 'attempt': self.failures[key] + 1})
+
+    def done(self, key: str, item: str, result: Dict, seconds: float):
+        record = {'event': 'done', 'key': key, 'item': item, 'seconds': round(seconds, 4), 'result': result}
+        self.results[key] = _summary(record, self._append(record))
+
+    def failed(self, key: str, item: str, error: str, seconds: float):
+        self._append({'event': 'failed', 'key': key, 'item': item, 'seconds': round(seconds, 4), 'error': error})
+        self.failures[key] += 1
+        self.errors[key] = error
+
+    def record(self, key: str) -> Dict:
+        """A finished item's full journal record, result included."""
+        with open(self.path, 'rb') as f:
+            f.seek(self.results[key]['offset'])
+            return json.loads(f.readline())
+
+    def close(self):
+        self._file.close()
+
+
+def make_tailor(cv_text: str, nlp) -> Callable[[str], Dict]:
+    """process(job_text) for run_batch: score the posting and tailor the resume to it."""
+    from app import (calculate_ats_score, extract_company_info, extract_keywords, generate_tailored_resume,
+                     load_boilerplate_index, load_document_frequencies, parse_cv_sections, pipeline_for,
+                     strip_job_boilerplate, weight_job_keywords)
+
+    cv_nlp, cv_language = pipeline_for(cv_text, nlp)
+    cv_keywords = extract_keywords(cv_text, cv_nlp, language=cv_language)
+    doc_freqs = load_document_frequencies()
+    boilerplate_index = load_boilerplate_index()
+    cv_sections = parse_cv_sections(cv_text)
+
+    def tailor(job_text: str) -> Dict:
+        job_nlp, job_language = pipeline_for(job_text, nlp)
+        job_core, _ = strip_job_boilerplate(job_text, boilerplate_index)
+        job_keywords = weight_job_keywords(extract_keywords(job_core, job_nlp, language=job_language), doc_freqs)
+        company_info = extract_company_info(job_text)
+        scores = calculate_ats_score(cv_text, job_core, cv_keywords, job_keywords, cv_nlp)
+        return {
+            'job_title': company_info['job_title'],
+            'company_name': company_info['company_name'],
+            'score': scores['total'],
+            'components': {key: scores[key] for key in ('keywords', 'soft_skills', 'structure', 'relevance')},
+            'missing_keywords': scores['missing_keywords'],
+            'partial': scores['partial'],
+            'resume': generate_tailored_resume(cv_sections, job_keywords, company_info, cv_nlp),
+        }
+
+    return tailor
+
+
+def run_batch(jobs: Iterable[Tuple[str, str]], process: Callable[[str], Dict], journal: Journal, salt: str,
+              max_attempts: int = 3, total: Optional[int] = None,
+              progress_interval: float = PROGRESS_INTERVAL) -> Dict:
+    """
+    Run process over every unfinished job, journaling each attempt.
+
+    A failing item is retried until it has failed max_attempts times
+    (across runs) and then skipped; other items are unaffected.
+    Returns run stats: processed, skipped, failed, given_up, seconds.
+    """
+    stats = Counter()
+    start = last_report = time.perf_counter()
+
+    def report():
+        elapsed = time.perf_counter() - start
+        rate = stats['processed'] / elapsed if elapsed else 0.0
+        line = (f"{stats['processed'] + stats['skipped'] + stats['given_up']}"
+                f"{f'/{total}' if total else ''} items - {stats['processed']} processed, "
+                f"{stats['skipped']} already done, {stats['given_up']} given up ({rate:.2f} items/s")
+        remaining = total - stats['processed'] - stats['skipped'] - stats['given_up'] if total else 0
+        if rate and remaining > 0:
+            eta = remaining / rate
+            line += f", ~{eta / 60:.0f} min left" if eta >= 60 else f", ~{eta:.0f}s left"
+        logger.info(line + ")")
+
+    for item, text in jobs:
+        key = item_key(salt, text)
+        if journal.finished(key):
+            stats['skipped'] += 1
+            continue
+
+        while not journal.finished(key) and journal.failures[key] < max_attempts:
+            journal.start(key, item)
+            item_start = time.perf_counter()
+            try:
+                result = process(text)
+            except Exception as e:
+                journal.failed(key, item, f'{type(e).__name__}: {e}', time.perf_counter() - item_start)
+                stats['failed'] += 1
+                logger.warning(f"{item}: attempt {journal.failures[key]}/{max_attempts} failed: {e}")
+            else:
+                journal.done(key, item, result, time.perf_counter() - item_start)
+                stats['processed'] += 1
+        if not journal.finished(key):
+            stats['given_up'] += 1
+            logger.warning(f"{item}: given up after {journal.failures[key]} attempts "
+                           f"({journal.errors[key]})")
+
+        if time.perf_counter() - last_report >= progress_interval:
+            report()
+            last_report = time.perf_counter()
+
+    report()
+    stats['seconds'] = time.perf_counter() - start
+    return dict(stats)
+
+
+def export_results(journal: Journal, path: Path) -> int:
+    """Write every finished item's result as JSONL, best score first. Returns the count."""
+    keys = sorted(journal.results, key=lambda key: -journal.results[key]['score'])
+    with open(path, 'w', encoding='utf-8') as f:
+        for key in keys:
+            record = journal.record(key)
+            f.write(json.dumps({'item': record['item'], 'seconds': record['seconds'], **record['result']}) + '\n')
+    return len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score and tailor a resume for many jobs, resumably")
+    parser.add_argument('jobs', type=Path, nargs='+', help="Job directories, files or JSONL files")
+    parser.add_argument('--cv', type=Path, required=True, help="CV (Markdown) to score and tailor")
+    parser.add_argument('--journal', type=Path, required=True, help="Journal to append to (and resume from)")
+    parser.add_argument('--model', default='en_core_web_sm',
+                        help="spaCy model to load (used for its own language; others use the app's models)")
+    parser.add_argument('--max-attempts', type=int, default=3, help="Failures (across runs) before giving up on an item")
+    parser.add_argument('--export', type=Path, default=None, help="Write finished results to this JSONL file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    import spacy
+    from app import INPUT_GUARDS
+
+    # Keep per-call INFO logs from app out of the progress log
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    max_chars = INPUT_GUARDS['max_input_chars']
+    cv_text = args.cv.read_text(encoding='utf-8')[:max_chars]
+    salt = hashlib.sha1(f'{args.model}\0{cv_text}'.encode('utf-8')).hexdigest()
+
+    journal = Journal(args.journal)
+    if journal.results or journal.failures:
+        logger.info(f"Resuming: {len(journal.results)} items done, {len(journal.failures)} with failures"
+                    f"{f', {journal.torn} torn lines ignored' if journal.torn else ''}")
+    try:
+        stats = run_batch(iter_jobs(args.jobs, max_chars), make_tailor(cv_text, spacy.load(args.model)),
+                          journal, salt, max_attempts=args.max_attempts, total=count_jobs(args.jobs))
+    finally:
+        journal.close()
+
+    seconds = stats['seconds']
+    processed = stats.get('processed', 0)
+    print(f"Processed {processed}, skipped {stats.get('skipped', 0)} already done, "
+          f"{stats.get('failed', 0)} failed attempts, gave up on {stats.get('given_up', 0)} "
+          f"in {seconds:.1f}s ({processed / seconds if seconds else 0:.2f} items/s)")
+    compute = [record['seconds'] for record in journal.results.values()]
+    if compute:
+        print(f"Journal: {len(compute)} items done, {sum(compute):.1f}s of compute, "
+              f"{sum(compute) / len(compute) * 1000:.0f} ms/item")
+    if args.export:
+        print(f"Exported {export_results(journal, args.export)} results to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,874 @@
+"""
+🔒 CAS (Content Administration System) - ATS Score Benchmark
+=============================================================
+Regression benchmark for ATS score quality and speed.
+
+Runs calculate_ats_score over the labelled CV/job pairs in
+benchmarks/ats_fixtures.json and reports, in one run:
+- Spearman rank correlation between scores and human fit labels
+- Expected score band hit rate
+- Per-pair latency and total throughput
+
+Run Instructions:
+    python benchmark.py                       # Human-readable report
+    python benchmark.py --json                # Machine-readable report
+    python benchmark.py --min-spearman 0.7    # Fail (exit 1) below threshold
+    python benchmark.py --layout              # Check PDF page predictions
+    python benchmark.py --fields              # Check company/title extraction on header shapes
+    python benchmark.py --no-strip            # Ablation: score raw postings
+    python benchmark.py --no-idf              # Ablation: score without IDF keyword weights
+    python benchmark.py --boilerplate         # Compare with/without job boilerplate stripping
+    python benchmark.py --idf                 # Compare plain and IDF-weighted keyword scoring
+    python benchmark.py --stress              # Worst-case latency on pathological input
+    python benchmark.py --memory              # Peak RSS stays flat as inputs grow
+    python benchmark.py --vectors             # Vector store recall, latency and memory
+    python benchmark.py --demand              # Skill demand record/query latency
+    python benchmark.py --history             # Version history size and save/load latency
+
+Non-obvious: every scoring or performance change (SCORING_WEIGHTS,
+thresholds, regex taxonomy, caching) should be checked here so speed
+gains are never bought with ranking quality.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import spacy
+
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app import (EXTRACTION_BUDGETS, INPUT_GUARDS, TERM_NAMES, VECTOR_STORE_CONFIG, ResumeOptimiser,
+                 calculate_ats_score, calculate_similarity, classify_job, detect_language, embed_texts,
+                 estimate_layout, export_to_pdf, extract_company_info, extract_cv_highlights, extract_keywords,
+                 generate_cover_letter, generate_tailored_resume, parse_cv_sections, record_document_frequencies,
+                 strip_job_boilerplate, weight_job_keywords)
+from boilerplate import BoilerplateIndex, strip_boilerplate
+from demand import DemandStore, recent_weeks
+from docfreq import DocumentFrequencies
+from history import HistoryStore
+from vectorstore import VectorStore
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_PATH = Path(__file__).parent / 'benchmarks' / 'ats_fixtures.json'
+
+# Input sizes (characters) for the stress run, up to the app's entry cap
+STRESS_SIZES = (1_000, 20_000, INPUT_GUARDS['max_input_chars'])
+
+# Worst-case seconds allowed for stages without an EXTRACTION_BUDGETS entry
+STRESS_DEFAULT_LIMIT = 1.0
+
+# CV and job sizes (characters) for the memory run: all above one chunk and
+# at most the extraction clip, so every size is processed in full
+MEMORY_SIZES = (25_000, 50_000, 75_000, EXTRACTION_BUDGETS['keywords'][1])
+
+# Input scored before measuring, so model and lazy-loaded state is resident
+MEMORY_WARMUP_CHARS = 2_000
+
+# Largest input's peak may be at most this multiple of the smallest's
+MEMORY_FLAT_RATIO = 2.0
+
+# RSS grows in allocator arenas, so smaller peaks are compared as this much
+# (parsing 100K characters whole adds ~5 MB even with blank:en)
+MEMORY_NOISE_MB = 2.0
+
+# Synthetic postings the benchmark's document frequencies are counted over
+IDF_CORPUS_POSTINGS = 500
+
+# Job the resume optimiser stress stages select lines for
+OPTIMISER_JOB = "Senior Product Designer: Figma, design systems, user research, prototyping, leadership."
+
+# Fragments the fuzzer splices together: real postings plus known hazards
+FUZZ_HAZARDS = [
+    'About us at ', 'Join ', ' Ltd', '## ', '### ', '- ', '**', '|', '→', '%', '$', '@',
+    'Senior Product Designer', 'Remote', 'London', '\n', '\n\n', ' ', '\t', 'é', '€', '\u200b',
+]
+
+
+def load_fixtures(path: Path = FIXTURES_PATH) -> Dict:
+    """Load the labelled fixture set."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def rank_values(values: List[float]) -> np.ndarray:
+    """
+    Rank values from 1..n, giving tied values their average rank.
+    """
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(values, kind='mergesort')
+    ranks = np.empty(len(values), dtype=float)
+    ranks[order] = np.arange(1, len(values) + 1)
+
+    # Average the ranks of ties
+    for value in np.unique(values):
+        tied = values == value
+        if tied.sum() > 1:
+            ranks[tied] = ranks[tied].mean()
+    return ranks
+
+
+def spearman_correlation(a: List[float], b: List[float]) -> float:
+    """Spearman rank correlation (Pearson correlation of the ranks)."""
+    if len(a) < 2:
+        return 0.0
+    ranks_a = rank_values(a)
+    ranks_b = rank_values(b)
+    if ranks_a.std() == 0 or ranks_b.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def fixture_boilerplate_index(fixtures: Dict, path: Path) -> BoilerplateIndex:
+    """A fresh boilerplate index that has seen every fixture job, as the app would after analysing them."""
+    index = BoilerplateIndex(path)
+    for job_text in fixtures['jobs'].values():
+        index.observe(job_text)
+    return index
+
+
+def run_benchmark(nlp, fixtures: Dict, repeat: int = 1, strip_jobs: bool = True,
+                  boilerplate_index: Optional[BoilerplateIndex] = None,
+                  doc_freqs: Optional[DocumentFrequencies] = None) -> Dict:
+    """
+    Score every fixture pair and collect quality and latency metrics.
+
+    Latency covers the full scoring path a user triggers, as the app
+    runs it: strip_job_boilerplate (against boilerplate_index), keyword
+    extraction for both texts, weight_job_keywords (against doc_freqs)
+    and calculate_ats_score. strip_jobs=False scores the raw posting and
+    doc_freqs=None leaves keywords unweighted, for ablation. With repeat > 1 the fastest run per pair is kept to
+    reduce timer noise. job_tokens counts the non-whitespace tokens of
+    the job text that reach the NLP stages.
+    """
+    bands = fixtures['bands']
+    results = []
+
+    start_total = time.perf_counter()
+    for pair in fixtures['pairs']:
+        cv_text = fixtures['cvs'][pair['cv']]
+        job_text = fixtures['jobs'][pair['job']]
+
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if strip_jobs:
+                job_text, _ = strip_job_boilerplate(fixtures['jobs'][pair['job']], boilerplate_index)
+            cv_keywords = extract_keywords(cv_text, nlp)
+            job_keywords = extract_keywords(job_text, nlp)
+            if doc_freqs is not None:
+                weight_job_keywords(job_keywords, doc_freqs)
+            scores = calculate_ats_score(cv_text, job_text, cv_keywords, job_keywords, nlp)
+            latencies.append(time.perf_counter() - start)
+
+        low, high = bands[pair['band']]
+        results.append({
+            'id': pair['id'],
+            'label': pair['label'],
+            'band': pair['band'],
+            'score': scores['total'],
+            'in_band': low <= scores['total'] <= high,
+            'latency_ms': min(latencies) * 1000,
+            'job_tokens': sum(not token.is_space for token in nlp.make_doc(job_text.lower())),
+        })
+    total_seconds = time.perf_counter() - start_total
+
+    latencies_ms = np.array([r['latency_ms'] for r in results])
+    return {
+        'pairs': results,
+        'spearman': spearman_correlation([r['score'] for r in results], [r['label'] for r in results]),
+        'band_hit_rate': sum(r['in_band'] for r in results) / max(len(results), 1),
+        'latency_p50_ms': float(np.percentile(latencies_ms, 50)) if len(results) else 0.0,
+        'latency_p95_ms': float(np.percentile(latencies_ms, 95)) if len(results) else 0.0,
+        'total_seconds': total_seconds,
+        'throughput_pairs_per_s': len(results) * repeat / total_seconds if total_seconds else 0.0,
+        'job_tokens_mean': float(np.mean([r['job_tokens'] for r in results])) if len(results) else 0.0,
+    }
+
+
+def count_pdf_pages(pdf_bytes: bytes) -> int:
+    """Count page objects in a reportlab PDF."""
+    return len(re.findall(rb'/Type\s*/Page(?![a-zA-Z])', pdf_bytes))
+
+
+def run_layout_check(fixtures: Dict, repeat: int = 1) -> Dict:
+    """
+    Compare estimate_layout's page count with a real export_to_pdf build.
+
+    Every fixture text is checked as-is and repeated 2x and 4x so that
+    page splits are covered too.
+    """
+    results = []
+    texts = list(fixtures['cvs'].items()) + list(fixtures['jobs'].items())
+    for name, text in texts:
+        for copies in (1, 2, 4):
+            content = '\n\n'.join([text] * copies)
+
+            estimate_ms, build_ms = [], []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                layout = estimate_layout(content)
+                estimate_ms.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                pdf_bytes = export_to_pdf(content, 'check.pdf')
+                build_ms.append((time.perf_counter() - start) * 1000)
+
+            if layout is None or pdf_bytes is None:
+                raise RuntimeError("Layout check requires reportlab")
+            actual = count_pdf_pages(pdf_bytes)
+            results.append({
+                'id': f'{name} x{copies}',
+                'predicted': layout['pages'],
+                'actual': actual,
+                'match': layout['pages'] == actual,
+                'estimate_ms': min(estimate_ms),
+                'build_ms': min(build_ms),
+            })
+
+    estimate_total = sum(r['estimate_ms'] for r in results)
+    return {
+        'texts': results,
+        'match_rate': sum(r['match'] for r in results) / max(len(results), 1),
+        'speedup': sum(r['build_ms'] for r in results) / estimate_total if estimate_total else 0.0,
+    }
+
+
+def print_layout_report(report: Dict):
+    """Print a human-readable layout check report."""
+    print(f"{'Text':<50} {'Pred':>5} {'PDF':>5} {'OK':>3} {'est ms':>8} {'pdf ms':>8}")
+    print('-' * 84)
+    for r in report['texts']:
+        print(f"{r['id']:<50} {r['predicted']:>5} {r['actual']:>5} {'✓' if r['match'] else '✗':>3} "
+              f"{r['estimate_ms']:>8.2f} {r['build_ms']:>8.2f}")
+    print('-' * 84)
+    print(f"Page count match rate:     {report['match_rate']:.0%}")
+    print(f"Speedup over PDF build:    {report['speedup']:.1f}x")
+
+
+def run_fields_check(fixtures: Dict) -> Dict:
+    """Compare extract_company_info with the expected fields of each posting_fields fixture."""
+    cases = []
+    for case in fixtures.get('posting_fields', []):
+        info = extract_company_info(case['text'])
+        misses = {name: {'expected': value, 'got': info.get(name)}
+                  for name, value in case['expected'].items() if info.get(name) != value}
+        cases.append({'id': case['id'], 'ok': not misses, 'misses': misses})
+    return {'cases': cases, 'match_rate': sum(case['ok'] for case in cases) / (len(cases) or 1)}
+
+
+def print_fields_report(report: Dict):
+    """Print each posting's extraction result and the misses."""
+    for case in report['cases']:
+        print(f"{'✓' if case['ok'] else '✗'} {case['id']}")
+        for name, miss in case['misses'].items():
+            print(f"    {name}: expected {miss['expected']!r}, got {miss['got']!r}")
+    print(f"Field match rate: {report['match_rate']:.0%}")
+
+
+def _grow(text: str, size: int) -> str:
+    return ('\n\n'.join([text] * (size // len(text) + 1)))[:size]
+
+
+def _memory_probe(model: str, fixtures: Dict, size: int) -> Dict:
+    """
+    Peak RSS growth of scoring one CV/job pair of `size` characters.
+
+    Runs in a fresh process: ru_maxrss is a per-process high-water mark
+    and covers spaCy's and NumPy's native buffers, which tracemalloc
+    does not see. The baseline is taken after loading the model and
+    scoring a small warm-up pair.
+    """
+    import resource
+
+    logging.getLogger('app').setLevel(logging.ERROR)
+    nlp = spacy.load(model)
+    cv_text = next(iter(fixtures['cvs'].values()))
+    job_text = next(iter(fixtures['jobs'].values()))
+
+    def score(cv: str, job: str):
+        calculate_ats_score(cv, job, extract_keywords(cv, nlp), extract_keywords(job, nlp), nlp)
+
+    score(_grow(cv_text, MEMORY_WARMUP_CHARS), _grow(job_text, MEMORY_WARMUP_CHARS))
+    cv, job = _grow(cv_text, size), _grow(job_text, size)
+    # Linux reports kilobytes, macOS bytes
+    unit = 1 if sys.platform == 'darwin' else 1024
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    score(cv, job)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'chars': size, 'peak_mb': (peak - baseline) * unit / 2 ** 20,
+            'seconds': time.perf_counter() - start}
+
+
+def run_memory_check(model: str, fixtures: Dict, sizes: Iterable[int] = MEMORY_SIZES) -> Dict:
+    """
+    Peak RSS growth of scoring a CV/job pair at each input size.
+
+    Inputs are fixture texts repeated up to the size, scored through
+    extract_keywords and calculate_ats_score, each size in its own
+    process. Chunked parsing should keep the peak roughly flat however
+    large the inputs get; the check fails when the largest size peaks
+    above MEMORY_FLAT_RATIO times the smallest (peaks below
+    MEMORY_NOISE_MB count as that much). Sizes above the
+    'keywords' extraction clip are reported but only that much is
+    parsed, so they prove nothing about chunking.
+    """
+    clip_chars = EXTRACTION_BUDGETS['keywords'][1]
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for size in sizes:
+        with context.Pool(1) as pool:
+            row = pool.apply(_memory_probe, (model, fixtures, size))
+        row['clipped'] = size > clip_chars
+        rows.append(row)
+
+    ratio = max(rows[-1]['peak_mb'], MEMORY_NOISE_MB) / max(rows[0]['peak_mb'], MEMORY_NOISE_MB)
+    return {'sizes': rows, 'clip_chars': clip_chars, 'ratio': ratio, 'max_ratio': MEMORY_FLAT_RATIO,
+            'ok': ratio <= MEMORY_FLAT_RATIO}
+
+
+def print_memory_report(report: Dict):
+    """Print peak RSS growth per input size and the growth ratio."""
+    print(f"{'Chars':>10} {'Peak MB':>9} {'Seconds':>8}")
+    print('-' * 30)
+    for row in report['sizes']:
+        clipped = f"  (clipped to {report['clip_chars']:,})" if row['clipped'] else ''
+        print(f"{row['chars']:>10,} {row['peak_mb']:>9.1f} {row['seconds']:>8.2f}{clipped}")
+    print('-' * 30)
+    print(f"Peak RSS growth: {report['ratio']:.2f}x (limit {report['max_ratio']:.1f}x)")
+
+
+def stress_inputs(size: int, seed: int = 0, fuzz_cases: int = 10,
+                  fixtures: Optional[Dict] = None) -> Iterable[Tuple[str, str]]:
+    """
+    Yield (name, text) pathological inputs of about `size` characters.
+
+    Fixed cases target known hazards: regex backtracking (capital and
+    digit runs with no terminator), spaCy's tokenizer (punctuation runs),
+    one huge line, and degenerate structure. Fuzz cases splice random
+    fixture slices and hazard fragments from a seeded RNG, so a failing
+    case can be reproduced from its name.
+    """
+    rng = random.Random(seed)
+    yield 'caps_run', 'A' * size
+    yield 'about_caps', 'About us at ' + 'Acme ' * (size // 5)
+    yield 'title_line', 'Senior ' + 'X' * size
+    yield 'digit_run', '- ' + '9' * size
+    yield 'star_run', '*' * size
+    yield 'apostrophe_run', "'" * size
+    yield 'punct_mix', ''.join(rng.choice('!"#$%&\'()*+,-./:;<=>?@[]^_`{|}~') for _ in range(size))
+    yield 'one_line', ('design systems figma research ' * (size // 30 + 1))[:size]
+    yield 'newlines', '\n' * size
+    yield 'headers', ('## A\n### B | C | D\n' * (size // 20 + 1))[:size]
+    yield 'bullets', ('- Grew revenue 50% (5→15) to $20M\n' * (size // 36 + 1))[:size]
+    yield 'unicode', ''.join(chr(rng.randrange(32, 0x3000)) for _ in range(size))
+
+    corpus = list((fixtures or {}).get('jobs', {}).values()) + list((fixtures or {}).get('cvs', {}).values())
+    for case in range(fuzz_cases):
+        parts, length = [], 0
+        while length < size:
+            if corpus and rng.random() < 0.5:
+                text = rng.choice(corpus)
+                start = rng.randrange(len(text))
+                part = text[start:start + rng.randrange(1, 400)]
+            else:
+                part = rng.choice(FUZZ_HAZARDS) * rng.choice((1, 1, 2, 10, 1000))
+            parts.append(part)
+            length += len(part)
+        yield f'fuzz_{seed}_{case}', ''.join(parts)[:size]
+
+
+def stress_stages(nlp) -> Dict[str, Tuple[Callable[[str], object], float]]:
+    """Stage name -> (call on one input, worst-case seconds allowed)."""
+    def limit(stage: str) -> float:
+        # A stage stops at its next checkpoint after the deadline, so allow 50% over
+        return EXTRACTION_BUDGETS[stage][0] * 1.5
+
+    job_keywords = extract_keywords(OPTIMISER_JOB, nlp)
+
+    def optimise(text: str, budget_seconds: Optional[float] = None) -> Dict:
+        # Under an Experience heading every bullet is optional, so select() sees them all
+        optimiser = ResumeOptimiser('## Experience\n' + text, nlp, budget_seconds=budget_seconds)
+        return optimiser.select(job_keywords, max_pages=2.0)
+
+    return {
+        'extract_keywords': (lambda text: extract_keywords(text, nlp), limit('keywords')),
+        'calculate_similarity': (lambda text: calculate_similarity(text, text[::-1], nlp), limit('similarity')),
+        'extract_company_info': (extract_company_info, limit('company_info')),
+        'extract_cv_highlights': (extract_cv_highlights, limit('cv_highlights')),
+        'parse_cv_sections': (parse_cv_sections, STRESS_DEFAULT_LIMIT),
+        'strip_boilerplate': (strip_boilerplate, STRESS_DEFAULT_LIMIT),
+        'detect_language': (detect_language, STRESS_DEFAULT_LIMIT),
+        'classify_job': (classify_job, STRESS_DEFAULT_LIMIT),
+        'resume_optimiser': (optimise, limit('resume_optimiser')),
+        # A zero budget leaves every line unprofiled: select() must still return
+        'resume_optimiser_expired': (lambda text: optimise(text, budget_seconds=0.0), STRESS_DEFAULT_LIMIT),
+    }
+
+
+def run_stress(nlp, sizes: Iterable[int] = STRESS_SIZES, seed: int = 0, fuzz_cases: int = 10,
+               fixtures: Optional[Dict] = None) -> Dict:
+    """
+    Time every stage on every stress input and keep each stage's worst case.
+
+    A stage fails when its slowest input exceeds its limit (the stage's
+    EXTRACTION_BUDGETS time plus checkpoint slack, else
+    STRESS_DEFAULT_LIMIT).
+    """
+    stages = stress_stages(nlp)
+    worst = {name: {'stage': name, 'seconds': 0.0, 'input': '', 'limit': limit}
+             for name, (_, limit) in stages.items()}
+    runs = 0
+
+    for size in sizes:
+        for case, text in stress_inputs(size, seed, fuzz_cases, fixtures):
+            for name, (call, _) in stages.items():
+                start = time.perf_counter()
+                call(text)
+                elapsed = time.perf_counter() - start
+                runs += 1
+                if elapsed > worst[name]['seconds']:
+                    worst[name].update(seconds=elapsed, input=f'{case} ({size} chars)')
+
+    for row in worst.values():
+        row['ok'] = row['seconds'] <= row['limit']
+    return {
+        'stages': list(worst.values()),
+        'runs': runs,
+        'ok': all(row['ok'] for row in worst.values()),
+    }
+
+
+def print_stress_report(report: Dict):
+    """Print each stage's worst-case latency against its limit."""
+    print(f"{'Stage':<24} {'Worst s':>8} {'Limit s':>8} {'OK':>3}  Slowest input")
+    print('-' * 84)
+    for r in report['stages']:
+        print(f"{r['stage']:<24} {r['seconds']:>8.3f} {r['limit']:>8.1f} {'✓' if r['ok'] else '✗':>3}  {r['input']}")
+    print('-' * 84)
+    print(f"Stage runs: {report['runs']}")
+
+
+def synthetic_postings(fixtures: Dict, count: int, seed: int = 0) -> List[str]:
+    """
+    Postings made by recombining fixture job lines (seeded).
+
+    Each one draws most lines from a single fixture job and the rest
+    from any job, so there are families of similar postings to find.
+    """
+    rng = random.Random(seed)
+    jobs = [[line for line in text.splitlines() if line.strip()] for text in fixtures['jobs'].values()]
+    pool = [line for lines in jobs for line in lines]
+    postings = []
+    for _ in range(count):
+        base = rng.choice(jobs)
+        lines = rng.sample(base, max(1, len(base) * 2 // 3)) + rng.sample(pool, 5)
+        rng.shuffle(lines)
+        postings.append('\n'.join(lines))
+    return postings
+
+
+def run_vector_check(fixtures: Dict, count: int = 20000, queries: int = 50, k: int = 10,
+                     dtype: str = VECTOR_STORE_CONFIG['dtype']) -> Dict:
+    """
+    Compare the vector store with float32 arrays and brute-force cosine.
+
+    The baseline keeps one float32 array per posting and answers with
+    sklearn's cosine_similarity over all of them. Queries are the
+    fixture CVs plus fresh synthetic postings; recall@k is measured
+    against that exact ranking.
+    """
+    postings = synthetic_postings(fixtures, count)
+    vectors = embed_texts(postings)
+    query_texts = list(fixtures['cvs'].values()) + synthetic_postings(fixtures, queries, seed=1)
+    query_vectors = embed_texts(query_texts)
+
+    tracemalloc.start()
+    baseline = {posting_id: vector.copy() for posting_id, vector in enumerate(vectors)}
+    baseline_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config = VECTOR_STORE_CONFIG
+        store = VectorStore(Path(directory), config['dim'], dtype=dtype, tables=config['tables'],
+                            bits=config['bits'], brute_force_below=config['brute_force_below'])
+        store.add_many(range(count), vectors)
+        store.search(query_vectors[0], k)  # Map files and build buckets outside the timings
+        
+        recalls, store_ms, baseline_ms = [], [], []
+        for query in query_vectors:
+            start = time.perf_counter()
+            found = store.search(query, k)
+            store_ms.append((time.perf_counter() - start) * 1000)
+            
+            start = time.perf_counter()
+            scores = cosine_similarity(query[None, :], np.vstack(list(baseline.values())))[0]
+            exact = np.argsort(-scores)[:k]
+            baseline_ms.append((time.perf_counter() - start) * 1000)
+            
+            recalls.append(len({posting_id for posting_id, _ in found} & set(exact.tolist())) / k)
+        store_bytes = store.nbytes_per_row()
+
+    return {
+        'postings': count,
+        'dtype': dtype,
+        'recall_at_k': float(np.mean(recalls)),
+        'k': k,
+        'store_query_ms': float(np.median(store_ms)),
+        'baseline_query_ms': float(np.median(baseline_ms)),
+        'store_bytes_per_posting': store_bytes,
+        'baseline_bytes_per_posting': baseline_bytes / count,
+    }
+
+
+def print_vector_report(report: Dict):
+    """Print vector store quality, speed and memory against the float32 baseline."""
+    print(f"{'Metric':<30} {'Store':>12} {'float32':>12}")
+    print('-' * 56)
+    print(f"{'Query p50 (ms)':<30} {report['store_query_ms']:>12.2f} {report['baseline_query_ms']:>12.2f}")
+    print(f"{'Bytes per posting':<30} {report['store_bytes_per_posting']:>12.0f} "
+          f"{report['baseline_bytes_per_posting']:>12.0f}")
+    print('-' * 56)
+    print(f"Postings / dtype:          {report['postings']} / {report['dtype']}")
+    print(f"Recall@{report['k']}:                 {report['recall_at_k']:.0%}")
+    print(f"Memory saving:             "
+          f"{report['baseline_bytes_per_posting'] / report['store_bytes_per_posting']:.1f}x")
+
+
+def run_demand_check(nlp, fixtures: Dict, count: int = 10000, weeks: int = 26, seed: int = 0) -> Dict:
+    """
+    Time skill demand recording and dashboard queries over `weeks` of postings.
+
+    Keywords are extracted once per fixture job; each synthetic posting
+    takes a random subset of one job's skills and nouns, a random
+    company, location and day, so no NLP runs inside the timings.
+    """
+    rng = random.Random(seed)
+    extracted = [extract_keywords(text, nlp) for text in fixtures['jobs'].values()]
+    companies = [f'Company {i}' for i in range(50)]
+    today = date.today()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = DemandStore(Path(directory) / 'demand.sqlite3')
+        start = time.perf_counter()
+        for posting in range(count):
+            keywords = rng.choice(extracted)
+            sample = {key: rng.sample(keywords[key], len(keywords[key]) * 3 // 4)
+                      for key in ('hard_skills', 'soft_skills', 'nouns')}
+            when = datetime.combine(today, datetime.min.time()) - timedelta(days=rng.randrange(weeks * 7))
+            store.record(str(posting), sample, rng.choice(companies), rng.choice(['London', 'Berlin', 'Remote']), when)
+        record_ms = (time.perf_counter() - start) * 1000 / count
+        
+        queries = {
+            'top_skills': lambda: store.top_skills(20, buckets=recent_weeks(12)),
+            'rising_skills': lambda: store.rising_skills(),
+            'coverage': lambda: store.coverage(extracted[0]['hard_skills'], buckets=recent_weeks(12)),
+            'company_top': lambda: store.top_skills(10, 'company', [companies[0]]),
+            'emerging_terms': lambda: store.emerging_terms(recent_weeks(4)),
+        }
+        query_ms = {}
+        for name, query in queries.items():
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                query()
+                timings.append((time.perf_counter() - start) * 1000)
+            query_ms[name] = min(timings)
+
+    return {'postings': count, 'weeks': weeks, 'record_ms': record_ms, 'query_ms': query_ms}
+
+
+def print_demand_report(report: Dict):
+    """Print skill demand recording and query latency."""
+    print(f"{'Query':<30} {'ms':>8}")
+    print('-' * 40)
+    for name, ms in report['query_ms'].items():
+        print(f"{name:<30} {ms:>8.2f}")
+    print('-' * 40)
+    print(f"Postings / weeks:          {report['postings']} / {report['weeks']}")
+    print(f"Record per posting:        {report['record_ms']:.2f} ms")
+
+
+def run_history_check(nlp, fixtures: Dict, count: int = 1000, seed: int = 0) -> Dict:
+    """
+    Store a generated and an edited resume and letter for `count` synthetic postings.
+
+    Reports stored bytes per version against plain per-version zlib,
+    and save and load latency (loads are random versions, checked
+    against the saved text).
+    """
+    rng = random.Random(seed)
+    cv_text = next(iter(fixtures['cvs'].values()))
+    cv_sections = parse_cv_sections(cv_text)
+    cv_highlights = extract_cv_highlights(cv_text)
+    user_info = {'name': 'Bench Mark', 'email': 'bench@example.com'}
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = HistoryStore(Path(directory) / 'history.sqlite3')
+        texts, save_seconds, zlib_bytes = {}, 0.0, 0
+        for posting in synthetic_postings(fixtures, count, seed=seed):
+            job_keywords = extract_keywords(posting, nlp)
+            company_info = extract_company_info(posting)
+            job = {'hash': str(len(texts)), 'title': company_info['job_title'], 'company': company_info['company_name']}
+            resume = generate_tailored_resume(cv_sections, job_keywords, company_info, nlp)
+            letter = generate_cover_letter(cv_sections, job_keywords, company_info, user_info,
+                                           cv_highlights=cv_highlights)
+            lines = resume.splitlines(keepends=True)
+            edit = rng.randrange(len(lines))
+            edited = ''.join(lines[:edit] + [lines[edit].rstrip('\n') + ' (edited)\n'] + lines[edit + 1:])
+            for kind, source, text in (('resume', 'generated', resume), ('letter', 'generated', letter),
+                                       ('resume', 'edited', edited)):
+                start = time.perf_counter()
+                version_id = store.save(kind, text, base=cv_text, source=source, score=50.0, job=job)
+                save_seconds += time.perf_counter() - start
+                texts[version_id] = text
+                zlib_bytes += len(zlib.compress(text.encode('utf-8'), 9))
+
+        sample = rng.sample(sorted(texts), min(200, len(texts)))
+        start = time.perf_counter()
+        mismatches = sum(store.load(version_id) != texts[version_id] for version_id in sample)
+        load_ms = (time.perf_counter() - start) * 1000 / len(sample)
+        stats = store.stats()
+        file_bytes = (Path(directory) / 'history.sqlite3').stat().st_size
+
+    return {
+        'versions': stats['versions'],
+        'chunks': stats['chunks'],
+        'raw_bytes': stats['raw_chars'],
+        'zlib_bytes': zlib_bytes,
+        'stored_bytes': stats['stored_bytes'],
+        'file_bytes': file_bytes,
+        'save_ms': save_seconds * 1000 / stats['versions'],
+        'load_ms': load_ms,
+        'mismatches': mismatches,
+    }
+
+
+def print_history_report(report: Dict):
+    """Print version history size and latency."""
+    versions = report['versions']
+    print(f"Versions / distinct chunks: {versions} / {report['chunks']}")
+    print(f"Raw text per version:       {report['raw_bytes'] / versions:,.0f} B")
+    print(f"zlib per version:           {report['zlib_bytes'] / versions:,.0f} B")
+    print(f"Stored per version:         {report['stored_bytes'] / versions:,.0f} B chunk data, "
+          f"{report['file_bytes'] / versions:,.0f} B with SQLite overhead")
+    print(f"Save / load:                {report['save_ms']:.2f} / {report['load_ms']:.2f} ms")
+    print(f"Round-trip mismatches:      {report['mismatches']}")
+
+
+def print_comparison(before: Dict, after: Dict, columns: Tuple[str, str]):
+    """Print quality, tokens and latency of two benchmark runs side by side."""
+    rows = [
+        ('Spearman rank correlation', 'spearman', '{:.3f}'),
+        ('Band hit rate', 'band_hit_rate', '{:.0%}'),
+        ('Job tokens per pair', 'job_tokens_mean', '{:.0f}'),
+        ('Latency p50 (ms)', 'latency_p50_ms', '{:.1f}'),
+    ]
+    print(f"{'Metric':<30} {columns[0]:>10} {columns[1]:>10}")
+    print('-' * 52)
+    for label, key, fmt in rows:
+        print(f"{label:<30} {fmt.format(before[key]):>10} {fmt.format(after[key]):>10}")
+
+
+def build_document_frequencies(nlp, fixtures: Dict, path: Path, count: int = 500) -> DocumentFrequencies:
+    """Corpus statistics over `count` synthetic postings (see synthetic_postings)."""
+    doc_freqs = DocumentFrequencies(path, TERM_NAMES)
+    for posting in synthetic_postings(fixtures, count):
+        record_document_frequencies(doc_freqs, extract_keywords(strip_job_boilerplate(posting)[0], nlp))
+    return doc_freqs
+
+
+def print_boilerplate_report(raw: Dict, stripped: Dict):
+    """Print quality, tokens and latency with and without boilerplate stripping."""
+    print_comparison(raw, stripped, ('Raw', 'Stripped'))
+    saved = 1 - stripped['job_tokens_mean'] / raw['job_tokens_mean'] if raw['job_tokens_mean'] else 0.0
+    print('-' * 52)
+    print(f"Job tokens removed:            {saved:.0%}")
+
+
+def print_report(report: Dict):
+    """Print a human-readable benchmark report."""
+    print(f"{'Pair':<50} {'Label':>5} {'Band':>7} {'Score':>6} {'OK':>3} {'ms':>8}")
+    print('-' * 84)
+    for r in report['pairs']:
+        print(f"{r['id']:<50} {r['label']:>5} {r['band']:>7} {r['score']:>6.1f} "
+              f"{'✓' if r['in_band'] else '✗':>3} {r['latency_ms']:>8.1f}")
+    print('-' * 84)
+    print(f"Spearman rank correlation: {report['spearman']:.3f}")
+    print(f"Band hit rate:             {report['band_hit_rate']:.0%}")
+    print(f"Latency p50 / p95:         {report['latency_p50_ms']:.1f} / {report['latency_p95_ms']:.1f} ms")
+    print(f"Throughput:                {report['throughput_pairs_per_s']:.1f} pairs/s "
+          f"({report['total_seconds']:.2f}s total)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ATS score quality and speed")
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_PATH, help="Fixture JSON file")
+    parser.add_argument('--model', default='en_core_web_sm', help="spaCy model to load")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per pair (fastest kept)")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--min-spearman', type=float, default=None,
+                        help="Exit non-zero if rank correlation falls below this")
+    parser.add_argument('--layout', action='store_true',
+                        help="Check PDF page predictions instead (exit 1 on any mismatch)")
+    parser.add_argument('--fields', action='store_true',
+                        help="Check company and title extraction against the posting_fields fixtures")
+    parser.add_argument('--no-strip', dest='strip', action='store_false',
+                        help="Score raw postings, without job boilerplate stripping (ablation)")
+    parser.add_argument('--no-idf', dest='idf_weights', action='store_false',
+                        help="Score without IDF keyword weights (ablation)")
+    parser.add_argument('--boilerplate', action='store_true',
+                        help="Compare scoring with and without job boilerplate stripping")
+    parser.add_argument('--stress', action='store_true',
+                        help="Time every stage on pathological input (exit 1 over any limit)")
+    parser.add_argument('--seed', type=int, default=0, help="Fuzz seed for --stress")
+    parser.add_argument('--memory', action='store_true',
+                        help="Check peak RSS stays flat as CV/job inputs grow (one process per size)")
+    parser.add_argument('--vectors', type=int, nargs='?', const=20000, default=None, metavar='N',
+                        help="Check the job vector store on N synthetic postings")
+    parser.add_argument('--demand', type=int, nargs='?', const=10000, default=None, metavar='N',
+                        help="Time skill demand analytics over N synthetic postings")
+    parser.add_argument('--history', type=int, nargs='?', const=1000, default=None, metavar='N',
+                        help="Measure the version history over N synthetic applications")
+    parser.add_argument('--idf', type=int, nargs='?', const=500, default=None, metavar='N',
+                        help="Compare plain and IDF-weighted keyword scoring (IDF from N synthetic postings)")
+    parser.add_argument('--vector-dtype', default=VECTOR_STORE_CONFIG['dtype'], help="Store dtype for --vectors")
+    args = parser.parse_args()
+
+    # Keep per-call INFO logs from app out of the report
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    if args.vectors:
+        report = run_vector_check(load_fixtures(args.fixtures), count=args.vectors, dtype=args.vector_dtype)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_vector_report(report)
+        return
+
+    if args.layout:
+        report = run_layout_check(load_fixtures(args.fixtures), repeat=args.repeat)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_layout_report(report)
+        if report['match_rate'] < 1.0:
+            logger.error("Predicted page count differs from the PDF build")
+            sys.exit(1)
+        return
+
+    if args.fields:
+        report = run_fields_check(load_fixtures(args.fixtures))
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_fields_report(report)
+        if report['match_rate'] < 1.0:
+            logger.error("Extracted posting fields differ from the fixtures")
+            sys.exit(1)
+        return
+
+    nlp = spacy.load(args.model)
+
+    if args.demand:
+        report = run_demand_check(nlp, load_fixtures(args.fixtures), count=args.demand)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_demand_report(report)
+        return
+
+    if args.history:
+        report = run_history_check(nlp, load_fixtures(args.fixtures), count=args.history)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_history_report(report)
+        if report['mismatches']:
+            logger.error("Stored versions did not load back unchanged")
+            sys.exit(1)
+        return
+
+    if args.memory:
+        # Clipping warnings are expected here
+        logging.getLogger('app').setLevel(logging.ERROR)
+        report = run_memory_check(args.model, load_fixtures(args.fixtures))
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_memory_report(report)
+        if not report['ok']:
+            logger.error("Peak memory grows with input size")
+            sys.exit(1)
+        return
+
+    if args.stress:
+        # Clipping warnings are expected here
+        logging.getLogger('app').setLevel(logging.ERROR)
+        report = run_stress(nlp, seed=args.seed, fixtures=load_fixtures(args.fixtures))
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_stress_report(report)
+        if not report['ok']:
+            logger.error("A stage exceeded its worst-case latency limit")
+            sys.exit(1)
+        return
+
+    fixtures = load_fixtures(args.fixtures)
+    with tempfile.TemporaryDirectory() as directory:
+        boilerplate_index = fixture_boilerplate_index(fixtures, Path(directory) / 'boilerplate.sqlite3')
+        doc_freqs = None
+        if args.idf or args.idf_weights:
+            doc_freqs = build_document_frequencies(nlp, fixtures, Path(directory) / 'doc_freqs',
+                                                   count=args.idf or IDF_CORPUS_POSTINGS)
+
+        if args.idf:
+            plain = run_benchmark(nlp, fixtures, repeat=args.repeat, boilerplate_index=boilerplate_index)
+            weighted = run_benchmark(nlp, fixtures, repeat=args.repeat, boilerplate_index=boilerplate_index,
+                                     doc_freqs=doc_freqs)
+            if args.json:
+                print(json.dumps({'plain': plain, 'idf': weighted}, indent=2))
+            else:
+                print_comparison(plain, weighted, ('Plain', 'IDF'))
+            return
+
+        if args.boilerplate:
+            raw = run_benchmark(nlp, fixtures, repeat=args.repeat, strip_jobs=False, doc_freqs=doc_freqs)
+            stripped = run_benchmark(nlp, fixtures, repeat=args.repeat, boilerplate_index=boilerplate_index,
+                                     doc_freqs=doc_freqs)
+            if args.json:
+                print(json.dumps({'raw': raw, 'stripped': stripped}, indent=2))
+            else:
+                print_boilerplate_report(raw, stripped)
+            return
+
+        report = run_benchmark(nlp, fixtures, repeat=args.repeat, strip_jobs=args.strip,
+                               boilerplate_index=boilerplate_index, doc_freqs=doc_freqs)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.min_spearman is not None and report['spearman'] < args.min_spearman:
+        logger.error(f"Spearman {report['spearman']:.3f} below threshold {args.min_spearman}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
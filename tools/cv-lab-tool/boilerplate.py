@@ -0,0 +1,268 @@
+"""
+🔒 CAS (Content Administration System) - Job Posting Boilerplate
+================================================================
+Separates the requirement and responsibility blocks of a job posting
+from company boilerplate (about us, benefits, legal) before NLP.
+
+A posting is split into blocks at heading lines and each block is
+classified by its heading. Blocks without a recognised heading are
+checked paragraph by paragraph against an on-disk SQLite index of
+paragraph hashes: a paragraph seen in several different postings (a
+company's standard pitch or equal-opportunity statement) is boilerplate.
+
+Non-obvious: boilerplate is masked with spaces rather than cut out, so
+character offsets (keyword evidence spans) still point into the
+original posting, and a masked block costs spaCy a single whitespace
+token.
+"""
+
+import hashlib
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Heading cues, matched as whole words/phrases in the normalised heading.
+# Core cues are checked first, so 'About the role' is never boilerplate.
+CORE_HEADING_CUES = [
+    'requirement', 'responsibilit', 'qualification', 'role overview', 'the role',
+    'about the role', 'about you', 'what you will do', 'what you ll do', 'you will',
+    'you ll', 'your role', 'what we re looking for', 'what we are looking for',
+    'who you are', 'you have', 'must have', 'nice to have', 'bonus', 'skills',
+    'experience', 'key duties', 'duties', 'day to day', 'the job', 'job description',
+    # German / French
+    'anforderung', 'aufgaben', 'ihr profil', 'dein profil', 'profil', 'qualifikation',
+    'missions', 'responsabilit', 'compétences', 'vos missions', 'votre profil',
+]
+
+BOILERPLATE_HEADING_CUES = [
+    'about us', 'who we are', 'about the company', 'our company', 'our story',
+    'our mission', 'our values', 'our culture', 'culture', 'what we offer',
+    'we offer', 'benefits', 'perks', 'why join', 'why work', 'why you ll love',
+    'compensation', 'salary', 'equal opportunit', 'diversity', 'inclusion',
+    'eeo', 'how to apply', 'application process', 'interview process', 'next steps',
+    'location', 'legal', 'privacy', 'disclaimer', 'recruitment agencies',
+    # German / French
+    'über uns', 'wir bieten', 'was wir bieten', 'unser angebot',
+    'qui sommes nous', 'à propos', 'nous offrons', 'avantages', 'pourquoi nous rejoindre',
+]
+
+# Headings are short; longer colon-terminated lines are sentences
+MAX_HEADING_CHARS = 60
+
+# Paragraphs shorter than this are never judged by repetition, so common
+# requirement bullets ('Strong Figma skills') are not mistaken for boilerplate
+MIN_PARAGRAPH_WORDS = 6
+
+_BULLET_PREFIX = re.compile(r'^\s*(?:[-*•·]|\d+[.)])\s*')
+
+
+def _normalise(text: str) -> str:
+    """Lowercase, drop markdown/punctuation and collapse whitespace."""
+    text = _BULLET_PREFIX.sub('', text.lower())
+    return ' '.join(re.sub(r"[^\w\s]", ' ', text).split())
+
+
+def _has_cue(heading: str, cues: Iterable[str]) -> bool:
+    padded = f' {heading} '
+    return any(f' {cue}' in padded for cue in cues)
+
+
+def classify_heading(heading: str) -> str:
+    """'core', 'boilerplate' or 'other' for a block heading."""
+    heading = _normalise(heading)
+    if _has_cue(heading, CORE_HEADING_CUES):
+        return 'core'
+    if _has_cue(heading, BOILERPLATE_HEADING_CUES):
+        return 'boilerplate'
+    return 'other'
+
+
+def _heading_of(line: str) -> Optional[Tuple[str, bool]]:
+    """
+    (heading, inline) when a line starts a block, else None.
+
+    Headings are markdown headers, bold lines and short lines ending in
+    a colon. 'Location: Berlin' style lines are inline headings: a
+    one-line block, recognised only for boilerplate labels.
+    """
+    stripped = line.strip()
+    if not stripped or _BULLET_PREFIX.match(stripped):
+        return None
+    if stripped.startswith('#'):
+        return stripped.lstrip('#').strip(), False
+    if stripped.startswith('**') and stripped.endswith('**') and len(stripped) > 4:
+        return stripped.strip('*').strip().rstrip(':'), False
+    if stripped.endswith(':') and len(stripped) <= MAX_HEADING_CHARS:
+        return stripped[:-1].strip(), False
+
+    label, sep, _ = stripped.partition(':')
+    if sep and len(label) <= 30 and classify_heading(label) == 'boilerplate':
+        return label.strip(), True
+    return None
+
+
+def segment_blocks(text: str) -> List[Dict]:
+    """
+    Split a posting into heading-led blocks.
+
+    Each block is {'heading', 'kind', 'start', 'end'} with character
+    offsets into text. Text before the first heading is the 'title'
+    block; other kinds come from classify_heading().
+    """
+    blocks = [{'heading': '', 'kind': 'title', 'start': 0, 'end': 0}]
+    offset = 0
+
+    for line in text.splitlines(keepends=True):
+        found = _heading_of(line)
+        if found is not None:
+            heading, inline = found
+            blocks[-1]['end'] = offset
+            blocks.append({'heading': heading, 'kind': classify_heading(heading),
+                           'start': offset, 'end': offset})
+            if inline:
+                # The label's value is the whole block; what follows is untitled
+                offset += len(line)
+                blocks[-1]['end'] = offset
+                blocks.append({'heading': '', 'kind': 'other', 'start': offset, 'end': offset})
+                continue
+        offset += len(line)
+
+    blocks[-1]['end'] = offset
+    return [block for block in blocks if block['end'] > block['start']]
+
+
+def paragraph_spans(text: str, start: int = 0, end: Optional[int] = None) -> Iterable[Tuple[int, int, str]]:
+    """Yield (start, end, normalised text) for each non-empty line in a range."""
+    end = len(text) if end is None else end
+    offset = start
+    for line in text[start:end].splitlines(keepends=True):
+        normalised = _normalise(line)
+        if normalised:
+            yield offset, offset + len(line), normalised
+        offset += len(line)
+
+
+def paragraph_hash(normalised: str) -> int:
+    """Stable signed 64-bit hash of a normalised paragraph (fits SQLite INTEGER)."""
+    return int.from_bytes(hashlib.sha1(normalised.encode('utf-8')).digest()[:8], 'big', signed=True)
+
+
+class BoilerplateIndex:
+    """
+    On-disk counts of how many distinct postings contain each paragraph.
+
+    Usage:
+        index = BoilerplateIndex(path)
+        index.observe(job_text)
+        spans = find_boilerplate(job_text, index)
+    """
+
+    def __init__(self, path: Path, min_postings: int = 3):
+        self.path = Path(path)
+        self.min_postings = min_postings
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _init_db(self):
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS postings (hash TEXT PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS paragraphs (
+                    hash INTEGER PRIMARY KEY,
+                    postings INTEGER NOT NULL
+                );
+            """)
+
+    def observe(self, text: str) -> bool:
+        """
+        Count the posting's paragraphs once per distinct posting text.
+
+        Returns False when the posting was already observed.
+        """
+        posting_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        hashes = {paragraph_hash(normalised) for _, _, normalised in paragraph_spans(text)
+                  if len(normalised.split()) >= MIN_PARAGRAPH_WORDS}
+
+        with closing(self._connect()) as conn, conn:
+            inserted = conn.execute("INSERT OR IGNORE INTO postings VALUES (?)", (posting_hash,)).rowcount
+            if not inserted:
+                return False
+            conn.executemany(
+                "INSERT INTO paragraphs VALUES (?, 1) "
+                "ON CONFLICT (hash) DO UPDATE SET postings = postings + 1",
+                [(h,) for h in hashes],
+            )
+        return True
+
+    def repeated(self, hashes: Iterable[int]) -> Set[int]:
+        """The hashes seen in at least min_postings postings."""
+        hashes = list(set(hashes))
+        if not hashes:
+            return set()
+        placeholders = ','.join('?' * len(hashes))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT hash FROM paragraphs WHERE postings >= ? AND hash IN ({placeholders})",
+                [self.min_postings] + hashes,
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def __len__(self) -> int:
+        """Distinct postings observed."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+
+def find_boilerplate(text: str, index: Optional[BoilerplateIndex] = None) -> List[Dict]:
+    """
+    Boilerplate spans of a posting as {'start', 'end', 'heading', 'reason'}.
+
+    reason is 'heading' for a block with a boilerplate heading, or
+    'repeated' for a paragraph that the index has seen across postings.
+    Bullets under a core heading are always kept; prose there is still
+    checked, since unlabelled legal text often trails the last section.
+    """
+    spans = []
+    candidates = []
+    for block in segment_blocks(text):
+        if block['kind'] == 'boilerplate':
+            spans.append({'start': block['start'], 'end': block['end'],
+                          'heading': block['heading'], 'reason': 'heading'})
+        elif index is not None:
+            for start, end, normalised in paragraph_spans(text, block['start'], block['end']):
+                if len(normalised.split()) < MIN_PARAGRAPH_WORDS:
+                    continue
+                if block['kind'] == 'core' and _BULLET_PREFIX.match(text[start:end]):
+                    continue
+                candidates.append((start, end, paragraph_hash(normalised), block['heading']))
+
+    if candidates:
+        repeated = index.repeated(h for _, _, h, _ in candidates)
+        spans.extend({'start': start, 'end': end, 'heading': heading, 'reason': 'repeated'}
+                     for start, end, h, heading in candidates if h in repeated)
+
+    return sorted(spans, key=lambda span: span['start'])
+
+
+def mask_spans(text: str, spans: List[Dict]) -> str:
+    """Replace each span with spaces (keeping its final newline), preserving offsets."""
+    parts = []
+    offset = 0
+    for span in spans:
+        chunk = text[span['start']:span['end']]
+        tail = '\n' if chunk.endswith('\n') else ''
+        parts.append(text[offset:span['start']])
+        parts.append(' ' * (len(chunk) - len(tail)) + tail)
+        offset = span['end']
+    parts.append(text[offset:])
+    return ''.join(parts)
+
+
+def strip_boilerplate(text: str, index: Optional[BoilerplateIndex] = None) -> str:
+    """The posting with boilerplate masked out (same length and offsets)."""
+    return mask_spans(text, find_boilerplate(text, index))
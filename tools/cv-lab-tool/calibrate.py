@@ -0,0 +1,251 @@
+"""
+🔒 CAS (Content Administration System) - Scoring Weight Calibration
+===================================================================
+Fits SCORING_WEIGHTS and SCORE_THRESHOLDS to labelled outcomes.
+
+The four component scores (keywords, soft skills, structure, relevance)
+of every labelled CV/job pair are computed once with the app's own
+scoring path and cached as an N x 4 matrix. Candidate weightings are
+then just a matrix product: every weight vector on a simplex grid is
+scored in one vectorised pass by the Spearman correlation between its
+totals and the labels, and the high/medium thresholds are fitted to the
+labelled bands the same way.
+
+Labels come from benchmarks/ats_fixtures.json plus optional outcome
+JSONL files, one pair per line:
+    {"cv": "...", "job": "...", "label": 1}                  # got an interview (0: didn't)
+    {"cv": "...", "job": "...", "label": 4, "band": "high"}  # 1-5 fit rating and expected band
+
+Run Instructions:
+    python calibrate.py                              # Fixtures only
+    python calibrate.py --outcomes outcomes.jsonl    # Add real outcomes
+    python calibrate.py --step 0.02 --json best.json # Finer grid, write the config
+
+Non-obvious: cached rows are keyed by model, pair text and the number
+of postings behind the IDF weights and the boilerplate index, so adding
+outcomes only scores the new pairs. Pass --refresh after changing the
+scoring code itself. Ties between weightings go to the one closest to
+the current SCORING_WEIGHTS, so the weights only move on evidence.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import time
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import spacy
+from scipy.stats import rankdata
+
+from app import (DATA_DIR, SCORE_THRESHOLDS, SCORING_WEIGHTS, calculate_ats_score, extract_keywords,
+                 load_boilerplate_index, load_document_frequencies, strip_job_boilerplate, weight_job_keywords)
+from benchmark import FIXTURES_PATH, load_fixtures
+from boilerplate import BoilerplateIndex
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = tuple(SCORING_WEIGHTS)
+BANDS = ('low', 'medium', 'high')
+
+CACHE_PATH = DATA_DIR / 'score_components.npz'
+
+# Weight vectors scored per matrix product (bounds the N x chunk totals array)
+WEIGHT_CHUNK = 1024
+
+
+def labelled_pairs(fixtures: Dict, outcome_paths: List[Path]) -> List[Dict]:
+    """Fixture pairs plus outcome rows as {'id', 'cv', 'job', 'label', 'band'}."""
+    pairs = [{'id': pair['id'], 'cv': fixtures['cvs'][pair['cv']], 'job': fixtures['jobs'][pair['job']],
+              'label': float(pair['label']), 'band': pair['band']}
+             for pair in fixtures['pairs']]
+    for path in outcome_paths:
+        with open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row.get('band') not in (None,) + BANDS:
+                    logger.warning(f"{path}:{line_no}: unknown band {row['band']!r}, ignored")
+                    row['band'] = None
+                pairs.append({'id': f'{path.name}:{line_no}', 'cv': row['cv'], 'job': row['job'],
+                              'label': float(row['label']), 'band': row.get('band')})
+    return pairs
+
+
+def _pair_key(model: str, pair: Dict) -> str:
+    return hashlib.sha1('\0'.join((model, pair['cv'], pair['job'])).encode('utf-8')).hexdigest()
+
+
+def score_components(cv_text: str, job_text: str, nlp, boilerplate_index: BoilerplateIndex) -> List[float]:
+    """The pair's component scores in COMPONENTS order, as the app computes them (IDF-weighted)."""
+    job_core, _ = strip_job_boilerplate(job_text, boilerplate_index)
+    scores = calculate_ats_score(cv_text, job_core, extract_keywords(cv_text, nlp),
+                                 weight_job_keywords(extract_keywords(job_core, nlp)), nlp)
+    return [scores[name] for name in COMPONENTS]
+
+
+def component_matrix(pairs: List[Dict], nlp, model: str, cache_path: Path = CACHE_PATH,
+                     refresh: bool = False) -> np.ndarray:
+    """
+    (pairs x components) matrix of component scores.
+
+    Rows already in the cache are reused; new rows are scored and the
+    cache is rewritten with every row it has seen.
+    """
+    cached = {}
+    if cache_path.exists() and not refresh:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if tuple(data['components']) == COMPONENTS:
+                cached = dict(zip((str(key) for key in data['keys']), data['matrix']))
+
+    # Every job is counted in the boilerplate index up front, as scoring would,
+    # so the index state below is the one the rows are scored against
+    boilerplate_index = load_boilerplate_index()
+    for pair in pairs:
+        boilerplate_index.observe(pair['job'])
+    # IDF weights and learned boilerplate move as postings are recorded, so
+    # rows are only reused at the same corpus and index sizes
+    salt = f'{model}@{load_document_frequencies().documents}@{len(boilerplate_index)}'
+    keys = [_pair_key(salt, pair) for pair in pairs]
+    missing = [(key, pair) for key, pair in zip(keys, pairs) if key not in cached]
+    if missing:
+        logger.info(f"Scoring {len(missing)} of {len(pairs)} pairs ({len(cached)} cached)")
+        for key, pair in missing:
+            cached[key] = np.array(score_components(pair['cv'], pair['job'], nlp, boilerplate_index),
+                                   dtype=np.float32)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(cache_path, keys=np.array(list(cached)), matrix=np.stack(list(cached.values())),
+                            components=np.array(COMPONENTS))
+
+    return np.stack([cached[key] for key in keys]).astype(np.float64)
+
+
+def weight_grid(step: float) -> np.ndarray:
+    """Every non-negative weight vector summing to 1 in multiples of `step`."""
+    units = int(round(1 / step))
+    rows = [combo + (units - sum(combo),)
+            for combo in product(range(units + 1), repeat=len(COMPONENTS) - 1) if sum(combo) <= units]
+    return np.array(rows, dtype=np.float64) / units
+
+
+def spearman_per_weighting(matrix: np.ndarray, labels: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Spearman correlation of labels with the totals of each weight vector (one per row)."""
+    label_ranks = rankdata(labels)
+    label_ranks = (label_ranks - label_ranks.mean()) / (label_ranks.std() or 1.0)
+
+    result = np.empty(len(weights))
+    for start in range(0, len(weights), WEIGHT_CHUNK):
+        totals = matrix @ weights[start:start + WEIGHT_CHUNK].T  # pairs x chunk
+        ranks = rankdata(totals, axis=0)
+        ranks -= ranks.mean(axis=0)
+        spread = ranks.std(axis=0)
+        spread[spread == 0] = np.inf  # Constant totals rank nothing: correlation 0
+        result[start:start + WEIGHT_CHUNK] = (ranks / spread).T @ label_ranks / len(labels)
+    return result
+
+
+def fit_thresholds(totals: np.ndarray, bands: List[str]) -> Tuple[Dict[str, int], float]:
+    """
+    (thresholds, accuracy) of the integer medium/high cutoffs that put
+    the most pairs in their labelled band, ties to the current cutoffs.
+    """
+    expected = np.array([BANDS.index(band) for band in bands])
+    cutoffs = np.arange(0, 101)
+    # below[b][c]: pairs labelled band b whose total is under cutoff c
+    below = [np.searchsorted(np.sort(totals[expected == b]), cutoffs) for b in range(len(BANDS))]
+    high_count = np.sum(expected == BANDS.index('high'))
+
+    # hits[m, h] = low under m + medium in [m, h) + high at or over h, for every pair of cutoffs at once
+    hits = below[0][:, None] + (below[1][None, :] - below[1][:, None]) + (high_count - below[2])[None, :]
+    accuracy = np.where(cutoffs[:, None] <= cutoffs[None, :], hits / len(totals), -1.0)
+
+    distance = (np.abs(cutoffs - SCORE_THRESHOLDS['medium'])[:, None] +
+                np.abs(cutoffs - SCORE_THRESHOLDS['high'])[None, :])
+    best = np.lexsort((distance.ravel(), -accuracy.ravel()))[0]
+    m, h = np.unravel_index(best, accuracy.shape)
+    return {'high': int(cutoffs[h]), 'medium': int(cutoffs[m])}, float(accuracy[m, h])
+
+
+def calibrate(matrix: np.ndarray, labels: np.ndarray, bands: List[Optional[str]], step: float = 0.05) -> Dict:
+    """Best weights (by Spearman) and thresholds (by band accuracy), with the current config's results."""
+    weights = weight_grid(step)
+    current = np.array([SCORING_WEIGHTS[name] for name in COMPONENTS])
+
+    start = time.perf_counter()
+    correlations = spearman_per_weighting(matrix, labels, np.vstack([current, weights]))
+    current_spearman, correlations = correlations[0], correlations[1:]
+    distance = np.abs(weights - current).sum(axis=1)
+    order = np.lexsort((distance, -np.round(correlations, 6)))
+    best = weights[order[0]]
+
+    report = {
+        'pairs': len(labels),
+        'weightings': len(weights),
+        'current': {'weights': dict(zip(COMPONENTS, current.tolist())), 'spearman': float(current_spearman)},
+        'best': {'weights': {name: round(float(w), 4) for name, w in zip(COMPONENTS, best)},
+                 'spearman': float(correlations[order[0]])},
+        'top': [{'weights': dict(zip(COMPONENTS, weights[i].round(4).tolist())), 'spearman': float(correlations[i])}
+                for i in order[:5]],
+    }
+
+    banded = [i for i, band in enumerate(bands) if band]
+    if banded:
+        expected = np.array([BANDS.index(bands[i]) for i in banded])
+        thresholds, accuracy = fit_thresholds(matrix[banded] @ best, [bands[i] for i in banded])
+        current_bands = np.digitize(matrix[banded] @ current, [SCORE_THRESHOLDS['medium'], SCORE_THRESHOLDS['high']])
+        report['current'].update(thresholds=dict(SCORE_THRESHOLDS),
+                                 band_accuracy=float(np.mean(current_bands == expected)))
+        report['best'].update(thresholds=thresholds, band_accuracy=accuracy)
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+def print_report(report: Dict):
+    print(f"Pairs: {report['pairs']}, weightings evaluated: {report['weightings']:,} "
+          f"in {report['seconds']:.2f}s")
+    print(f"Current Spearman:  {report['current']['spearman']:.3f}")
+    print(f"Best Spearman:     {report['best']['spearman']:.3f}")
+    if 'band_accuracy' in report['best']:
+        print(f"Band accuracy:     {report['current']['band_accuracy']:.0%} current -> "
+              f"{report['best']['band_accuracy']:.0%} calibrated")
+    print("\nTop weightings:")
+    for entry in report['top']:
+        weights = '  '.join(f"{name}={value:.2f}" for name, value in entry['weights'].items())
+        print(f"  {entry['spearman']:.3f}  {weights}")
+
+    print("\n# Calibrated config for app.py")
+    print("SCORING_WEIGHTS = " + json.dumps(report['best']['weights'], indent=4))
+    if 'thresholds' in report['best']:
+        print("SCORE_THRESHOLDS = " + json.dumps(report['best']['thresholds'], indent=4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate ATS scoring weights and thresholds")
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_PATH, help="Fixture JSON file")
+    parser.add_argument('--outcomes', type=Path, nargs='*', default=[], help="Labelled outcome JSONL files")
+    parser.add_argument('--model', default='en_core_web_sm', help="spaCy model to load")
+    parser.add_argument('--step', type=float, default=0.05, help="Weight grid spacing")
+    parser.add_argument('--refresh', action='store_true', help="Rescore every pair, ignoring the cache")
+    parser.add_argument('--json', type=Path, default=None, help="Also write the report to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    # Keep per-call INFO logs from app out of the report
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    pairs = labelled_pairs(load_fixtures(args.fixtures), args.outcomes)
+    matrix = component_matrix(pairs, spacy.load(args.model), args.model, refresh=args.refresh)
+    report = calibrate(matrix, np.array([pair['label'] for pair in pairs]),
+                       [pair['band'] for pair in pairs], step=args.step)
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+🔒 CAS (Content Administration System) - Job Seniority & Role Classifier
+=======================================================================
+Linear classifier that predicts a posting's seniority and role family
+from its full text, for cover letter tone and for routing postings
+before the NLP pipeline runs.
+
+Text is mapped to hashed word unigram/bigram features (no vocabulary to
+ship), plus title-tagged unigrams from the first line, and each label
+set has its own multinomial logistic regression head. Heads are trained
+offline by train_classifier.py and shipped as a NumPy .npz artifact
+(weights as float16, no pickle), so prediction is a sparse dot product
+plus softmax and loading needs no scikit-learn estimator state.
+
+Non-obvious: the featurizer is hand-rolled rather than a
+HashingVectorizer, whose per-call input validation alone costs more than
+hashing a whole posting; token hashes are memoised since postings share
+most of their vocabulary. The hashing settings are saved in the artifact
+and checked on load, as a mismatch would silently scramble every weight.
+Accuracy on held-out real postings (train_classifier.py --holdout) is
+saved too, so the app can tell a validated head from one only tested on
+the templated seed set.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.utils import murmurhash3_32
+
+CLASSIFIER_PATH = Path(__file__).parent / 'data' / 'job_classifier.npz'
+LABELS_PATH = Path(__file__).parent / 'data' / 'job_labels.jsonl'
+
+# Label sets, in order of increasing seniority for 'seniority'
+HEADS = {
+    'seniority': ('junior', 'mid', 'senior', 'lead', 'executive'),
+    'role_family': ('design', 'research', 'product', 'engineering', 'data', 'marketing', 'sales', 'operations'),
+}
+
+# Keeps '5+', '10+' and 'vp' as tokens; years of experience are a strong seniority cue
+TOKEN_PATTERN = r'(?u)\b\w+\+?'
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+# Only the head of a posting is featurized; seniority and role cues come early
+MAX_CHARS = 6000
+
+# Memoised feature hashes are dropped wholesale past this many entries
+_HASH_CACHE_SIZE = 200_000
+_hash_cache: Dict[str, int] = {}
+
+
+def _feature_hash(feature: str) -> int:
+    value = _hash_cache.get(feature)
+    if value is None:
+        if len(_hash_cache) >= _HASH_CACHE_SIZE:
+            _hash_cache.clear()
+        value = _hash_cache[feature] = murmurhash3_32(feature, positive=True)
+    return value
+
+
+def featurize(text: str, n_features: int = 2 ** 15) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (indices, values) of the L2-normalised hashed feature vector for text.
+
+    Features are lowercased word unigrams and bigrams, plus 'title:' tagged
+    unigrams from the first non-empty line (usually the job title).
+    """
+    text = text[:MAX_CHARS].lower()
+    tokens = _TOKEN_RE.findall(text)
+    first_line = text.lstrip().split('\n', 1)[0]
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    features += ['title:' + token for token in _TOKEN_RE.findall(first_line)]
+
+    counts: Dict[int, int] = {}
+    for feature in features:
+        index = _feature_hash(feature) % n_features
+        counts[index] = counts.get(index, 0) + 1
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+def feature_matrix(texts: Iterable[str], n_features: int = 2 ** 15) -> sparse.csr_matrix:
+    """featurize() for many texts, as a (texts x n_features) CSR matrix."""
+    indptr, indices, values = [0], [], []
+    for text in texts:
+        idx, vals = featurize(text, n_features)
+        indices.append(idx)
+        values.append(vals)
+        indptr.append(indptr[-1] + len(idx))
+    return sparse.csr_matrix(
+        (np.concatenate(values) if values else np.empty(0, np.float32),
+         np.concatenate(indices) if indices else np.empty(0, np.int64), indptr),
+        shape=(len(indptr) - 1, n_features))
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class JobClassifier:
+    """
+    Seniority and role-family heads over shared hashed features.
+
+    Usage:
+        classifier = JobClassifier.load(CLASSIFIER_PATH)
+        classifier.predict(job_text)
+        # -> {'seniority': {'label': 'senior', 'confidence': 0.91}, 'role_family': {...}}
+    """
+
+    def __init__(self, heads: Dict[str, Dict], n_features: int, validation: Optional[Dict[str, Dict]] = None):
+        self.heads = heads  # name -> {'labels', 'coef' (labels x features), 'intercept'}
+        self.n_features = n_features
+        self.validation = validation or {}  # name -> {'accuracy', 'examples'} on held-out real postings
+
+    @classmethod
+    def train(cls, texts: List[str], labels: Dict[str, List[str]], n_features: int = 2 ** 15,
+              C: float = 10.0) -> 'JobClassifier':
+        """Fit one logistic regression head per label set in `labels`."""
+        from sklearn.linear_model import LogisticRegression
+
+        X = feature_matrix(texts, n_features)
+        heads = {}
+        for name, values in labels.items():
+            model = LogisticRegression(C=C, max_iter=2000)
+            model.fit(X, values)
+            heads[name] = {
+                'labels': [str(label) for label in model.classes_],
+                'coef': model.coef_.astype(np.float32),
+                'intercept': model.intercept_.astype(np.float32),
+            }
+        return cls(heads, n_features)
+
+    def save(self, path: Path):
+        """Write the heads to a compressed .npz (float16 weights)."""
+        arrays = {'n_features': np.array(self.n_features), 'token_pattern': np.array(TOKEN_PATTERN),
+                  'max_chars': np.array(MAX_CHARS)}
+        for name, head in self.heads.items():
+            arrays[f'{name}.labels'] = np.array(head['labels'])
+            arrays[f'{name}.coef'] = head['coef'].astype(np.float16)
+            arrays[f'{name}.intercept'] = head['intercept']
+            if name in self.validation:
+                arrays[f'{name}.validated_accuracy'] = np.array(self.validation[name]['accuracy'])
+                arrays[f'{name}.validated_examples'] = np.array(self.validation[name]['examples'])
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> 'JobClassifier':
+        with np.load(path, allow_pickle=False) as data:
+            if str(data['token_pattern']) != TOKEN_PATTERN or int(data['max_chars']) != MAX_CHARS:
+                raise ValueError(f"{path} was trained with a different tokenizer; retrain it")
+            names = {key.split('.')[0] for key in data.files if '.' in key}
+            heads = {
+                name: {
+                    'labels': [str(label) for label in data[f'{name}.labels']],
+                    'coef': data[f'{name}.coef'].astype(np.float32),
+                    'intercept': data[f'{name}.intercept'],
+                }
+                for name in names
+            }
+            validation = {
+                name: {'accuracy': float(data[f'{name}.validated_accuracy']),
+                       'examples': int(data[f'{name}.validated_examples'])}
+                for name in names if f'{name}.validated_accuracy' in data.files
+            }
+            return cls(heads, int(data['n_features']), validation)
+
+    def predict_many(self, texts: Iterable[str]) -> List[Dict[str, Dict]]:
+        """predict() for many texts with one sparse matrix product per head."""
+        X = feature_matrix(texts, self.n_features)
+        results = [{} for _ in range(X.shape[0])]
+        for name, head in self.heads.items():
+            probabilities = _softmax(np.asarray(X @ head['coef'].T) + head['intercept'])
+            best = probabilities.argmax(axis=1)
+            for result, row, idx in zip(results, probabilities, best):
+                result[name] = {'label': head['labels'][idx], 'confidence': float(row[idx])}
+        return results
+
+    def predict(self, text: str) -> Dict[str, Dict]:
+        """{head: {'label', 'confidence'}} for one posting."""
+        indices, values = featurize(text, self.n_features)
+        result = {}
+        for name, head in self.heads.items():
+            scores = head['coef'][:, indices] @ values + head['intercept']
+            probabilities = _softmax(scores[None, :])[0]
+            best = int(probabilities.argmax())
+            result[name] = {'label': head['labels'][best], 'confidence': float(probabilities[best])}
+        return result
+
+
+def load_classifier(path: Path = CLASSIFIER_PATH) -> Optional[JobClassifier]:
+    """The shipped classifier, or None when the artifact is missing."""
+    if not Path(path).exists():
+        return None
+    return JobClassifier.load(path)
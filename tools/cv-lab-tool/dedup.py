@@ -0,0 +1,200 @@
+"""
+🔒 CAS (Content Administration System) - Near-Duplicate Job Detection
+=====================================================================
+MinHash + locality-sensitive hashing over normalised job text.
+
+The same role is often reposted by several recruiters with small wording
+changes. Each posting is reduced to a MinHash signature of its word
+shingles; signatures are split into bands and stored in an on-disk
+SQLite index, so a new posting only has to be compared with the few
+earlier postings that share a band bucket. A near-duplicate reuses the
+cached analysis of the canonical (first-seen) posting instead of going
+through the NLP pipeline again.
+
+Non-obvious: with 16 bands of 8 rows, postings below ~0.7 Jaccard
+similarity rarely collide, and candidates are then verified against the
+configured threshold using the full signature. Texts without any words
+(empty, or only punctuation or non-Latin script) have no shingles and
+would all share one all-maximum signature, so they are never indexed or
+matched.
+"""
+
+import json
+import re
+import sqlite3
+import zlib
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Mersenne prime for the universal hash family; a * x stays below 2**62
+MERSENNE_PRIME = (1 << 31) - 1
+
+# Shingles hashed per block, bounding the (num_perm x block) work array
+SHINGLE_BLOCK = 4096
+
+
+def normalise_text(text: str) -> List[str]:
+    """Lowercase, drop punctuation and split into words."""
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).split()
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """
+    Stable 32-bit hashes of the word shingles of normalised text.
+
+    Uses crc32 rather than hash() so signatures survive restarts.
+    """
+    words = normalise_text(text)
+    if len(words) < size:
+        shingles = {' '.join(words)} if words else set()
+    else:
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles),
+                       dtype=np.uint64, count=len(shingles))
+
+
+class NearDuplicateIndex:
+    """
+    On-disk MinHash/LSH index of analysed job postings.
+
+    Usage:
+        index = NearDuplicateIndex(path)
+        duplicate = index.find_duplicate(job_text)
+        if duplicate is None:
+            index.add(job_text, analysis)
+    """
+
+    def __init__(self, path: Path, num_perm: int = 128, bands: int = 16, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.path = Path(path)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        # Fixed seed: the permutations must be identical on every run
+        rng = np.random.RandomState(1)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _init_db(self):
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS postings (
+                    id INTEGER PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS buckets (
+                    bucket INTEGER NOT NULL,
+                    posting_id INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_buckets ON buckets (bucket);
+            """)
+            config = f'{self.num_perm}x{self.bands}'
+            row = conn.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO meta VALUES ('config', ?)", (config,))
+            elif row[0] != config:
+                raise ValueError(f"Index at {self.path} was built with {row[0]}, not {config}")
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature (num_perm uint32 values) of the text's shingles; None without shingles."""
+        hashes = shingle_hashes(text) % MERSENNE_PRIME
+        if not len(hashes):
+            return None
+        signature = np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, len(hashes), SHINGLE_BLOCK):
+            block = hashes[start:start + SHINGLE_BLOCK]
+            permuted = (self._a * block + self._b) % MERSENNE_PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+    def _bucket_keys(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit key per band (band index is part of the key)."""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = zlib.crc32(rows, band) | (band << 32)
+            keys.append(digest)
+        return keys
+
+    def find_duplicate(self, text: str) -> Optional[Dict]:
+        """
+        Return the most similar stored posting at or above the threshold.
+
+        Result: {'id', 'similarity', 'analysis', 'created_at'} or None.
+        similarity is the MinHash estimate of shingle Jaccard similarity.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        keys = self._bucket_keys(signature)
+
+        with closing(self._connect()) as conn:
+            placeholders = ','.join('?' * len(keys))
+            rows = conn.execute(
+                f"SELECT id, signature, analysis, created_at FROM postings WHERE id IN "
+                f"(SELECT DISTINCT posting_id FROM buckets WHERE bucket IN ({placeholders}))",
+                keys,
+            ).fetchall()
+
+        best = None
+        for posting_id, stored, analysis, created_at in rows:
+            similarity = float(np.mean(np.frombuffer(stored, dtype=np.uint32) == signature))
+            if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                best = {
+                    'id': posting_id,
+                    'similarity': similarity,
+                    'analysis': json.loads(analysis),
+                    'created_at': created_at,
+                }
+        return best
+
+    def add(self, text: str, analysis: Dict) -> Optional[int]:
+        """Store a canonical posting with its JSON-serialisable analysis; None if it has no shingles."""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO postings (signature, analysis, created_at) VALUES (?, ?, ?)",
+                (signature.tobytes(), json.dumps(analysis), datetime.now().isoformat(timespec='seconds')),
+            )
+            posting_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO buckets (bucket, posting_id) VALUES (?, ?)",
+                [(key, posting_id) for key in self._bucket_keys(signature)],
+            )
+        return posting_id
+
+    def get(self, posting_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Stored postings by id, as {'id', 'analysis', 'created_at'}; unknown ids are left out."""
+        posting_ids = list(posting_ids)
+        if not posting_ids:
+            return {}
+        placeholders = ','.join('?' * len(posting_ids))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT id, analysis, created_at FROM postings WHERE id IN ({placeholders})",
+                posting_ids,
+            ).fetchall()
+        return {posting_id: {'id': posting_id, 'analysis': json.loads(analysis), 'created_at': created_at}
+                for posting_id, analysis, created_at in rows}
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
@@ -0,0 +1,293 @@
+"""
+🔒 CAS (Content Administration System) - Skill Demand Analytics
+===============================================================
+Incremental counts of the skills job postings ask for, for the
+"what's in demand" dashboard.
+
+Each analysed posting is recorded once, from the keywords scoring
+already extracted, so no NLP is ever re-run. Canonical hard and soft
+skills are counted exactly in an on-disk SQLite store, as the number of
+postings mentioning them, in three rollups: per week, per company and
+per location. The long tail (nouns outside the skill taxonomy) is too
+wide to count exactly and goes into one Space-Saving heavy-hitter
+sketch per week instead.
+
+Non-obvious: every dashboard query reads a rollup that is already
+aggregated, so its cost depends on the number of distinct skills in
+range, not on how many postings were recorded.
+"""
+
+import json
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Rollup table per bucketing dimension
+DIMENSIONS = {'week': 'skill_week', 'company': 'skill_company', 'location': 'skill_location'}
+
+
+def week_of(day: date) -> str:
+    """ISO date of the Monday starting day's week (sorts chronologically)."""
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def recent_weeks(count: int, today: Optional[date] = None) -> List[str]:
+    """The `count` most recent week keys, oldest first, ending with this week."""
+    monday = date.fromisoformat(week_of(today or date.today()))
+    return [(monday - timedelta(weeks=offset)).isoformat() for offset in range(count - 1, -1, -1)]
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch (Metwally et al., 2005).
+
+    Keeps at most `capacity` counters. An unseen item replaces the
+    smallest counter and inherits its count as `error`, so every count
+    is an overestimate by at most its error, and any item occurring more
+    than total/capacity times is guaranteed to be present.
+    """
+
+    def __init__(self, capacity: int, counters: Optional[Dict[str, List[int]]] = None):
+        self.capacity = capacity
+        self.counters = counters or {}  # item -> [count, error]
+
+    def add(self, item: str, count: int = 1):
+        if item in self.counters:
+            self.counters[item][0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+        else:
+            smallest = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(smallest)[0]
+            self.counters[item] = [floor + count, floor]
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Sketch of both streams (counts and errors add; the largest counters are kept)."""
+        merged = {item: list(values) for item, values in self.counters.items()}
+        for item, (count, error) in other.counters.items():
+            values = merged.setdefault(item, [0, 0])
+            values[0] += count
+            values[1] += error
+        capacity = max(self.capacity, other.capacity)
+        kept = sorted(merged.items(), key=lambda entry: -entry[1][0])[:capacity]
+        return SpaceSaving(capacity, dict(kept))
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """The n largest (item, count, error), largest first."""
+        ranked = sorted(self.counters.items(), key=lambda entry: (-entry[1][0], entry[0]))
+        return [(item, count, error) for item, (count, error) in ranked[:n]]
+
+    def to_json(self) -> str:
+        return json.dumps({'capacity': self.capacity, 'counters': self.counters})
+
+    @classmethod
+    def from_json(cls, text: str) -> 'SpaceSaving':
+        data = json.loads(text)
+        return cls(data['capacity'], data['counters'])
+
+
+class DemandStore:
+    """
+    On-disk skill demand counts, updated one posting at a time.
+
+    Usage:
+        store = DemandStore(path)
+        store.record(text_hash, job_keywords, company, location)
+        store.top_skills(weeks=recent_weeks(12))
+        store.rising_skills()
+    """
+
+    def __init__(self, path: Path, sketch_capacity: int = 500):
+        self.path = Path(path)
+        self.sketch_capacity = sketch_capacity
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _init_db(self):
+        rollups = '\n'.join(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    skill TEXT NOT NULL,
+                    postings INTEGER NOT NULL,
+                    PRIMARY KEY (bucket, kind, skill)
+                );""" for table in DIMENSIONS.values())
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS postings (
+                    key TEXT PRIMARY KEY,
+                    week TEXT NOT NULL,
+                    company TEXT NOT NULL,
+                    location TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS bucket_totals (
+                    dimension TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    postings INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, bucket)
+                );
+                CREATE TABLE IF NOT EXISTS term_sketches (
+                    week TEXT PRIMARY KEY,
+                    sketch TEXT NOT NULL
+                );
+                {rollups}
+            """)
+
+    def record(self, key: str, job_keywords: Dict, company: str = '', location: str = '',
+               when: Optional[datetime] = None) -> bool:
+        """
+        Count one posting's skills under its week, company and location.
+
+        `key` identifies the posting (e.g. a text hash); a key already
+        recorded is ignored and False is returned. Nouns that are not
+        hard skills feed the week's long-tail sketch.
+        """
+        week = week_of((when or datetime.now()).date())
+        buckets = {'week': week, 'company': company.strip() or '(unknown)',
+                   'location': location.strip() or '(unknown)'}
+        skills = [('hard', skill) for skill in set(job_keywords.get('hard_skills', []))]
+        skills += [('soft', skill) for skill in set(job_keywords.get('soft_skills', []))]
+        hard = set(job_keywords.get('hard_skills', []))
+        terms = {noun.lower() for noun in job_keywords.get('nouns', [])} - hard
+
+        with closing(self._connect()) as conn, conn:
+            inserted = conn.execute("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?)",
+                                    (key, week, buckets['company'], buckets['location'])).rowcount
+            if not inserted:
+                return False
+
+            for dimension, table in DIMENSIONS.items():
+                bucket = buckets[dimension]
+                conn.execute(
+                    "INSERT INTO bucket_totals VALUES (?, ?, 1) "
+                    "ON CONFLICT (dimension, bucket) DO UPDATE SET postings = postings + 1",
+                    (dimension, bucket),
+                )
+                conn.executemany(
+                    f"INSERT INTO {table} VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT (bucket, kind, skill) DO UPDATE SET postings = postings + 1",
+                    [(bucket, kind, skill) for kind, skill in skills],
+                )
+
+            row = conn.execute("SELECT sketch FROM term_sketches WHERE week = ?", (week,)).fetchone()
+            sketch = SpaceSaving.from_json(row[0]) if row else SpaceSaving(self.sketch_capacity)
+            for term in terms:
+                sketch.add(term)
+            conn.execute("INSERT OR REPLACE INTO term_sketches VALUES (?, ?)", (week, sketch.to_json()))
+        return True
+
+    def _bucket_filter(self, buckets: Optional[Iterable[str]]) -> Tuple[str, List[str]]:
+        if buckets is None:
+            return '', []
+        buckets = list(buckets)
+        return f" AND bucket IN ({','.join('?' * len(buckets))})", buckets
+
+    def total_postings(self, dimension: str = 'week', buckets: Optional[Iterable[str]] = None) -> int:
+        """Postings recorded in the given buckets (all when None)."""
+        where, params = self._bucket_filter(buckets)
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT COALESCE(SUM(postings), 0) FROM bucket_totals "
+                               f"WHERE dimension = ?{where}", [dimension] + params).fetchone()
+        return row[0]
+
+    def skill_counts(self, dimension: str = 'week', buckets: Optional[Iterable[str]] = None,
+                     kind: str = 'hard') -> Dict[str, int]:
+        """skill -> postings mentioning it, over the given buckets of one dimension."""
+        where, params = self._bucket_filter(buckets)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT skill, SUM(postings) FROM {DIMENSIONS[dimension]} WHERE kind = ?{where} GROUP BY skill",
+                [kind] + params,
+            ).fetchall()
+        return dict(rows)
+
+    def top_skills(self, n: int = 20, dimension: str = 'week', buckets: Optional[Iterable[str]] = None,
+                   kind: str = 'hard') -> List[Dict]:
+        """
+        The n most demanded skills as {'skill', 'postings', 'share'}.
+
+        share is the fraction of postings in range that ask for the
+        skill. Filter by company or location with dimension='company'
+        and buckets=[name].
+        """
+        buckets = None if buckets is None else list(buckets)
+        counts = self.skill_counts(dimension, buckets, kind)
+        total = self.total_postings(dimension, buckets) or 1
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+        return [{'skill': skill, 'postings': count, 'share': count / total} for skill, count in ranked]
+
+    def rising_skills(self, recent: int = 4, baseline: int = 8, n: int = 10, kind: str = 'hard',
+                      min_postings: int = 2, today: Optional[date] = None) -> List[Dict]:
+        """
+        Skills whose share of postings grew most in the last `recent` weeks.
+
+        Compares with the `baseline` weeks before them. Shares are
+        smoothed (one pseudo-posting each way) so a skill absent from
+        the baseline does not get an infinite lift. Returns
+        {'skill', 'recent_share', 'baseline_share', 'lift'}, largest
+        lift first.
+        """
+        weeks = recent_weeks(recent + baseline, today)
+        recent_buckets, baseline_buckets = weeks[baseline:], weeks[:baseline]
+        recent_counts = self.skill_counts('week', recent_buckets, kind)
+        baseline_counts = self.skill_counts('week', baseline_buckets, kind)
+        recent_total = self.total_postings('week', recent_buckets)
+        baseline_total = self.total_postings('week', baseline_buckets)
+
+        rising = []
+        for skill, count in recent_counts.items():
+            if count < min_postings:
+                continue
+            recent_share = (count + 1) / (recent_total + 2)
+            baseline_share = (baseline_counts.get(skill, 0) + 1) / (baseline_total + 2)
+            rising.append({
+                'skill': skill,
+                'recent_share': count / recent_total,
+                'baseline_share': baseline_counts.get(skill, 0) / baseline_total if baseline_total else 0.0,
+                'lift': recent_share / baseline_share,
+            })
+        rising.sort(key=lambda item: (-item['lift'], item['skill']))
+        return [item for item in rising if item['lift'] > 1.0][:n]
+
+    def coverage(self, cv_skills: Iterable[str], n: int = 20, buckets: Optional[Iterable[str]] = None,
+                 kind: str = 'hard') -> Dict:
+        """
+        How many of the top-n demanded skills the CV has.
+
+        Returns {'covered', 'missing', 'share', 'weighted_share'}; the
+        weighted share counts each skill by how many postings ask for it.
+        """
+        top = self.top_skills(n, 'week', buckets, kind)
+        cv_skills = {skill.lower() for skill in cv_skills}
+        covered = [item for item in top if item['skill'].lower() in cv_skills]
+        missing = [item for item in top if item['skill'].lower() not in cv_skills]
+        demand = sum(item['postings'] for item in top)
+        return {
+            'covered': covered,
+            'missing': missing,
+            'share': len(covered) / len(top) if top else 0.0,
+            'weighted_share': sum(item['postings'] for item in covered) / demand if demand else 0.0,
+        }
+
+    def emerging_terms(self, weeks: Iterable[str], n: int = 20) -> List[Tuple[str, int, int]]:
+        """Most frequent long-tail terms over the weeks, as (term, count, error)."""
+        weeks = list(weeks)
+        if not weeks:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT sketch FROM term_sketches WHERE week IN ({','.join('?' * len(weeks))})", weeks,
+            ).fetchall()
+        sketch = SpaceSaving(self.sketch_capacity)
+        for (text,) in rows:
+            sketch = sketch.merge(SpaceSaving.from_json(text))
+        return sketch.top(n)
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
@@ -0,0 +1,89 @@
+"""
+🔒 CAS (Content Administration System) - Skill Document Frequencies
+====================================================================
+Corpus statistics for IDF-weighted keyword scoring: how many analysed
+postings mention each taxonomy term (hard or soft skill).
+
+Counts live in one flat uint32 file indexed by term ID, with the
+posting total in slot 0. The file is memory-mapped read/write, so
+recording a posting touches only its own terms' slots and weighting a
+job's skills is a fancy index over their IDs - no corpus pass per
+request.
+
+Non-obvious: term IDs are positions in the taxonomy's term list, so
+they shift when the taxonomy changes. The list is saved beside the
+counts and, on a mismatch, counts are carried over by term name and
+the file is rewritten. Writes must come from a single process.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+import numpy as np
+
+
+class DocumentFrequencies:
+    """
+    Per-term posting counts with smoothed IDF lookups.
+
+    Usage:
+        doc_freqs = DocumentFrequencies(path, terms)
+        doc_freqs.add([3, 17, 42])   # term IDs of one posting
+        doc_freqs.idf([3, 42])       # -> array of weights, rare terms highest
+    """
+
+    def __init__(self, path: Path, terms: List[str]):
+        self.path = Path(path)
+        self.terms = list(terms)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counts = self._open()
+
+    def _open(self) -> np.memmap:
+        counts_path = self.path / 'counts.bin'
+        terms_path = self.path / 'terms.json'
+        size = len(self.terms) + 1
+
+        stored = json.loads(terms_path.read_text()) if terms_path.exists() and counts_path.exists() else None
+        if stored != self.terms:
+            counts = np.zeros(size, dtype=np.uint32)
+            if stored is not None:
+                old = np.fromfile(counts_path, dtype=np.uint32)
+                old_slots = {term: slot for slot, term in enumerate(stored, start=1) if slot < len(old)}
+                counts[0] = old[0] if len(old) else 0
+                for slot, term in enumerate(self.terms, start=1):
+                    if term in old_slots:
+                        counts[slot] = old[old_slots[term]]
+            counts.tofile(counts_path)
+            terms_path.write_text(json.dumps(self.terms))
+
+        return np.memmap(counts_path, dtype=np.uint32, mode='r+', shape=(size,))
+
+    @property
+    def documents(self) -> int:
+        """Postings recorded so far."""
+        return int(self._counts[0])
+
+    def add(self, term_ids: Iterable[int]):
+        """Record one posting mentioning these terms (repeats count once)."""
+        slots = np.unique(np.fromiter(term_ids, dtype=np.int64)) + 1
+        with self._lock:
+            self._counts[slots] += 1
+            self._counts[0] += 1
+            self._counts.flush()
+
+    def idf(self, term_ids: Iterable[int]) -> np.ndarray:
+        """
+        Smoothed IDF, ln((1 + N) / (1 + df)) + 1, per term ID.
+
+        Every weight is 1.0 while no postings are recorded, and a term
+        seen in every posting still weighs 1.0, never zero.
+        """
+        slots = np.fromiter(term_ids, dtype=np.int64) + 1
+        df = self._counts[slots].astype(np.float64)
+        return np.log((1.0 + self.documents) / (1.0 + df)) + 1.0
+
+    def __len__(self) -> int:
+        return self.documents
@@ -0,0 +1,309 @@
+"""
+🔒 CAS (Content Administration System) - Posting Gazetteer
+==========================================================
+Company, job title and location extraction from job postings.
+
+A packaged gazetteer (data/gazetteer.tsv: cities, countries, remote and
+hybrid markers, company suffixes, job title words) is compiled into a
+word-level trie. A posting is tokenised once and scanned left to right;
+at each word the trie gives the longest gazetteer match, and nearby cue
+words ('based in', 'join', 'is hiring', 'looking for a') raise the
+confidence of the candidates they introduce. Every field comes out of
+that single pass as {'value', 'confidence'}.
+
+Non-obvious: lookup cost depends on the longest entry (in words), not on
+the number of entries, so tens of thousands of places cost the same per
+token as a handful. Matching is case-insensitive except that places must
+be capitalised in the text and short all-caps entries ('US', 'UK') must
+be all-caps, so 'About us' never reads as a country.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+GAZETTEER_PATH = Path(__file__).parent / 'data' / 'gazetteer.tsv'
+
+# Entry kinds in the data file
+PLACE_KINDS = ('city', 'country')
+KINDS = PLACE_KINDS + ('work_mode', 'company_suffix', 'title_word')
+
+# Cue words (lowercase) that introduce a field on the same line
+LOCATION_CUES = {'location', 'located', 'based', 'office', 'offices', 'hq', 'headquartered'}
+COMPANY_CUES_BEFORE = {'join', 'about', 'at'}          # 'Join Acme', 'About Acme'
+COMPANY_CUES_AFTER = {'hiring', 'looking', 'seeking'}  # 'Acme is hiring'
+TITLE_CUES = {'position', 'role', 'title', 'hiring', 'for', 'seeking'}
+TITLE_SKIP_PREFIXES = ('about', 'we ', "we'", 'our ')
+MAX_TITLE_WORDS = 8
+
+# Capitalised words that never start a company name
+NON_NAME_WORDS = {'us', 'our', 'the', 'we', 'a', 'an', 'you', 'your', 'this', 'role', 'team'}
+
+# Mailbox providers whose domain says nothing about the employer
+FREEMAIL_DOMAINS = {'gmail', 'googlemail', 'outlook', 'hotmail', 'yahoo', 'icloud', 'proton', 'protonmail'}
+
+# Confidence by evidence (combined with max(), never summed past 1.0)
+CONFIDENCE = {
+    'title_first_line': 0.9,
+    'title_first_line_no_title_word': 0.5,
+    'title_cue': 0.7,
+    'company_suffix': 0.9,
+    'company_is_hiring': 0.7,
+    'company_cue': 0.6,
+    'company_email': 0.4,
+    'city': 0.6,
+    'country': 0.5,
+    'location_cue_bonus': 0.3,
+    'work_mode': 0.6,
+}
+
+_TOKEN_PATTERN = re.compile(
+    r"(?P<email>[\w.+-]+@[\w-]+(?:\.[\w-]+)+)"
+    r"|(?P<word>[^\W_]+(?:['’&][^\W_]+)*)"
+    r"|(?P<newline>\n)"
+)
+
+# Trie node key marking the end of an entry
+_END = ''
+
+
+def tokenize(text: str) -> List[Tuple[str, str, int, int]]:
+    """(kind, token, start, end) for every email, word and newline (punctuation is skipped)."""
+    return [(match.lastgroup, match.group(), match.start(), match.end())
+            for match in _TOKEN_PATTERN.finditer(text)]
+
+
+def _phrase_words(phrase: str) -> List[str]:
+    return [token for kind, token, _, _ in tokenize(phrase) if kind == 'word']
+
+
+class Gazetteer:
+    """
+    Word-level trie of gazetteer entries.
+
+    Usage:
+        gazetteer = Gazetteer.from_file(GAZETTEER_PATH)
+        fields = extract_posting_fields(job_text, gazetteer)
+    """
+
+    def __init__(self):
+        self.trie = {}  # lowercase word -> child node; _END -> [(kind, canonical, exact case)]
+        self.max_words = 0
+        self.size = 0
+
+    @classmethod
+    def from_file(cls, path: Path = GAZETTEER_PATH) -> 'Gazetteer':
+        """
+        Load a tab-separated gazetteer: kind, phrase[, canonical].
+
+        Blank lines and lines starting with '#' are ignored.
+        """
+        gazetteer = cls()
+        with open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.rstrip('\n')
+                if not line.strip() or line.startswith('#'):
+                    continue
+                parts = line.split('\t')
+                if len(parts) not in (2, 3) or parts[0] not in KINDS:
+                    raise ValueError(f"{path}:{line_no}: expected 'kind<TAB>phrase[<TAB>canonical]'")
+                gazetteer.add(*parts)
+        return gazetteer
+
+    def add(self, kind: str, phrase: str, canonical: Optional[str] = None):
+        """Add an entry; the canonical form defaults to the phrase itself."""
+        words = _phrase_words(phrase)
+        if not words:
+            return
+        node = self.trie
+        for word in words:
+            node = node.setdefault(word.lower(), {})
+        # Short all-caps entries ('US', 'UK') must match case exactly
+        case_sensitive = phrase.isupper() and len(phrase.replace('.', '')) <= 3
+        node.setdefault(_END, []).append((kind, canonical or phrase, phrase if case_sensitive else None))
+        self.max_words = max(self.max_words, len(words))
+        self.size += 1
+
+    def longest_match(self, words: List[str], start: int, stop: Optional[int] = None,
+                      lowered: Optional[List[str]] = None) -> Optional[Tuple[int, List[Tuple[str, str]]]]:
+        """
+        Longest entry starting at words[start] and ending before words[stop].
+
+        Returns (end, [(kind, canonical), ...]) with `end` exclusive, or
+        None. One phrase can have several kinds ('Jersey' city/country).
+        Pass `lowered` (the words lowercased) when scanning many positions.
+        """
+        lowered = lowered or [word.lower() for word in words[start:start + self.max_words]]
+        offset = 0 if len(lowered) == len(words) else start
+        node = self.trie
+        best = None
+        stop = len(words) if stop is None else stop
+        for end in range(start, min(stop, start + self.max_words)):
+            node = node.get(lowered[end - offset])
+            if node is None:
+                break
+            if _END in node:
+                surface = ' '.join(words[start:end + 1])
+                entries = [(kind, canonical) for kind, canonical, exact in node[_END]
+                           if exact is None or exact == surface]
+                if _kind_ok(entries, words[start]):
+                    best = (end + 1, entries)
+        return best
+
+
+def _kind_ok(entries: List[Tuple[str, str]], first_word: str) -> bool:
+    """Places must be capitalised in the text; other kinds match any case."""
+    if not entries:
+        return False
+    if all(kind in PLACE_KINDS for kind, _ in entries):
+        return first_word[:1].isupper()
+    return True
+
+
+def _field(value: str = '', confidence: float = 0.0) -> Dict:
+    return {'value': value, 'confidence': confidence}
+
+
+def _offer(fields: Dict, name: str, value: str, confidence: float):
+    """
+    Keep the higher-confidence candidate.
+
+    On ties the earlier one wins, unless the new value extends it
+    ('Lead' -> 'Lead Product Designer').
+    """
+    value = value.strip(' -–—|,:')
+    confidence = round(min(confidence, 1.0), 2)
+    current = fields[name]
+    if value and (confidence > current['confidence'] or
+                  (confidence == current['confidence'] and value.startswith(current['value']))):
+        fields[name] = _field(value, confidence)
+
+
+def _capitalised_run(words: List[str], joined: List[bool], start: int, step: int, first: int, stop: int,
+                     limit: int = 4) -> List[int]:
+    """
+    Indexes of consecutive capitalised words from start within [first, stop).
+
+    joined[i] says words i and i + 1 belong to one name (only whitespace,
+    an '&' or a bare hyphen between them); the run stops at any other
+    gap, so 'Designer - Acme Ltd' never reaches back across the dash.
+    """
+    run = []
+    i = start
+    while first <= i < stop and len(run) < limit:
+        word = words[i]
+        if not (word[:1].isupper() or word[:1].isdigit()):
+            break
+        if run and not joined[min(i, i - step)]:
+            break
+        run.append(i)
+        i += step
+    return sorted(run)
+
+
+def extract_posting_fields(text: str, gazetteer: Gazetteer) -> Dict[str, Dict]:
+    """
+    Extract job_title, company_name, location, work_mode and contact_email.
+
+    The text is tokenised once, then scanned word by word; each field is
+    {'value', 'confidence'}, with an empty value and confidence 0.0 when
+    nothing was found.
+    """
+    fields = {name: _field() for name in
+              ('job_title', 'company_name', 'location', 'work_mode', 'contact_email')}
+
+    words, starts, ends, word_lines = [], [], [], []
+    line_bounds = []  # (start char, end char) per line
+    line_stops = []   # per line: index one past its last word
+    location_lines = set()
+    line_start = 0
+
+    for kind, token, start, end in tokenize(text):
+        if kind == 'newline':
+            line_bounds.append((line_start, start))
+            line_stops.append(len(words))
+            line_start = end
+        elif kind == 'email':
+            _offer(fields, 'contact_email', token, 1.0)
+            domain = token.split('@', 1)[1].split('.')[0]
+            if domain.lower() not in FREEMAIL_DOMAINS:
+                _offer(fields, 'company_name', domain.capitalize(), CONFIDENCE['company_email'])
+        else:
+            if token.lower() in LOCATION_CUES:
+                location_lines.add(len(line_bounds))
+            words.append(token)
+            starts.append(start)
+            ends.append(end)
+            word_lines.append(len(line_bounds))
+    line_bounds.append((line_start, len(text)))
+    line_stops.append(len(words))
+    gaps = (text[ends[k]:starts[k + 1]] for k in range(len(words) - 1))
+    joined = [gap.strip() in ('', '&') or gap == '-' for gap in gaps] + [False]
+
+    lowered = [word.lower() for word in words]
+    first_words = gazetteer.trie
+    title_lines = set()
+    i = 0
+    while i < len(words):
+        line = word_lines[i]
+        line_first = line_stops[line - 1] if line else 0
+        lower = lowered[i]
+
+        # Company: 'Acme is hiring' looks back from the verb
+        if lower in COMPANY_CUES_AFTER and i - 2 >= line_first and lowered[i - 1] in ('is', 'are'):
+            run = _capitalised_run(words, joined, i - 2, -1, line_first, line_stops[line])
+            if run and lowered[run[0]] not in NON_NAME_WORDS:
+                _offer(fields, 'company_name', text[starts[run[0]]:ends[run[-1]]], CONFIDENCE['company_is_hiring'])
+
+        # Company: 'Join Acme', 'About Acme' look ahead from the cue
+        if lower in COMPANY_CUES_BEFORE and i + 1 < line_stops[line] \
+                and lowered[i + 1] not in NON_NAME_WORDS:
+            run = _capitalised_run(words, joined, i + 1, 1, line_first, line_stops[line])
+            if run:
+                _offer(fields, 'company_name', text[starts[run[0]]:ends[run[-1]]], CONFIDENCE['company_cue'])
+
+        found = lower in first_words and gazetteer.longest_match(words, i, line_stops[line], lowered)
+        if not found:
+            i += 1
+            continue
+
+        match_end, entries = found
+        cue_bonus = CONFIDENCE['location_cue_bonus'] if line in location_lines else 0.0
+        for kind, canonical in entries:
+            if kind in PLACE_KINDS:
+                _offer(fields, 'location', canonical, CONFIDENCE[kind] + cue_bonus)
+            elif kind == 'work_mode':
+                _offer(fields, 'work_mode', canonical, CONFIDENCE['work_mode'] + cue_bonus)
+            elif kind == 'title_word':
+                title_lines.add(line)
+                # 'looking for a Senior Product Designer' ends at the title word
+                run = _capitalised_run(words, joined, match_end - 1, -1, line_first, line_stops[line], limit=6)
+                cue_at = run[0] - 1 if run else -1
+                if cue_at > line_first and lowered[cue_at] in ('a', 'an'):
+                    cue_at -= 1
+                if cue_at >= line_first and lowered[cue_at] in TITLE_CUES:
+                    _offer(fields, 'job_title', text[starts[run[0]]:ends[match_end - 1]], CONFIDENCE['title_cue'])
+            elif kind == 'company_suffix' and i > line_first and joined[i - 1] and not (
+                    # A suffix ends the name: 'Design Systems Lead' is a title
+                    match_end < line_stops[line] and joined[match_end - 1] and words[match_end][:1].isupper()):
+                run = _capitalised_run(words, joined, i - 1, -1, line_first, line_stops[line])
+                while run and lowered[run[0]] in COMPANY_CUES_BEFORE:  # 'Join Acme Ltd'
+                    run = run[1:]
+                if run and lowered[run[0]] not in NON_NAME_WORDS:
+                    _offer(fields, 'company_name', text[starts[run[0]]:ends[match_end - 1]],
+                           CONFIDENCE['company_suffix'])
+        i = match_end
+
+    # The first lines usually carry the title ('Senior Designer - Acme');
+    # sentences are left to the cue-based candidates above
+    for line, (start, end) in enumerate(line_bounds[:5]):
+        line_text = text[start:end].strip().lstrip('#* ').rstrip('*')
+        if not line_text or line_text.lower().startswith(TITLE_SKIP_PREFIXES):
+            continue
+        title = re.split(r'\s+[-–—|]\s+|\s*[(:]', line_text)[0]
+        if 10 < len(title) < 80 and len(title.split()) <= MAX_TITLE_WORDS and not title.endswith(('.', '!', '?')):
+            _offer(fields, 'job_title', title, CONFIDENCE['title_first_line'] if line in title_lines
+                   else CONFIDENCE['title_first_line_no_title_word'])
+            break
+
+    return fields
@@ -0,0 +1,206 @@
+"""
+🔒 CAS (Content Administration System) - Resume & Letter History
+================================================================
+Local history of every generated and edited resume and cover letter,
+with the score and job it was made for.
+
+Versions are near-identical copies of one CV, so each is stored as a
+list of section chunks (split before headings and after blank lines).
+Chunks are keyed by content hash and stored once, however many
+versions share them. Each chunk is zlib-compressed with its base CV as
+the preset dictionary, which makes it a compressed delta against that
+CV: unchanged lines become back-references of a few bytes.
+
+Usage:
+    store = HistoryStore(path)
+    version_id = store.save('resume', text, base=cv_text, score=72.5,
+                            job={'hash': ..., 'title': ..., 'company': ...})
+    store.versions('resume')  # newest first
+    store.load(version_id)    # -> text
+
+Non-obvious: zlib dictionaries only reach back 32 KB, so a chunk is a
+delta against the last 32 KB of its base CV. Longer CVs still
+deduplicate; they just compress a little less. A chunk keeps the base
+it was first stored with, so loading it never depends on later bases.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import zlib
+from array import array
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# zlib's window: the most of a base CV a chunk can reference
+ZDICT_BYTES = 32 * 1024
+
+# Chunk boundaries: before a Markdown heading and after a blank line
+_CHUNK_BOUNDARY = re.compile(r'(?m)(?=^#)|(?<=\n\n)(?=[^\n])')
+
+# Chunk lookups per IN (...) query, under SQLite's bound-parameter limit
+LOOKUP_BATCH = 500
+
+
+def split_chunks(text: str) -> List[str]:
+    """Section chunks of a text; joining them gives back the text exactly."""
+    return [chunk for chunk in _CHUNK_BOUNDARY.split(text) if chunk]
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.sha1(data).digest()
+
+
+class HistoryStore:
+    """
+    Versions of resumes and letters as deduplicated, delta-compressed chunks.
+
+    Usage:
+        store = HistoryStore(path)
+        store.save('letter', text, base=cv_text)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._zdicts: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS bases (
+                    id INTEGER PRIMARY KEY,
+                    digest BLOB UNIQUE NOT NULL,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY,
+                    digest BLOB UNIQUE NOT NULL,
+                    base_id INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS versions (
+                    id INTEGER PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    digest BLOB NOT NULL,
+                    chunks BLOB NOT NULL,
+                    length INTEGER NOT NULL,
+                    score REAL,
+                    job_hash TEXT,
+                    job_title TEXT,
+                    company_name TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_versions_kind ON versions (kind, id);
+                CREATE INDEX IF NOT EXISTS idx_versions_job ON versions (job_hash);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _base_id(self, conn: sqlite3.Connection, data: bytes) -> int:
+        digest = _digest(data)
+        row = conn.execute("SELECT id FROM bases WHERE digest = ?", (digest,)).fetchone()
+        if row:
+            return row[0]
+        return conn.execute("INSERT INTO bases (digest, data) VALUES (?, ?)",
+                            (digest, zlib.compress(data, 9))).lastrowid
+
+    def _zdict(self, conn: sqlite3.Connection, base_id: int) -> bytes:
+        # Only called on committed bases, so a cached ID is never reused by a rolled-back insert
+        if base_id not in self._zdicts:
+            data = conn.execute("SELECT data FROM bases WHERE id = ?", (base_id,)).fetchone()[0]
+            self._zdicts[base_id] = zlib.decompress(data)[-ZDICT_BYTES:]
+        return self._zdicts[base_id]
+
+    def _lookup(self, conn: sqlite3.Connection, column: str, values: List, fields: str) -> List:
+        rows = []
+        for start in range(0, len(values), LOOKUP_BATCH):
+            batch = values[start:start + LOOKUP_BATCH]
+            rows += conn.execute(f"SELECT {fields} FROM chunks WHERE {column} IN "
+                                 f"({','.join('?' * len(batch))})", batch).fetchall()
+        return rows
+
+    def save(self, kind: str, text: str, base: str, source: str = 'generated', score: Optional[float] = None,
+             job: Optional[Dict] = None) -> int:
+        """
+        Store one version of a resume or letter and return its ID.
+
+        `base` is the CV it was tailored from; `job` may hold the posting's
+        'hash', 'title' and 'company'. Only chunks not already stored
+        are compressed and written.
+        """
+        job = job or {}
+        chunks = [chunk.encode('utf-8') for chunk in split_chunks(text)]
+        digests = [_digest(chunk) for chunk in chunks]
+        with self._lock, closing(self._connect()) as conn, conn:
+            base_data = base.encode('utf-8')
+            base_id = self._base_id(conn, base_data)
+            ids = dict(self._lookup(conn, 'digest', list(set(digests)), 'digest, id'))
+            zdict = base_data[-ZDICT_BYTES:]
+            for digest, chunk in zip(digests, chunks):
+                if digest not in ids:
+                    compressor = zlib.compressobj(9, zdict=zdict)
+                    ids[digest] = conn.execute(
+                        "INSERT INTO chunks (digest, base_id, data) VALUES (?, ?, ?)",
+                        (digest, base_id, compressor.compress(chunk) + compressor.flush())).lastrowid
+            return conn.execute(
+                "INSERT INTO versions (created_at, kind, source, digest, chunks, length, score, job_hash, "
+                "job_title, company_name) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec='seconds'), kind, source, _digest(text.encode('utf-8')),
+                 array('I', (ids[digest] for digest in digests)).tobytes(), len(text), score,
+                 job.get('hash'), job.get('title'), job.get('company'))
+            ).lastrowid
+
+    def load(self, version_id: int) -> Optional[str]:
+        """A version's full text, or None if there is no such version."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT chunks FROM versions WHERE id = ?", (version_id,)).fetchone()
+            if row is None:
+                return None
+            chunk_ids = array('I', row[0])
+            chunks = {}
+            for chunk_id, base_id, data in self._lookup(conn, 'id', list(set(chunk_ids)), 'id, base_id, data'):
+                decompressor = zlib.decompressobj(zdict=self._zdict(conn, base_id))
+                chunks[chunk_id] = decompressor.decompress(data) + decompressor.flush()
+        return b''.join(chunks[chunk_id] for chunk_id in chunk_ids).decode('utf-8')
+
+    def latest_digest(self, kind: str) -> Optional[bytes]:
+        """Content hash of the newest version of this kind (to skip saving unchanged text)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT digest FROM versions WHERE kind = ? ORDER BY id DESC LIMIT 1",
+                               (kind,)).fetchone()
+        return row[0] if row else None
+
+    def versions(self, kind: Optional[str] = None, limit: int = 50, job_hash: Optional[str] = None) -> List[Dict]:
+        """Stored versions, newest first, optionally of one kind or for one job (without their text)."""
+        query = "SELECT id, created_at, kind, source, length, score, job_hash, job_title, company_name FROM versions"
+        clauses, params = [], []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if job_hash:
+            clauses.append("job_hash = ?")
+            params.append(job_hash)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+        keys = ('id', 'created_at', 'kind', 'source', 'length', 'score', 'job_hash', 'job_title', 'company_name')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self) -> Dict:
+        """Versions, distinct chunks, and raw text vs stored chunk and base bytes."""
+        with closing(self._connect()) as conn:
+            versions, raw = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM versions").fetchone()
+            chunks, chunk_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM chunks").fetchone()
+            bases, base_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM bases").fetchone()
+        return {'versions': versions, 'chunks': chunks, 'bases': bases, 'raw_chars': raw,
+                'stored_bytes': chunk_bytes + base_bytes}
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0]
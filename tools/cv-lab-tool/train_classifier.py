@@ -0,0 +1,127 @@
+"""
+🔒 CAS (Content Administration System) - Train Job Classifier
+=============================================================
+Offline training for the seniority / role-family classifier shipped in
+data/job_classifier.npz (see classifier.py).
+
+Training data is JSONL, one posting per line:
+    {"text": "...", "seniority": "senior", "role_family": "design"}
+
+data/job_labels.jsonl is a small templated seed set; pass your own
+labelled postings with --labels to train on real data as well.
+
+Run Instructions:
+    python train_classifier.py                          # Evaluate, then train and save
+    python train_classifier.py --labels mine.jsonl      # Add labelled postings
+    python train_classifier.py --holdout real.jsonl     # Validate on real postings never trained on
+    python train_classifier.py --dry-run                # Evaluate only
+
+Non-obvious: accuracy is reported on a held-out split before the final
+model is fitted on every example, and the held-out split is stratified
+by seniority so small classes are always tested. On the templated seed
+set that split scores near 100% and proves little, so only --holdout
+accuracy is saved with the artifact; the app lets a head drive cover
+letter tone and routing only once it is validated that way.
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from classifier import CLASSIFIER_PATH, HEADS, LABELS_PATH, JobClassifier
+
+logger = logging.getLogger(__name__)
+
+
+def load_labelled(paths: List[Path]) -> List[Dict]:
+    """Labelled postings from JSONL files, skipping rows with unknown labels."""
+    rows = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if all(row.get(name) in labels for name, labels in HEADS.items()):
+                    rows.append(row)
+                else:
+                    logger.warning(f"{path}:{line_no}: unknown label, skipped")
+    return rows
+
+
+def holdout_split(rows: List[Dict], fraction: float = 0.2, seed: int = 0):
+    """(train, test) with `fraction` of each seniority level held out."""
+    rng = random.Random(seed)
+    train, test = [], []
+    for level in HEADS['seniority']:
+        group = [row for row in rows if row['seniority'] == level]
+        rng.shuffle(group)
+        cut = int(len(group) * fraction)
+        test += group[:cut]
+        train += group[cut:]
+    return train, test
+
+
+def evaluate(classifier: JobClassifier, rows: List[Dict]) -> Dict[str, float]:
+    """Accuracy per head."""
+    predictions = classifier.predict_many(row['text'] for row in rows)
+    return {
+        name: float(np.mean([p[name]['label'] == row[name] for p, row in zip(predictions, rows)]))
+        for name in HEADS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the job seniority / role-family classifier")
+    parser.add_argument('--labels', type=Path, nargs='*', default=[], help="Extra labelled JSONL files")
+    parser.add_argument('--output', type=Path, default=CLASSIFIER_PATH, help="Artifact to write")
+    parser.add_argument('--n-features', type=int, default=2 ** 15, help="Hashed feature count")
+    parser.add_argument('--C', type=float, default=10.0, help="Inverse regularisation strength")
+    parser.add_argument('--holdout', type=Path, nargs='*', default=[],
+                        help="Labelled real postings to validate on (never trained on)")
+    parser.add_argument('--dry-run', action='store_true', help="Evaluate without saving")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    rows = load_labelled([LABELS_PATH] + args.labels)
+    train, test = holdout_split(rows)
+
+    def fit(subset: List[Dict]) -> JobClassifier:
+        return JobClassifier.train([row['text'] for row in subset],
+                                   {name: [row[name] for row in subset] for name in HEADS},
+                                   n_features=args.n_features, C=args.C)
+
+    accuracy = evaluate(fit(train), test)
+    print(f"Examples: {len(rows)} ({len(train)} train / {len(test)} held out)")
+    for name, value in accuracy.items():
+        print(f"Held-out accuracy, {name:<12} {value:.1%}")
+
+    classifier = fit(rows)
+    holdout = load_labelled(args.holdout)
+    if holdout:
+        validated = evaluate(classifier, holdout)
+        classifier.validation = {name: {'accuracy': value, 'examples': len(holdout)}
+                                 for name, value in validated.items()}
+        for name, value in validated.items():
+            print(f"Real-posting accuracy, {name:<12} {value:.1%} ({len(holdout)} postings)")
+    else:
+        print("No --holdout postings: the app will not let this model drive letter tone or routing")
+
+    start = time.perf_counter()
+    for row in rows:
+        classifier.predict(row['text'])
+    print(f"Prediction latency:            {(time.perf_counter() - start) / len(rows) * 1e6:.0f} µs/posting")
+
+    if not args.dry_run:
+        classifier.save(args.output)
+        print(f"Saved {args.output} ({args.output.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
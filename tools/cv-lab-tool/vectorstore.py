@@ -0,0 +1,221 @@
+"""
+🔒 CAS (Content Administration System) - Job Vector Store
+=========================================================
+Append-only store of normalised embeddings with approximate
+nearest-neighbour search, for "postings similar to this one" and
+"jobs most similar to this CV".
+
+Vectors are quantised to float16 (or int8) rows in a flat file that
+readers memory-map, so every worker process shares one copy through the
+OS page cache instead of holding its own float32 arrays. Sidecar files
+hold, per row, the caller's ID (the near-duplicate index's posting id),
+the row's random-hyperplane bucket code in each hash table and, for
+int8, the row's scale. A query ranks only the rows that share a bucket
+with it (or a bucket one bit away) in some table, exactly, against the
+quantised vectors.
+
+Non-obvious: the files are only ever appended to, and a row counts once
+every file holds it, so readers never see a half-written row and need
+no locking. Writes must come from a single process.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DTYPES = {'float16': np.float16, 'int8': np.int8}
+
+# int8 rows store round(x / max|x| * INT8_LEVELS); max|x| goes to the scales file
+INT8_LEVELS = 127.0
+
+
+class VectorStore:
+    """
+    Memory-mapped embeddings with random-projection LSH buckets.
+
+    Usage:
+        store = VectorStore(path, dim=256)
+        store.add(posting_id, vector)
+        store.search(query_vector, k=5)  # -> [(posting_id, cosine), ...]
+    """
+
+    def __init__(self, path: Path, dim: int, dtype: str = 'float16', tables: int = 16, bits: int = 12,
+                 brute_force_below: int = 2000, seed: int = 1):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {sorted(DTYPES)}")
+        if not 0 < bits <= 16:
+            raise ValueError("bits must be between 1 and 16")
+        self.path = Path(path)
+        self.dim = dim
+        self.dtype = dtype
+        self.tables = tables
+        self.bits = bits
+        self.brute_force_below = brute_force_below
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._check_meta(seed)
+
+        # Fixed seed: bucket codes on disk are only valid for these planes
+        rng = np.random.RandomState(seed)
+        self._planes = rng.standard_normal((tables * bits, dim)).astype(np.float32)
+        self._bit_values = (1 << np.arange(bits)).astype(np.uint16)
+
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._maps = {}
+        self._buckets = None  # per table: (row order, sorted codes), built lazily
+
+    @property
+    def _files(self) -> Dict[str, Tuple[Path, np.dtype, int]]:
+        """name -> (path, dtype, values per row)."""
+        files = {
+            'vectors': (self.path / 'vectors.bin', np.dtype(DTYPES[self.dtype]), self.dim),
+            'codes': (self.path / 'codes.bin', np.dtype(np.uint16), self.tables),
+            'ids': (self.path / 'ids.bin', np.dtype(np.int64), 1),
+        }
+        if self.dtype == 'int8':
+            files['scales'] = (self.path / 'scales.bin', np.dtype(np.float32), 1)
+        return files
+
+    def _check_meta(self, seed: int):
+        meta = {'dim': self.dim, 'dtype': self.dtype, 'tables': self.tables, 'bits': self.bits, 'seed': seed}
+        meta_path = self.path / 'meta.json'
+        if not meta_path.exists():
+            meta_path.write_text(json.dumps(meta))
+            return
+        stored = json.loads(meta_path.read_text())
+        if stored != meta:
+            raise ValueError(f"Vector store at {self.path} was built with {stored}, not {meta}")
+
+    def _row_count(self) -> int:
+        """Rows complete in every file."""
+        return min(path.stat().st_size // (dtype.itemsize * width) if path.exists() else 0
+                   for path, dtype, width in self._files.values())
+
+    def _refresh(self):
+        """Remap the files if another writer (or this one) appended rows."""
+        rows = self._row_count()
+        if rows == self._rows and self._maps:
+            return
+        self._rows = rows
+        self._buckets = None
+        if not rows:
+            self._maps = {}
+            return
+        # Read-only maps: pages are shared with every other process mapping the files
+        self._maps = {
+            name: np.memmap(path, dtype=dtype, mode='r', shape=(rows, width) if width > 1 else (rows,))
+            for name, (path, dtype, width) in self._files.items()
+        }
+
+    def _normalise(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _quantise(self, unit: np.ndarray) -> Dict[str, np.ndarray]:
+        """File name -> values to append for these unit rows."""
+        if self.dtype == 'int8':
+            scales = np.abs(unit).max(axis=1)
+            scales[scales == 0] = 1.0
+            return {'vectors': np.round(unit / scales[:, None] * INT8_LEVELS).astype(np.int8),
+                    'scales': scales.astype(np.float32)}
+        return {'vectors': unit.astype(np.float16)}
+
+    def bucket_codes(self, unit: np.ndarray) -> np.ndarray:
+        """(n, tables) uint16 bucket codes: one sign bit per hyperplane."""
+        signs = (unit @ self._planes.T > 0).reshape(len(unit), self.tables, self.bits)
+        return (signs * self._bit_values).sum(axis=2).astype(np.uint16)
+
+    def add_many(self, ids: Iterable[int], vectors: np.ndarray) -> int:
+        """Append rows; returns the new row count. Zero vectors are stored as-is."""
+        unit = self._normalise(vectors)
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) != len(unit):
+            raise ValueError("ids and vectors differ in length")
+
+        values = {**self._quantise(unit), 'codes': self.bucket_codes(unit), 'ids': ids}
+        with self._lock:
+            for name, (path, dtype, _) in self._files.items():
+                with open(path, 'ab') as f:
+                    f.write(values[name].astype(dtype).tobytes())
+            return self._row_count()
+
+    def add(self, item_id: int, vector: np.ndarray) -> int:
+        """Append one row; returns the new row count."""
+        return self.add_many([item_id], vector)
+
+    def _bucket_index(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if self._buckets is None:
+            self._buckets = []
+            for table in range(self.tables):
+                codes = np.asarray(self._maps['codes'][:, table])
+                order = np.argsort(codes, kind='stable')
+                self._buckets.append((order, codes[order]))
+        return self._buckets
+
+    def _candidates(self, unit: np.ndarray) -> np.ndarray:
+        """Rows sharing a bucket (or a bucket at Hamming distance 1) with the query."""
+        codes = self.bucket_codes(unit)[0]
+        flips = np.concatenate([[0], self._bit_values]).astype(np.uint16)
+        rows = []
+        for table, (order, sorted_codes) in enumerate(self._bucket_index()):
+            probes = codes[table] ^ flips
+            starts = np.searchsorted(sorted_codes, probes, side='left')
+            ends = np.searchsorted(sorted_codes, probes, side='right')
+            rows.extend(order[start:end] for start, end in zip(starts, ends) if end > start)
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(rows))
+
+    def _scores(self, rows: Optional[np.ndarray], unit: np.ndarray) -> np.ndarray:
+        select = slice(None) if rows is None else rows
+        scores = self._maps['vectors'][select].astype(np.float32) @ unit[0]
+        if self.dtype == 'int8':
+            scores *= self._maps['scales'][select] / INT8_LEVELS
+        return scores
+
+    def search(self, vector: np.ndarray, k: int = 5, exclude: Iterable[int] = (),
+               exact: bool = False) -> List[Tuple[int, float]]:
+        """
+        The k stored IDs most cosine-similar to vector, best first.
+
+        Returns [(id, cosine)]. IDs in `exclude` are skipped. Stores under
+        brute_force_below rows (or exact=True) are scanned in full.
+        """
+        with self._lock:
+            self._refresh()
+            if not self._rows:
+                return []
+            unit = self._normalise(vector)
+
+            rows = None
+            if not exact and self._rows >= self.brute_force_below:
+                rows = self._candidates(unit)
+            scores = self._scores(rows, unit)
+            ids = np.asarray(self._maps['ids'] if rows is None else self._maps['ids'][rows])
+
+        exclude = np.fromiter(exclude, dtype=np.int64)
+        if len(exclude):
+            keep = ~np.isin(ids, exclude)
+            ids, scores = ids[keep], scores[keep]
+
+        k = min(k, len(scores))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def __len__(self) -> int:
+        return self._row_count()
+
+    def nbytes_per_row(self) -> int:
+        """On-disk (and mapped) bytes per stored row, across every file."""
+        return sum(dtype.itemsize * width for _, dtype, width in self._files.values())
@@ -0,0 +1,470 @@
+"""
+🔒 CAS (Content Administration System) - Job Folder Watcher
+===========================================================
+Daemon that scores job postings dropped into a directory (.txt, .md or
+.html, e.g. by a scraper) against your CV, so nobody has to paste them
+into the app one at a time.
+
+New files are noticed by inotify (via the optional watchdog package)
+or, without it, by polling the directory. Once a file has stopped
+changing it is read, HTML is streamed through html.parser to text, and
+the text goes on a bounded queue. A pool of worker threads runs the
+app's own path on it: boilerplate stripping against the app's shared
+boilerplate index, extract_keywords, extract_company_info and
+calculate_ats_score. Results go to a local SQLite store that the app's
+sidebar can load postings from.
+
+Run Instructions:
+    python watcher.py ~/jobs-inbox --cv cv.md              # Watch until Ctrl+C
+    python watcher.py ~/jobs-inbox --cv cv.md --once       # Score what is there, then exit
+    python watcher.py ~/jobs-inbox --cv cv.md --poll 5     # Force polling every 5 seconds
+
+Non-obvious: the queue only holds a bounded number of texts. When the
+workers fall behind, the reader blocks and a burst waits as file paths
+in the pending set, so memory stays flat however many files land at
+once. Files are keyed by content hash, so restarts and re-saves of an
+unchanged file are skipped.
+
+The workers are threads sharing one spaCy pipeline, so scoring itself
+runs one posting at a time under the GIL; extra workers only overlap
+file reads and SQLite writes with it. To use more cores, run one
+watcher per directory.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Polling fallback
+    Observer = None
+    FileSystemEventHandler = object
+
+logger = logging.getLogger(__name__)
+
+JOB_FILE_EXTENSIONS = ('.txt', '.md', '.html', '.htm')
+
+# Bytes per read when streaming a file through the HTML parser
+READ_CHUNK = 64 * 1024
+
+# Tags whose text is never job content, and tags that end a line
+_SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head'}
+_BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'section', 'article', 'header', 'footer',
+               'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'blockquote', 'pre', 'hr'}
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, one line per block element, up to max_chars."""
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in _BLOCK_TAGS:
+            self._append('\n')
+        if tag == 'li':
+            self._append('- ')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self._append('\n')
+
+    def handle_data(self, data):
+        if not self._skipping:
+            words = ' '.join(data.split())
+            lead = ' ' if data[:1].isspace() else ''
+            trail = ' ' if data[-1:].isspace() and words else ''
+            self._append(lead + words + trail)
+
+    def _append(self, text: str):
+        if text and self.length < self.max_chars:
+            self.parts.append(text)
+            self.length += len(text)
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.max_chars
+
+    def text(self) -> str:
+        lines = (line.strip() for line in ''.join(self.parts).splitlines())
+        text, blank = [], False
+        for line in lines:
+            # Collapse runs of empty lines left by nested block elements
+            if line or not blank:
+                text.append(line)
+            blank = not line
+        return '\n'.join(text).strip()[:self.max_chars]
+
+
+def html_to_text(chunks: Iterable[str], max_chars: int) -> str:
+    """Visible text of an HTML document fed in chunks; stops once max_chars are collected."""
+    parser = _TextExtractor(max_chars)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.full:
+            break
+    parser.close()
+    return parser.text()
+
+
+def read_job_file(path: Path, max_chars: int) -> str:
+    """A job file's text (HTML converted), reading at most about max_chars of it."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        if path.suffix.lower() in ('.html', '.htm'):
+            return html_to_text(iter(lambda: f.read(READ_CHUNK), ''), max_chars)
+        return f.read(max_chars)
+
+
+def content_hash(path: Path) -> str:
+    """SHA-1 of a file's bytes, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultsStore:
+    """
+    On-disk scores of ingested job files, keyed by content hash.
+
+    Usage:
+        store = ResultsStore(path)
+        if not store.seen(file_hash):
+            store.add(file_hash, path, text, result)
+        store.recent(20)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY,
+                    content_hash TEXT UNIQUE NOT NULL,
+                    path TEXT NOT NULL,
+                    processed_at TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    job_title TEXT,
+                    company_name TEXT,
+                    score REAL,
+                    result TEXT,
+                    text BLOB,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_results_processed ON results (processed_at);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def seen(self, file_hash: str) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM results WHERE content_hash = ?", (file_hash,)).fetchone() is not None
+
+    def add(self, file_hash: str, path: Path, text: str, result: Optional[Dict], seconds: float,
+            error: Optional[str] = None) -> bool:
+        """Store one file's result (or error); False if its content was already stored."""
+        result = result or {}
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO results (content_hash, path, processed_at, seconds, job_title, "
+                "company_name, score, result, text, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (file_hash, str(path), datetime.now().isoformat(timespec='seconds'), seconds,
+                 result.get('job_title'), result.get('company_name'), result.get('score'),
+                 json.dumps(result), zlib.compress(text.encode('utf-8')), error))
+            return cursor.rowcount == 1
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Latest successfully scored files, newest first (without their text)."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, path, processed_at, job_title, company_name, score FROM results "
+                "WHERE error IS NULL ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        keys = ('id', 'path', 'processed_at', 'job_title', 'company_name', 'score')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def text(self, result_id: int) -> str:
+        """The ingested text of one stored file."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT text FROM results WHERE id = ?", (result_id,)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else ''
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher: 'FolderWatcher'):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.touch(Path(event.src_path))
+
+    def on_modified(self, event):
+        self.on_created(event)
+
+    def on_moved(self, event):
+        # Scrapers often write a temporary name and rename it into place
+        if not event.is_directory:
+            self.watcher.touch(Path(event.dest_path))
+
+
+class FolderWatcher:
+    """
+    Job files in a directory that are new or changed and have settled.
+
+    Changes come from watchdog's inotify observer when installed (and
+    poll_interval is None), else from rescanning every poll_interval
+    seconds. A file is ready once `settle` seconds pass without a change,
+    so half-written files are never read.
+    """
+
+    def __init__(self, directory: Path, poll_interval: Optional[float] = None, settle: float = 1.0,
+                 extensions: Iterable[str] = JOB_FILE_EXTENSIONS):
+        self.directory = Path(directory)
+        self.extensions = tuple(extensions)
+        self.settle = settle
+        self.polling = poll_interval is not None or Observer is None
+        self.poll_interval = poll_interval or 2.0
+        self._pending = {}  # path -> time of its last change
+        self._stats = {}    # path -> (size, mtime_ns) at the last scan
+        self._lock = threading.Lock()
+        self._observer = None
+        self._last_scan = 0.0
+
+    def touch(self, path: Path):
+        """Mark a path as changed now."""
+        if path.suffix.lower() in self.extensions and not path.name.startswith('.'):
+            with self._lock:
+                self._pending[path] = time.monotonic()
+
+    def scan(self):
+        """Mark every file that is new or changed since the last scan."""
+        self._last_scan = time.monotonic()
+        stats = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                stats[entry.path] = key = (stat.st_size, stat.st_mtime_ns)
+                if self._stats.get(entry.path) != key:
+                    self.touch(Path(entry.path))
+        # Files deleted since the last scan drop out
+        self._stats = stats
+
+    def start(self):
+        """Begin watching; files already present count as new."""
+        self.scan()
+        if not self.polling:
+            self._observer = Observer()
+            self._observer.schedule(_Handler(self), str(self.directory), recursive=False)
+            self._observer.start()
+        logger.info(f"Watching {self.directory} ({'polling' if self.polling else 'inotify'})")
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+    def ready(self) -> List[Path]:
+        """Pop the pending paths that have settled, oldest change first."""
+        if self.polling and time.monotonic() - self._last_scan >= self.poll_interval:
+            self.scan()
+        cutoff = time.monotonic() - self.settle
+        with self._lock:
+            paths = sorted((changed, path) for path, changed in self._pending.items() if changed <= cutoff)
+            for _, path in paths:
+                del self._pending[path]
+        return [path for _, path in paths]
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+class IngestPipeline:
+    """
+    Reader thread plus worker pool between a FolderWatcher and a ResultsStore.
+
+    The reader hashes each settled file, skips content already stored,
+    extracts its text and puts it on a queue of at most queue_size
+    texts; `workers` threads take texts off the queue and store
+    `process(text)` (or the error it raised) for each.
+    """
+
+    def __init__(self, process: Callable[[str], Dict], store: ResultsStore, workers: int = 2,
+                 queue_size: int = 32, max_chars: int = 200_000):
+        self.process = process
+        self.store = store
+        self.workers = workers
+        self.max_chars = max_chars
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = {'read': 0, 'skipped': 0, 'scored': 0, 'failed': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                file_hash, path, text = item
+                start = time.perf_counter()
+                try:
+                    result, error = self.process(text), None
+                    self._count('scored')
+                except Exception as exc:  # One bad file must not stop the pool
+                    logger.warning(f"Failed to score {path}: {exc}")
+                    result, error = None, f'{type(exc).__name__}: {exc}'
+                    self._count('failed')
+                self.store.add(file_hash, path, text, result, time.perf_counter() - start, error)
+            finally:
+                self.queue.task_done()
+
+    def _read(self, path: Path) -> bool:
+        """Queue one file; blocks while the queue is full."""
+        try:
+            file_hash = content_hash(path)
+            if self.store.seen(file_hash):
+                self._count('skipped')
+                return False
+            text = read_job_file(path, self.max_chars)
+        except OSError as exc:  # Deleted or unreadable before we got to it
+            logger.warning(f"Cannot read {path}: {exc}")
+            return False
+        if not text.strip():
+            self._count('skipped')
+            return False
+        self.queue.put((file_hash, path, text))
+        self._count('read')
+        return True
+
+    def run(self, watcher: FolderWatcher, stop: threading.Event, once: bool = False, tick: float = 0.2):
+        """
+        Feed settled files to the workers until `stop` is set.
+
+        With once=True, returns after the files present at start are scored.
+        """
+        threads = [threading.Thread(target=self._work, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        watcher.start()
+        try:
+            while not stop.is_set():
+                for path in watcher.ready():
+                    self._read(path)
+                if once and not watcher.pending:
+                    break
+                stop.wait(tick)
+        finally:
+            watcher.stop()
+            for _ in threads:
+                self.queue.put(None)
+            for thread in threads:
+                thread.join()
+
+
+def make_scorer(cv_text: str, nlp) -> Callable[[str], Dict]:
+    """process(job_text) for IngestPipeline: the app's scoring path against one CV."""
+    from app import (calculate_ats_score, extract_company_info, extract_keywords, load_boilerplate_index,
+                     load_document_frequencies, pipeline_for, strip_job_boilerplate, weight_job_keywords)
+
+    cv_nlp, cv_language = pipeline_for(cv_text, nlp)
+    cv_keywords = extract_keywords(cv_text, cv_nlp, language=cv_language)
+    doc_freqs = load_document_frequencies()
+    boilerplate_index = load_boilerplate_index()
+
+    def score(job_text: str) -> Dict:
+        job_nlp, job_language = pipeline_for(job_text, nlp)
+        job_core, _ = strip_job_boilerplate(job_text, boilerplate_index)
+        job_keywords = weight_job_keywords(extract_keywords(job_core, job_nlp, language=job_language), doc_freqs)
+        company_info = extract_company_info(job_text)
+        scores = calculate_ats_score(cv_text, job_core, cv_keywords, job_keywords, cv_nlp)
+        return {
+            'job_title': company_info['job_title'],
+            'company_name': company_info['company_name'],
+            'score': scores['total'],
+            'components': {key: scores[key] for key in ('keywords', 'soft_skills', 'structure', 'relevance')},
+            'matched_keywords': sorted(scores['matched_keywords']),
+            'missing_keywords': scores['missing_keywords'],
+            'partial': scores['partial'],
+        }
+
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score job postings dropped into a directory")
+    parser.add_argument('directory', type=Path, help="Directory the job files land in")
+    parser.add_argument('--cv', type=Path, required=True, help="CV (Markdown) to score against")
+    parser.add_argument('--model', default='en_core_web_sm',
+                        help="spaCy model to load (used for its own language; others use the app's models)")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="Worker threads; they share one model, so scoring is serialised by the GIL")
+    parser.add_argument('--queue-size', type=int, default=32, help="Texts waiting for a worker, at most")
+    parser.add_argument('--poll', type=float, default=None, metavar='SECONDS',
+                        help="Poll instead of using inotify (automatic without watchdog)")
+    parser.add_argument('--settle', type=float, default=1.0, help="Seconds a file must be unchanged")
+    parser.add_argument('--once', action='store_true', help="Score the files present now, then exit")
+    parser.add_argument('--results', type=Path, default=None, help="Results database (default: the app's)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    import spacy
+    from app import INPUT_GUARDS, WATCH_CONFIG
+
+    # Keep per-call INFO logs from app out of the daemon's log
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    store = ResultsStore(args.results or WATCH_CONFIG['results_path'])
+    cv_text = args.cv.read_text(encoding='utf-8')[:INPUT_GUARDS['max_input_chars']]
+    pipeline = IngestPipeline(make_scorer(cv_text, spacy.load(args.model)), store, workers=args.workers,
+                              queue_size=args.queue_size, max_chars=INPUT_GUARDS['max_input_chars'])
+    watcher = FolderWatcher(args.directory, poll_interval=args.poll, settle=args.settle)
+
+    stop = threading.Event()
+    start = time.perf_counter()
+    try:
+        pipeline.run(watcher, stop, once=args.once)
+    except KeyboardInterrupt:
+        stop.set()
+    elapsed = time.perf_counter() - start
+    stats = pipeline.stats
+    print(f"Scored {stats['scored']}, failed {stats['failed']}, skipped {stats['skipped']} "
+          f"in {elapsed:.1f}s ({stats['scored'] / elapsed if elapsed else 0:.1f} files/s)")
+
+
+if __name__ == "__main__":
+    main()